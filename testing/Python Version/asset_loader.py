@@ -0,0 +1,82 @@
+"""
+Asset Loader
+Runs startup loading jobs on worker threads and hands finished results to the main thread
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AssetLoader:
+    """Named background jobs with per-asset timings, installed by the main loop as they finish"""
+
+    def __init__(self, workers=4, start=None):
+        """
+        Initialize the worker pool
+
+        Args:
+            workers: Number of worker threads
+            start: perf_counter() value that timings are measured from (default: now)
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.jobs = {}  # {name: Future} not yet handed to the main thread
+        self.timings = {}  # {name: {"ms": load time, "done_ms": finish time since start}}
+        self.total = 0
+
+    def elapsed_ms(self):
+        """Milliseconds since the loader's start time"""
+        return (time.perf_counter() - self.start) * 1000
+
+    def mark(self, name):
+        """Record a main-thread milestone (first frame, ready, ...) at the current time"""
+        self.timings[name] = {"ms": None, "done_ms": round(self.elapsed_ms(), 2)}
+
+    def submit(self, name, func, *args):
+        """
+        Queue a loading job
+
+        Args:
+            name: Asset name (key of the result and of its timing)
+            func: Callable returning the loaded asset
+            *args: Arguments for func
+        """
+        def job():
+            t0 = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.timings[name] = {"ms": round((time.perf_counter() - t0) * 1000, 2),
+                                      "done_ms": round(self.elapsed_ms(), 2)}
+        self.jobs[name] = self.pool.submit(job)
+        self.total += 1
+
+    def progress(self):
+        """Fraction of submitted jobs that have finished"""
+        if not self.total:
+            return 1.0
+        running = sum(1 for f in self.jobs.values() if not f.done())
+        return (self.total - running) / self.total
+
+    def finished(self, block=False):
+        """
+        Take the results of finished jobs (exceptions raised by a job are re-raised here)
+
+        Args:
+            block: Wait for every remaining job instead of only collecting the finished ones
+
+        Returns:
+            List of (name, result) in submission order
+        """
+        out = []
+        for name, future in list(self.jobs.items()):
+            if block or future.done():
+                del self.jobs[name]
+                out.append((name, future.result()))
+        if not self.jobs:
+            self.pool.shutdown(wait=False)
+        return out
+
+    def busy(self):
+        """Whether any job has not been collected yet"""
+        return bool(self.jobs)
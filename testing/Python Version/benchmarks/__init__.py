@@ -0,0 +1,9 @@
+"""
+City Rogue Benchmarks
+Headless performance suites that write machine-readable JSON results
+
+Run from the game folder, e.g.:
+    python -m benchmarks.sim_bench --out sim.json
+    python -m benchmarks.render_bench --out render.json
+    python -m benchmarks.compare old_sim.json sim.json
+"""
@@ -0,0 +1,108 @@
+"""
+Boot Benchmarks
+Starts the game in fresh interpreters and times the splash frame, the menu and every asset,
+and checks that the data and simulation modules import quickly without pygame
+
+Usage (from the game folder):
+    python -m benchmarks.boot_bench --out boot.json
+    python -m benchmarks.boot_bench --runs 20 --ttff-budget 200 --import-budget 50
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.common import GAME_DIR, summarize, use_dummy_drivers, write_results
+
+DEFAULT_RUNS = 10
+LEAN_MODULES = ["consts", "chunk_map", "event_log_manager", "frame_profiler", "build_manager", "city_sim"]
+
+
+def child():
+    """Boot one Game and print its loader timings plus the wall-clock time of the first frame"""
+    use_dummy_drivers()
+    import city_rogue
+    game = city_rogue.Game().finish_loading()
+    timings = game.loader.timings
+    since_first = time.perf_counter() - game.loader.start - timings["first_frame"]["done_ms"] / 1000
+    print(json.dumps({"first_frame_wall": time.time() - since_first, "timings": timings}))
+
+
+IMPORT_PROBE = ("import json, sys, time; t = time.perf_counter(); import {module}; "
+                "print(json.dumps([(time.perf_counter() - t) * 1000, 'pygame' in sys.modules]))")
+
+
+def import_once(module):
+    """
+    Import a module in a bare interpreter (nothing preloaded but json, sys and time)
+
+    Returns:
+        (import time in ms, whether pygame was imported)
+    """
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)], cwd=GAME_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    ms, pygame_loaded = json.loads(out.strip().splitlines()[-1])
+    return ms, pygame_loaded
+
+
+def boot_once():
+    """
+    Run one boot in a subprocess
+
+    Returns:
+        (milliseconds from process launch to the first frame, loader timings)
+    """
+    launch = time.time()
+    out = subprocess.run([sys.executable, "-m", "benchmarks.boot_bench", "--child"], cwd=GAME_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    data = json.loads(out.strip().splitlines()[-1])
+    return (data["first_frame_wall"] - launch) * 1000, data["timings"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="City Rogue startup benchmarks")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="number of cold interpreter starts")
+    parser.add_argument("--ttff-budget", type=float, default=200.0, help="time-to-first-frame budget in ms")
+    parser.add_argument("--import-budget", type=float, default=50.0, help="import time budget of each lean module in ms")
+    parser.add_argument("--out", default="-", help="output JSON path (default: stdout)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(); return
+
+    ttff, samples = [], {}
+    for _ in range(args.runs):
+        ms, timings = boot_once()
+        ttff.append(ms)
+        for name, t in timings.items():
+            samples.setdefault(f"{name}_done", []).append(t["done_ms"])
+            if t["ms"] is not None: samples.setdefault(f"{name}_load", []).append(t["ms"])
+
+    results = [dict(name="ttff_process", **summarize(ttff))]
+    results += [dict(name=name, **summarize(values)) for name, values in sorted(samples.items())]
+
+    failures = []
+    for module in LEAN_MODULES:
+        runs = [import_once(module) for _ in range(args.runs)]
+        row = dict(name="import", module=module, pygame=any(p for _, p in runs), **summarize([ms for ms, _ in runs]))
+        results.append(row)
+        if row["pygame"]: failures.append(f"{module} imports pygame")
+        if row["median_ms"] > args.import_budget:
+            failures.append(f"{module} imports in {row['median_ms']:.1f} ms (budget {args.import_budget:.0f} ms)")
+    write_results(args.out, "boot", results,
+                  {"runs": args.runs, "ttff_budget": args.ttff_budget, "import_budget": args.import_budget})
+
+    median = results[0]["median_ms"]
+    if median > args.ttff_budget:
+        failures.append(f"time to first frame {median:.1f} ms exceeds the {args.ttff_budget:.0f} ms budget")
+    for failure in failures:
+        print(f"Budget exceeded: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Correctness Checks
+Compares the compiled and incremental simulation paths against straightforward reference versions;
+exits non-zero on any mismatch so edits to the rules cannot silently break them
+
+Usage (from the game folder):
+    python -m benchmarks.checks
+    python -m benchmarks.checks modifiers --quick
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+
+import benchmarks.common  # Puts the game folder on sys.path
+from benchmarks.cities import make_city
+from city_sim import CitySimulation, read_game_data
+from game_data import event_effects
+from modifiers import compile_tables
+from what_if import DELTA_KEYS
+
+# Buildings each event's income multiplier must reach, taken from the event descriptions
+# ("Office $$ +20%"), not from the effects being checked
+INCOME_TARGETS = {"boom": {2}}
+
+
+def reference_money(b, layers):
+    """Income of one building type under modifier layers: targeted multipliers on positive income only"""
+    money = b.money
+    for effects in layers:
+        for e in effects:
+            if e["stat"] == "money" and b.id in e.get("buildings", ()) and money > 0: money = money * e["val"]
+    return round(money)
+
+
+def check_modifiers(data, quick=False):
+    """
+    Compile every relic with every ordered pair of events (fewer when quick) and compare the income
+    table with reference_money; income multipliers must name their buildings
+
+    Returns:
+        (cases, list of failure strings)
+    """
+    failures = []
+    sources = [(r["id"], r.get("effects", [])) for r in data.relics] + [(e["id"], event_effects(e)) for e in data.events]
+    for source_id, effects in sources:
+        targets = set()
+        for e in effects:
+            if e["stat"] != "money": continue
+            if "buildings" not in e: failures.append(f"{source_id}: untargeted income multiplier")
+            targets.update(e.get("buildings", ()))
+        want = INCOME_TARGETS.get(source_id, set())
+        if targets != want: failures.append(f"{source_id}: income multiplier reaches {sorted(targets)}, expected {sorted(want)}")
+    cases = 0
+    for relic in [None] + data.relics:
+        for n in range(2 if quick else 3):
+            for events in itertools.permutations(data.events, n):
+                layers = [relic.get("effects", []) if relic else [], [e for event in events for e in event_effects(event)]]
+                mt = compile_tables(data.table, layers); cases += 1
+                for b in data.buildings.values():
+                    if mt.money[b.id] != reference_money(b, layers):
+                        failures.append(f"{relic and relic['id']} + {[e['id'] for e in events]}: {b.name} income "
+                                        f"{mt.money[b.id]}, expected {reference_money(b, layers)}")
+    return cases, failures
+
+
+def city_totals(sim):
+    """Per-turn money and energy plus population, jobs and happiness after the last recalculation"""
+    money, energy = sim.calculate_turn_income()
+    return {"money": money, "energy": energy, "pop": sim.population, "jobs": sim.jobs_total, "happy": sim.happiness}
+
+
+def check_what_if(data, quick=False):
+    """
+    Play random builds, upgrades and sales on small maps and compare every what-if delta with the
+    change a fork shows after really making the move
+
+    Returns:
+        (cases, list of failure strings)
+    """
+    mute = lambda *args: None
+    failures = []; cases = 0
+    for seed in range(5 if quick else 25):
+        random.seed(seed); rng = random.Random(seed)  # Global random drives the map and events
+        sim = CitySimulation(map_size=(24, 24), data=data)
+        sim.choose_relic(rng.choice(sim.relics))
+        what_if = sim.what_if
+        for step in range(220):
+            r, c = rng.randrange(sim.grid_h), rng.randrange(sim.grid_w)
+            b_id = rng.choice([1, 1, 1, 2, 3, 4, 4, 6, 6, 7, 7, 7, 8, 9, 9, 10])
+
+            def compare(kind, delta, fork, cost):
+                before = city_totals(sim); after = city_totals(fork)
+                want = {key: after[key] - before[key] for key in DELTA_KEYS}; want["cost"] = cost
+                if delta != want: failures.append(f"seed {seed} step {step} {kind} at {(r, c)}: {delta}, expected {want}")
+
+            if sim.can_place_building(r, c, b_id):
+                fork = sim.fork(); fork.force_build(r, c, b_id); cases += 1
+                compare("build", what_if.evaluate_build(r, c, b_id), fork, -sim.get_cost(b_id))
+                if rng.random() < 0.5: sim.force_build(r, c, b_id)
+            if sim.build_mgr.anchors and step % 3 == 0:
+                r, c = rng.choice(sorted(sim.build_mgr.anchors))
+                delta = what_if.evaluate_upgrade(r, c)
+                if delta:
+                    fork = sim.fork(); fork.money = 10 ** 6
+                    fork.build_mgr.upgrade_building(r, c, mute, mute); fork.recalc_stats(); cases += 1
+                    compare("upgrade", delta, fork, -sim.buildings[sim.build_mgr.anchors[(r, c)]].upgrade_cost)
+                fork = sim.fork(); fork.popup_coords = (r, c); fork.demolish_building(); cases += 1
+                compare("sale", what_if.evaluate_sale(r, c), fork, fork.money - sim.money)
+                if rng.random() < 0.15: sim.popup_coords = (r, c); sim.demolish_building()
+        for _ in range(3): sim.next_turn()
+    return cases, failures
+
+
+def scan_moves(sim, b_id):
+    """Legal anchors of a building type by testing every tile of every footprint"""
+    w, h = sim.buildings[b_id].size; free = -1 if b_id == 8 else 0
+    return [(r, c) for r in range(sim.grid_h - h + 1) for c in range(sim.grid_w - w + 1)
+            if all(sim.grid[r + dr][c + dc] == free for dr in range(h) for dc in range(w))]
+
+
+def check_legal_moves(data, quick=False):
+    """
+    Compare the patched placement masks (legal_moves, count, flat) with a per-tile scan while
+    building and selling at random, in a fork that diverges from its parent, after save/load and on
+    the synthetic cities sim_bench times
+
+    Returns:
+        (cases, list of failure strings)
+    """
+    failures = []; cases = 0
+    ids = sorted(data.buildings)
+
+    def compare(sim, where):
+        nonlocal cases
+        masks = sim.build_mgr.masks
+        for b_id in ids:
+            want = scan_moves(sim, b_id); cases += 1
+            flat = masks.flat(b_id)
+            if (sim.legal_moves(b_id) != want or masks.count(b_id) != len(want) or sum(flat) != len(want)
+                    or any(flat[r * sim.grid_w + c] != 1 for r, c in want)):
+                failures.append(f"{where}: masks of building {b_id} differ from the scan")
+
+    tmp = tempfile.TemporaryDirectory(prefix="city_rogue_check_")
+    for seed in range(4 if quick else 12):
+        random.seed(seed); rng = random.Random(seed)
+        sim = CitySimulation(map_size=(30 + seed * 3, 30 + seed), data=data)
+        sim.choose_relic(rng.choice(sim.relics))
+        fork = None
+        for step in range(400):
+            target = fork if fork is not None and step % 2 else sim  # Alternate once forked
+            r, c = rng.randrange(target.grid_h), rng.randrange(target.grid_w)
+            b_id = rng.choice([1, 2, 3, 4, 6, 7, 7, 8, 9, 10])
+            if target.can_place_building(r, c, b_id): target.force_build(r, c, b_id)
+            elif target.build_mgr.anchors and rng.random() < 0.3:
+                target.popup_coords = rng.choice(sorted(target.build_mgr.anchors)); target.demolish_building()
+            if step == 150: fork = sim.fork()
+            if step % 50 == 0:
+                compare(sim, f"seed {seed} step {step}")
+                if fork is not None: compare(fork, f"seed {seed} step {step} (fork)")
+        path = os.path.join(tmp.name, f"save_{seed}.json")
+        sim.save_game(path); sim.reset_game_data(); sim.load_game(path)
+        compare(sim, f"seed {seed} after load")
+    sim = CitySimulation(data=data)
+    for size in (64,) if quick else (64, 128):
+        sim.map_size = (size, size)
+        make_city(sim, 0.4, seed=size)
+        compare(sim, f"synthetic {size}x{size}")
+    tmp.cleanup()
+    return cases, failures
+
+
+CHECKS = {"modifiers": check_modifiers, "what_if": check_what_if, "legal_moves": check_legal_moves}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="City Rogue correctness checks")
+    parser.add_argument("checks", nargs="*", help=f"checks to run: {', '.join(CHECKS)} (default: all)")
+    parser.add_argument("--quick", action="store_true", help="fewer cases for smoke runs")
+    args = parser.parse_args(argv)
+    for name in args.checks:
+        if name not in CHECKS: parser.error(f"unknown check {name!r}")
+
+    data = read_game_data()
+    failed = False
+    for name in args.checks or CHECKS:
+        cases, failures = CHECKS[name](data, args.quick)
+        print(f"{name}: {cases} cases, {len(failures)} failures")
+        for failure in failures[:20]:
+            print(f"  {failure}", file=sys.stderr)
+        failed = failed or bool(failures)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
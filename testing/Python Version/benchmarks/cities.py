@@ -0,0 +1,117 @@
+"""
+Synthetic Cities
+Deterministic city layouts and scripted games used by the benchmarks
+"""
+
+import random
+
+# Building mix for synthetic blocks (weighted by repetition)
+BLOCK_MIX = [1, 1, 1, 2, 2, 3, 4, 6, 6, 9, 10]
+ROAD_SPACING = 5
+
+
+def make_city(game, density, seed=0):
+    """
+    Fill the current map with a road lattice and buildings
+
+    Roads run every ROAD_SPACING tiles (bridges where they cross water);
+    the blocks between them are filled with a weighted building mix until
+    roughly `density` of all land tiles are occupied.
+
+    Args:
+        game: Game whose grid is overwritten (map size is taken from it)
+        density: Target fraction of land tiles covered, 0.0 - 1.0
+        seed: Random seed for river and building placement
+
+    Returns:
+        List of (row, col) anchors of the placed buildings
+    """
+    random.seed(seed)
+    game.reset_game_data()
+    rows, cols = game.grid_h, game.grid_w
+    mgr = game.build_mgr
+    land = rows * cols - len(game.water_tiles)
+    target = int(land * density)
+    placed = []
+    covered = 0
+
+    if density > 0:
+        for r in range(rows):
+            for c in range(cols):
+                if r % ROAD_SPACING == 0 or c % ROAD_SPACING == 0:
+                    b_id = 8 if game.grid[r][c] == -1 else 7
+                    if mgr.can_place_building(r, c, b_id):
+                        mgr.force_build(r, c, b_id)
+                        placed.append((r, c))
+                        covered += 1
+                        if covered >= target:
+                            game.recalc_stats()
+                            return placed
+
+    rng = random.Random(seed)
+    candidates = [(r, c) for r in range(rows) for c in range(cols)]
+    rng.shuffle(candidates)
+    for r, c in candidates:
+        if covered >= target:
+            break
+        b_id = rng.choice(BLOCK_MIX)
+        if mgr.can_place_building(r, c, b_id):
+            w, h = game.buildings[b_id].size
+            mgr.force_build(r, c, b_id)
+            placed.append((r, c))
+            covered += w * h
+    game.recalc_stats()
+    return placed
+
+
+def play_scripted_game(game, seed=0, rounds=20):
+    """
+    Play a full game with a simple deterministic bot
+
+    Each round the bot extends a road spine from the map centre and
+    spends its actions on buildings placed next to it, then passes.
+
+    Args:
+        game: Game to play (reset first)
+        seed: Random seed for the river, events and bot choices
+        rounds: Number of turns to play
+
+    Returns:
+        Dictionary with final round, money, population and building count
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+    game.reset_game_data()
+    game.relic = game.relics[0] if game.relics else None
+    mid = game.grid_h // 2
+    spine = [(mid, c) for c in range(game.grid_w)]
+    spine_idx = max(0, game.grid_w // 2 - 3)
+    order = [1, 2, 6, 1, 3, 10, 4, 1, 9, 2]
+    built = 0
+
+    for turn in range(rounds):
+        if game.game_over:
+            break
+        for _ in range(4):
+            if spine_idx < len(spine):
+                r, c = spine[spine_idx]
+                b_id = 8 if game.grid[r][c] == -1 else 7
+                if game.can_place_building(r, c, b_id):
+                    game.selected_building = b_id
+                    game.build(r, c)
+                spine_idx += 1
+        attempts = 0
+        while game.actions > 0 and attempts < 40:
+            attempts += 1
+            b_id = order[(turn + attempts) % len(order)]
+            if game.money < game.get_cost(b_id):
+                continue
+            r = mid + rng.choice((-2, 1))
+            c = rng.randrange(max(0, game.grid_w // 2 - 3), min(game.grid_w - 1, spine_idx))
+            if game.can_place_building(r, c, b_id):
+                game.selected_building = b_id
+                game.build(r, c)
+                built += 1
+        game.popup_queue.clear()
+        game.next_turn()
+    return {"round": game.round, "money": game.money, "population": game.population, "built": built}
@@ -0,0 +1,155 @@
+"""
+Benchmark Helpers
+Timing, environment metadata, headless game setup and JSON result output
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if GAME_DIR not in sys.path:
+    sys.path.insert(0, GAME_DIR)
+
+RESULTS_VERSION = 1
+
+
+def use_dummy_drivers():
+    """Force SDL onto its offscreen video and silent audio drivers"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def environment():
+    """
+    Collect metadata describing the machine and tree a run was made on
+
+    Returns:
+        Dictionary that is stored next to every result set
+    """
+    env = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "sdl_videodriver": os.environ.get("SDL_VIDEODRIVER"),
+    }
+    if "pygame" in sys.modules:
+        pygame = sys.modules["pygame"]
+        env["pygame"] = pygame.version.ver
+        env["sdl"] = ".".join(map(str, pygame.get_sdl_version()))
+    try:
+        env["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=GAME_DIR,
+            capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        env["git_commit"] = None
+    return env
+
+
+def time_call(func, budget=0.5, min_repeats=3, max_repeats=1000):
+    """
+    Time repeated calls of a zero-argument function
+
+    Repeats until the time budget is spent, but always at least
+    `min_repeats` times so slow cases still produce a distribution.
+
+    Args:
+        func: Callable to time
+        budget: Seconds to spend on this measurement
+        min_repeats: Minimum number of calls
+        max_repeats: Maximum number of calls
+
+    Returns:
+        Dictionary of timing statistics in milliseconds
+    """
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_repeats:
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if len(samples) >= min_repeats and time.perf_counter() >= deadline:
+            break
+    return summarize(samples)
+
+
+def summarize(samples):
+    """
+    Reduce a list of millisecond samples to summary statistics
+
+    Args:
+        samples: List of timings in milliseconds
+
+    Returns:
+        Dictionary with repeats, min, median, mean, p95 and max
+    """
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return {
+        "repeats": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": p95,
+        "max_ms": ordered[-1],
+    }
+
+
+def headless_game():
+    """
+    Create a Game that never opens a window or touches the player's files
+
+    Save and score files are redirected into a temporary directory that
+    lives as long as the returned game.
+
+    Returns:
+        A fully initialized Game instance
+    """
+    use_dummy_drivers()
+    import city_rogue
+    from consts import GRID_SIZE
+    game = city_rogue.Game(map_size=(GRID_SIZE, GRID_SIZE)).finish_loading()
+    game._bench_tmp = tempfile.TemporaryDirectory(prefix="city_rogue_bench_")
+    game.save_file = os.path.join(game._bench_tmp.name, "save.json")
+    game.score_file = os.path.join(game._bench_tmp.name, "scores.json")
+    game.high_scores = []
+    game.reset_game_data()
+    return game
+
+
+def write_results(path, suite, results, extra=None):
+    """
+    Write results as JSON
+
+    Args:
+        path: Output file path, or None/"-" for stdout
+        suite: Suite name stored in the file
+        results: List of result dictionaries
+        extra: Optional dict of suite-level parameters
+    """
+    data = {"version": RESULTS_VERSION, "suite": suite, "env": environment(),
+            "params": extra or {}, "results": results}
+    text = json.dumps(data, indent=2)
+    if not path or path == "-":
+        print(text)
+    else:
+        with open(path, "w") as f:
+            f.write(text)
+        print(f"Wrote {len(results)} results to {path}")
+
+
+def result_key(result):
+    """Identity of a result row across runs (everything except timings)"""
+    return tuple(sorted((k, json.dumps(v)) for k, v in result.items()
+                        if not k.endswith("_ms") and k not in ("repeats", "fps")))
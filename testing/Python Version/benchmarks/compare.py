@@ -0,0 +1,69 @@
+"""
+Benchmark Comparison
+Compares two result files and flags regressions
+
+Usage (from the game folder):
+    python -m benchmarks.compare baseline.json current.json --threshold 1.15
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.common import result_key
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, metric="median_ms", threshold=1.15):
+    """
+    Pair up result rows by their parameters and compute time ratios
+
+    Args:
+        baseline: Parsed baseline results file
+        current: Parsed current results file
+        metric: Timing field to compare
+        threshold: Ratio above which a row counts as a regression
+
+    Returns:
+        List of (name, params, base_ms, cur_ms, ratio, regressed) tuples
+    """
+    base_rows = {result_key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base_rows.get(result_key(r))
+        if not b or metric not in r or metric not in b:
+            continue
+        ratio = r[metric] / b[metric] if b[metric] > 0 else float("inf")
+        params = {k: v for k, v in r.items() if k in ("grid", "density", "res", "mode", "zoom", "fill", "popup", "logs")}
+        rows.append((r["name"], params, b[metric], r[metric], ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", default="median_ms")
+    parser.add_argument("--threshold", type=float, default=1.15, help="slowdown ratio that fails the run")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get("suite") != current.get("suite"):
+        print(f"Suite mismatch: {baseline.get('suite')} vs {current.get('suite')}")
+        return 2
+    rows = compare(baseline, current, args.metric, args.threshold)
+    regressions = 0
+    for name, params, b, c, ratio, bad in rows:
+        regressions += bad
+        flag = "REGRESSION" if bad else ""
+        print(f"{name:<32} {json.dumps(params):<40} {b:10.3f} -> {c:10.3f} ms  x{ratio:5.2f} {flag}")
+    print(f"{len(rows)} compared, {regressions} regressions (threshold x{args.threshold})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Renderer Benchmarks
+Times GameRenderer draw calls against offscreen surfaces under SDL's dummy driver
+
+Usage (from the game folder):
+    python -m benchmarks.render_bench --out render.json
+    python -m benchmarks.render_bench --quick
+    python -m benchmarks.render_bench --grids 30 256 1024 --zooms 0.02 0.1 0.25 0.5 1
+    python -m benchmarks.render_bench --modes Native Scaled Smooth
+"""
+
+import argparse
+import itertools
+
+from benchmarks.common import headless_game, time_call, write_results
+from benchmarks.cities import make_city
+from consts import RENDER_MODES
+
+DEFAULT_ZOOMS = [0.1, 0.25, 0.4, 0.5, 1.0, 2.0]  # Covers every level of detail
+DEFAULT_GRIDS = [30]
+DEFAULT_DENSITIES = [0.0, 0.4, 0.8]
+POPUP_STATES = ["none", "queue", "building"]
+DEFAULT_LOG_LENGTHS = [5, 500]
+
+
+def set_popup(game, state):
+    """
+    Put the game into one of the popup states drawn by draw_game
+
+    Args:
+        game: Headless game instance
+        state: "none", "queue" (modal event popup) or "building" (upgrade/sell box)
+    """
+    game.popup_queue = []
+    game.popup_active = False
+    if state == "queue":
+        game.popup_queue.append(("⚠ Benchmark", "Modal popup drawn over the map", (150, 50, 200)))
+    elif state == "building":
+        anchor = next(iter(game.build_mgr.anchors), None)
+        if anchor:
+            game.popup_active = True
+            game.popup_coords = anchor
+
+
+def fill_logs(game, count):
+    """Replace the event log with `count` entries"""
+    game.event_log.clear()
+    for i in range(count):
+        game.log(f"Round {i}: +{i * 7 % 300}💰 | En: {i % 13 - 6:+}⚡", (50, 200, 200))
+
+
+def centre_camera(game, zoom):
+    """Point the camera at the middle of the map at the given zoom"""
+    from consts import TILE_SIZE
+    w, h = game.screen.get_size()
+    game.zoom = zoom
+    game.cam_x = game.grid_w * TILE_SIZE / 2 - (w - 280) / (2 * zoom)
+    game.cam_y = game.grid_h * TILE_SIZE / 2 - h / (2 * zoom)
+
+
+def use_resolution(game, res, mode="Native"):
+    """Swap the game onto an offscreen window of the given size and render mode"""
+    import pygame
+    game.window = pygame.Surface(res)
+    game.current_res = res
+    game.render_mode = mode
+    game.setup_render_target()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="City Rogue headless renderer benchmarks")
+    parser.add_argument("--zooms", type=float, nargs="+", default=DEFAULT_ZOOMS)
+    parser.add_argument("--modes", nargs="+", default=["Native"], choices=RENDER_MODES, help="render modes to sweep")
+    parser.add_argument("--grids", type=int, nargs="+", default=DEFAULT_GRIDS, help="square map sizes to sweep")
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("--popups", nargs="+", default=POPUP_STATES, choices=POPUP_STATES)
+    parser.add_argument("--logs", type=int, nargs="+", default=DEFAULT_LOG_LENGTHS, help="log lengths to sweep")
+    parser.add_argument("--budget", type=float, default=0.25, help="seconds per measurement")
+    parser.add_argument("--quick", action="store_true", help="small sweep for smoke runs")
+    parser.add_argument("--out", default="-", help="output JSON path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.zooms = [1.0, 0.1]; args.densities = [0.4]; args.popups = ["none"]; args.logs = [5]; args.budget = 0.05
+
+    game = headless_game()
+    game.high_scores = [{"score": 9000 - i * 500, "status": "Victory", "date": "2026-01-01 12:00"} for i in range(5)]
+    results = []
+
+    for res, mode in itertools.product(game.resolutions, args.modes):
+        use_resolution(game, res, mode)
+        r = game.renderer
+        base = {"res": list(res), "mode": mode}
+
+        def add(name, stats, **params):
+            row = dict(base, name=name, **params)
+            row.update(stats)
+            row["fps"] = 1000.0 / stats["median_ms"] if stats["median_ms"] > 0 else None
+            results.append(row)
+
+        add("present", time_call(game.present, args.budget))
+        add("draw_menu", time_call(lambda: r.draw_menu(game), args.budget))
+        add("draw_relic_screen", time_call(lambda: r.draw_relic_screen(game), args.budget))
+        add("draw_settings", time_call(lambda: r.draw_settings(game), args.budget))
+        game.win = True
+        add("draw_gameover", time_call(lambda: r.draw_gameover(game), args.budget))
+
+        for grid, density in itertools.product(args.grids, args.densities):
+            game.map_size = (grid, grid)
+            make_city(game, density, seed=7)
+            for zoom, popup, logs in itertools.product(args.zooms, args.popups, args.logs):
+                centre_camera(game, zoom)
+                set_popup(game, popup)
+                fill_logs(game, logs)
+                params = {"grid": grid, "density": density, "zoom": zoom, "popup": popup, "logs": logs}
+                add("draw_game", time_call(lambda: r.draw_game(game), args.budget), **params)
+                add("draw_sidebar", time_call(lambda: r.draw_sidebar(game), args.budget), **params)
+
+    write_results(args.out, "render", results,
+                  {"modes": args.modes, "grids": args.grids, "zooms": args.zooms, "densities": args.densities, "popups": args.popups,
+                   "logs": args.logs, "budget": args.budget})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Simulation Benchmarks
+Times the core simulation calls on synthetic cities and full scripted games
+
+Usage (from the game folder):
+    python -m benchmarks.sim_bench --out results.json
+    python -m benchmarks.sim_bench --quick
+"""
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks.common import headless_game, summarize, time_call, write_results
+from benchmarks.cities import make_city, play_scripted_game
+from consts import GRID_SIZE
+from game_data import MILESTONE_CONDS
+from milestones import MilestoneIndex
+from synergy_map import SynergyMap
+
+DEFAULT_SIZES = [30, 64, 128, 256, 512]
+DEFAULT_DENSITIES = [0.1, 0.4, 0.8]
+PROBE_COUNT = 200  # Anchors sampled for per-call placement/preview timings
+DEFAULT_MILESTONE_COUNTS = [10, 100, 1000, 10000]
+
+
+def bench_city(game, size, density, budget):
+    """
+    Run the micro-benchmarks against one synthetic city
+
+    Args:
+        game: Headless game instance
+        size: Map size (rows and columns)
+        density: Fraction of land covered by buildings
+        budget: Seconds per measurement
+
+    Returns:
+        List of result dictionaries
+    """
+    game.map_size = (size, size)
+    anchors = make_city(game, density, seed=size)
+    base = {"grid": size, "density": density, "buildings": len(anchors)}
+    rng = random.Random(size)
+    probes = [(rng.randrange(size), rng.randrange(size)) for _ in range(PROBE_COUNT)]
+    sampled = rng.sample(anchors, min(PROBE_COUNT, len(anchors)))
+    results = []
+
+    def add(name, stats, calls=1):
+        row = dict(base, name=name, calls_per_repeat=calls)
+        row.update(stats)
+        row["per_call_ms"] = stats["median_ms"] / calls
+        results.append(row)
+
+    add("update_road_networks", time_call(game.update_road_networks, budget))
+    add("recalc_stats", time_call(game.recalc_stats, budget))
+    add("calculate_turn_income", time_call(game.calculate_turn_income, budget))
+
+    mgr = game.build_mgr
+    for b_id in (1, 7, 8):
+        add(f"can_place_building[{b_id}]",
+            time_call(lambda: [mgr.can_place_building(r, c, b_id) for r, c in probes], budget),
+            len(probes))
+        add(f"legal_moves[{b_id}]", time_call(lambda: mgr.legal_moves(b_id), budget))
+    if sampled:
+        add("calculate_neighbor_bonus",
+            time_call(lambda: [mgr.calculate_neighbor_bonus(r, c, game.grid[r][c]) for r, c in sampled], budget),
+            len(sampled))
+    legal = [(r, c) for r, c in probes if mgr.can_place_building(r, c, 6)] or probes[:1]
+    add("predict_building_effects",
+        time_call(lambda: [mgr.predict_building_effects(r, c, 6) for r, c in legal], budget), len(legal))
+    add("synergy_map[6]", time_call(lambda: SynergyMap(mgr).for_building(6).levels(game.grid_w), budget))
+    what_if = game.what_if
+    add("what_if.evaluate_build",
+        time_call(lambda: [what_if.cache.clear()] + [what_if.evaluate_build(r, c, 6) for r, c in legal], budget),
+        len(legal))
+
+    add("fork", time_call(game.fork, budget))
+    add("save_game", time_call(game.save_game, budget))
+    add("load_game", time_call(game.load_game, budget))
+    results[-1]["save_bytes"] = os.path.getsize(game.save_file)
+    return results
+
+
+def bench_games(game, count, rounds):
+    """
+    Time complete scripted games on the classic 30x30 map
+
+    Args:
+        game: Headless game instance
+        count: Number of games (each with its own seed)
+        rounds: Rounds per game
+
+    Returns:
+        List with one result dictionary
+    """
+    game.map_size = (GRID_SIZE, GRID_SIZE)
+    samples = []
+    outcomes = []
+    for seed in range(count):
+        start = time.perf_counter()
+        outcomes.append(play_scripted_game(game, seed=seed, rounds=rounds))
+        samples.append((time.perf_counter() - start) * 1000.0)
+    row = {"name": "scripted_game", "grid": GRID_SIZE, "rounds": rounds, "games": count,
+           "final_money": [o["money"] for o in outcomes], "final_population": [o["population"] for o in outcomes]}
+    row.update(summarize(samples))
+    return [row]
+
+
+def bench_milestones(counts, budget):
+    """
+    Time one turn's milestone check against content packs of growing size
+
+    Args:
+        counts: Numbers of synthetic milestones (a quarter of them compound)
+        budget: Seconds per measurement
+
+    Returns:
+        List of result dictionaries
+    """
+    results = []
+    for count in counts:
+        rng = random.Random(count)
+        milestones = [{"id": f"m{i}", "parts": [[rng.choice(MILESTONE_CONDS), rng.randint(1, 10 ** 6)]
+                                                for _ in range(2 if i % 4 == 0 else 1)]} for i in range(count)]
+        index = MilestoneIndex(milestones)
+        values = {cond: rng.randint(0, 10 ** 6) for cond in MILESTONE_CONDS}
+        index.update(values, [])
+
+        def turn():
+            # Small drift per turn, as in play: few thresholds are crossed
+            for cond in values: values[cond] += rng.randint(-50, 60)
+            index.update(values, ())
+        row = {"name": "check_milestones", "milestones": count}
+        row.update(time_call(turn, budget))
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="City Rogue simulation benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="map sizes to sweep")
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES, help="building densities to sweep")
+    parser.add_argument("--games", type=int, default=5, help="number of scripted 20-round games")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per scripted game")
+    parser.add_argument("--milestones", type=int, nargs="+", default=DEFAULT_MILESTONE_COUNTS,
+                        help="synthetic milestone counts for the milestone check")
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds per measurement")
+    parser.add_argument("--quick", action="store_true", help="small sweep for smoke runs")
+    parser.add_argument("--out", default="-", help="output JSON path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes = [30, 64]; args.densities = [0.4]; args.games = 2; args.budget = 0.1; args.milestones = [10, 1000]
+
+    game = headless_game()
+    results = []
+    for size in args.sizes:
+        for density in args.densities:
+            results.extend(bench_city(game, size, density, args.budget))
+    results.extend(bench_games(game, args.games, args.rounds))
+    results.extend(bench_milestones(args.milestones, args.budget))
+    write_results(args.out, "simulation", results,
+                  {"sizes": args.sizes, "densities": args.densities, "budget": args.budget})
+
+
+if __name__ == "__main__":
+    main()
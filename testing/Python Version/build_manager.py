@@ -3,6 +3,48 @@ Build Manager
 Handles all building placement, upgrade, demolition, and neighbor synergy logic for City Rogue
 """
 
+from chunk_map import ChunkIndex
+from placement_masks import PlacementMasks
+from synergy_map import SynergyMap
+from consts import RED, GREEN, CYAN, GRAY
+
+# Default synergies (backward compatibility with data files that have none)
+DEFAULT_SYNERGIES = [
+    {
+        "id": "shop_residential",
+        "name": "Shop + Residential Synergy",
+        "desc": "Shops and Malls gain +15 income near Houses/Apartments",
+        "building_ids": [6, 11],
+        "neighbor_ids": [1, 5],
+        "bonus": {"money": 15}
+    },
+    {
+        "id": "park_residential",
+        "name": "Park + Residential Synergy",
+        "desc": "Parks gain +5 happiness near Houses/Apartments",
+        "building_ids": [4, 12],
+        "neighbor_ids": [1, 5],
+        "bonus": {"happy": 5}
+    },
+    {
+        "id": "office_commercial",
+        "name": "Office + Commercial Synergy",
+        "desc": "Offices gain +10 income near Shops/Malls",
+        "building_ids": [2],
+        "neighbor_ids": [6, 11],
+        "bonus": {"money": 10}
+    },
+    {
+        "id": "factory_power",
+        "name": "Factory + Power Synergy",
+        "desc": "Factories gain +20 income near Power Plants",
+        "building_ids": [10],
+        "neighbor_ids": [3],
+        "bonus": {"money": 20}
+    }
+]
+
+
 class BuildManager:
     """Manages all building-related operations and neighbor synergy bonuses"""
     
@@ -16,46 +58,13 @@ class BuildManager:
         """
         self.game = game
         self.neighbor_bonuses = {}  # Track neighbor bonuses: {(r,c): {"money": 15, "happy": 5}}
+        self.anchors = {}  # Top-left tile of every building: {(r,c): b_id}
+        self.chunk_index = ChunkIndex()  # Anchors overlapping each map chunk
+        self.tile_listeners = []  # Callables (r, c, w, h) notified when grid tiles change
+        self.masks = PlacementMasks(game)  # Legal anchors per footprint, patched on every tile change
+        self.synergy_map = SynergyMap(self)  # Synergy/connectivity layers of the selected building type
         
-        # Load synergies from parameter or use default
-        if synergies:
-            self.neighbor_synergies = synergies
-        else:
-            # Default synergies (backward compatibility)
-            self.neighbor_synergies = [
-                {
-                    "id": "shop_residential",
-                    "name": "Shop + Residential Synergy",
-                    "desc": "Shops and Malls gain +15 income near Houses/Apartments",
-                    "building_ids": [6, 11],
-                    "neighbor_ids": [1, 5],
-                    "bonus": {"money": 15}
-                },
-                {
-                    "id": "park_residential",
-                    "name": "Park + Residential Synergy",
-                    "desc": "Parks gain +5 happiness near Houses/Apartments",
-                    "building_ids": [4, 12],
-                    "neighbor_ids": [1, 5],
-                    "bonus": {"happy": 5}
-                },
-                {
-                    "id": "office_commercial",
-                    "name": "Office + Commercial Synergy",
-                    "desc": "Offices gain +10 income near Shops/Malls",
-                    "building_ids": [2],
-                    "neighbor_ids": [6, 11],
-                    "bonus": {"money": 10}
-                },
-                {
-                    "id": "factory_power",
-                    "name": "Factory + Power Synergy",
-                    "desc": "Factories gain +20 income near Power Plants",
-                    "building_ids": [10],
-                    "neighbor_ids": [3],
-                    "bonus": {"money": 20}
-                }
-            ]
+        self.neighbor_synergies = synergies or DEFAULT_SYNERGIES  # Parameter or default rules
     
     def get_neighbors_coords(self, r, c):
         """
@@ -68,15 +77,14 @@ class BuildManager:
         Returns:
             List of (row, col) tuples for valid neighbors
         """
-        from consts import GRID_SIZE
         neighbors = []
         if r > 0:
             neighbors.append((r-1, c))
-        if r < GRID_SIZE - 1:
+        if r < self.game.grid_h - 1:
             neighbors.append((r+1, c))
         if c > 0:
             neighbors.append((r, c-1))
-        if c < GRID_SIZE - 1:
+        if c < self.game.grid_w - 1:
             neighbors.append((r, c+1))
         return neighbors
     
@@ -107,7 +115,7 @@ class BuildManager:
         """
         bonuses = {}
         b = self.game.buildings[b_id]
-        w, h = b["size"]
+        w, h = b.size
         
         # Collect all neighbors for all tiles of this building
         neighbors = []
@@ -138,26 +146,20 @@ class BuildManager:
         Returns:
             Boolean indicating if placement is valid
         """
-        from consts import GRID_SIZE
-        
-        w, h = self.game.buildings[b_id]["size"]
-        
-        # Check if building fits in grid
-        if r + h > GRID_SIZE or c + w > GRID_SIZE:
-            return False
-        
-        # Check if all tiles are available
-        for dr in range(h):
-            for dc in range(w):
-                tile = self.game.grid[r + dr][c + dc]
-                if b_id == 8:  # Bridge - must be on water
-                    if tile != -1:
-                        return False
-                else:  # Other buildings - must be on empty land
-                    if tile != 0:
-                        return False
+        # Footprint in bounds and on empty land (water for bridges): one bit of the placement mask
+        return self.masks.valid(r, c, b_id)
+    
+    def legal_moves(self, b_id):
+        """
+        Get every position where a building type can be placed
         
-        return True
+        Args:
+            b_id: Building ID
+            
+        Returns:
+            List of (row, col) anchors in row-major order
+        """
+        return self.masks.legal_moves(b_id)
     
     def build(self, r, c, b_id, cost, ap_cost, play_sound_func, log_func):
         """
@@ -175,8 +177,6 @@ class BuildManager:
         Returns:
             Boolean indicating if build was successful
         """
-        from consts import RED
-        
         if self.game.money < cost:
             play_sound_func("error")
             log_func(f"Need ${cost}!", RED)
@@ -191,9 +191,8 @@ class BuildManager:
         self.game.actions -= ap_cost
         self.force_build(r, c, b_id)
         
-        from consts import GREEN
         play_sound_func("build")
-        log_func(f"Built {self.game.buildings[b_id]['name']}", GREEN)
+        log_func(f"Built {self.game.buildings[b_id].name}", GREEN)
         return True
     
     def force_build(self, r, c, b_id):
@@ -205,18 +204,40 @@ class BuildManager:
             c: Column position
             b_id: Building ID
         """
-        w, h = self.game.buildings[b_id]["size"]
+        w, h = self.game.buildings[b_id].size
         
         # Place building on grid
         for dr in range(h):
             for dc in range(w):
                 self.game.grid[r + dr][c + dc] = b_id
+        self.anchors[(r, c)] = b_id
+        self.chunk_index.add(r, c, w, h)
+        self.notify_tiles_changed(r, c, w, h)
         
         # Calculate and store neighbor bonuses
         bonus = self.calculate_neighbor_bonus(r, c, b_id)
         if bonus:
             self.neighbor_bonuses[(r, c)] = bonus
     
+    def anchor_at(self, r, c):
+        """
+        Find the building covering a tile
+        
+        Args:
+            r: Row position
+            c: Column position
+            
+        Returns:
+            (row, col) anchor of the building whose footprint contains (r, c), or None
+        """
+        if (r, c) in self.anchors:
+            return (r, c)
+        for ar, ac in self.chunk_index.anchors_in(*self.chunk_index.chunk_of(r, c)):
+            w, h = self.game.buildings[self.anchors[(ar, ac)]].size
+            if ar <= r < ar + h and ac <= c < ac + w:
+                return (ar, ac)
+        return None
+    
     def upgrade_building(self, r, c, play_sound_func, log_func):
         """
         Upgrade a building at the given position
@@ -228,18 +249,18 @@ class BuildManager:
             log_func: Function to log messages
             
         Returns:
-            Boolean indicating if upgrade was successful
+            Boolean indicating if upgrade was successful (False if (r, c) is not a building's anchor)
         """
-        from consts import CYAN
-        
-        b_id = self.game.grid[r][c]
+        b_id = self.anchors.get((r, c))
+        if b_id is None:
+            return False
         b_data = self.game.buildings[b_id]
         
-        if not b_data["upgrade_to"]:
+        if not b_data.upgrade_to:
             return False
         
-        up_id = b_data["upgrade_to"]
-        up_cost = b_data["upgrade_cost"]
+        up_id = b_data.upgrade_to
+        up_cost = b_data.upgrade_cost
         
         if self.game.money < up_cost:
             return False
@@ -248,12 +269,15 @@ class BuildManager:
         old_bonus = self.neighbor_bonuses.get((r, c), {})
         
         self.game.money -= up_cost
-        w, h = self.game.buildings[up_id]["size"]
+        w, h = self.game.buildings[up_id].size
         
         # Place upgraded building
         for dr in range(h):
             for dc in range(w):
                 self.game.grid[r + dr][c + dc] = up_id
+        self.anchors[(r, c)] = up_id
+        self.chunk_index.add(r, c, w, h)
+        self.notify_tiles_changed(r, c, w, h)
         
         # Recalculate bonuses after upgrade and merge with old ones
         new_bonus = self.calculate_neighbor_bonus(r, c, up_id)
@@ -280,17 +304,17 @@ class BuildManager:
             log_func: Function to log messages
             
         Returns:
-            Integer refund amount
+            Integer refund amount (0 if (r, c) is not a building's anchor)
         """
-        from consts import GRAY
-        
-        b_id = self.game.grid[r][c]
+        b_id = self.anchors.get((r, c))
+        if b_id is None:
+            return 0
         
         # Calculate proper refund: 50% of (building cost + all upgrade costs)
         total_cost = total_cost_func(b_id)
         refund = int(total_cost * 0.5)
         
-        w, h = self.game.buildings[b_id]["size"]
+        w, h = self.game.buildings[b_id].size
         
         # Remove building from grid
         for dr in range(h):
@@ -300,6 +324,10 @@ class BuildManager:
                 else:  # Other buildings - restore to empty
                     self.game.grid[r + dr][c + dc] = 0
         
+        self.anchors.pop((r, c), None)
+        self.chunk_index.remove(r, c, w, h)
+        self.notify_tiles_changed(r, c, w, h)
+        
         # Clear neighbor bonuses for this building
         if (r, c) in self.neighbor_bonuses:
             del self.neighbor_bonuses[(r, c)]
@@ -324,7 +352,7 @@ class BuildManager:
         """
         effects = []
         b = self.game.buildings[b_id]
-        ap_cost = b.get("ap_cost", 0)
+        ap_cost = b.ap_cost
         
         # Check action points
         if self.game.actions < ap_cost:
@@ -333,7 +361,7 @@ class BuildManager:
         # Check road connectivity
         has_neighbor = False
         neighbors = []
-        w, h = b["size"]
+        w, h = b.size
         
         for dr in range(h):
             for dc in range(w):
@@ -342,7 +370,7 @@ class BuildManager:
                         has_neighbor = True
                     neighbors.append(self.game.grid[nr][nc])
         
-        if b["needs_road"] and not has_neighbor:
+        if b.needs_road and not has_neighbor:
             effects.append("⚠ Disconnected")
         
         # Show neighbor synergy bonuses
@@ -379,6 +407,119 @@ class BuildManager:
             for k, v in bonuses_data.items()
         }
     
+    def fork(self, game):
+        """
+        Copy the placement state for a forked simulation (see CitySimulation.fork)
+        
+        Args:
+            game: The forked simulation
+            
+        Returns:
+            BuildManager sharing the synergy rules, with its own anchors and bonuses and no tile listeners
+        """
+        mgr = BuildManager.__new__(BuildManager)
+        mgr.game = game
+        mgr.neighbor_synergies = self.neighbor_synergies
+        mgr.neighbor_bonuses = dict(self.neighbor_bonuses)  # Bonus dicts are replaced, never edited in place
+        mgr.anchors = dict(self.anchors)
+        mgr.chunk_index = self.chunk_index.copy()
+        mgr.masks = self.masks.copy(game)
+        mgr.synergy_map = SynergyMap(mgr)
+        mgr.tile_listeners = []
+        return mgr
+    
+    def set_synergies(self, synergies):
+        """
+        Replace the synergy rules and re-evaluate every placed building against its current neighbors
+        (used by hot reload; bonuses carried over from earlier upgrades are recomputed, not kept)
+        
+        Args:
+            synergies: List of neighbor synergy rules (None for the defaults)
+        """
+        self.neighbor_synergies = synergies or DEFAULT_SYNERGIES
+        self.neighbor_bonuses = {}
+        for (r, c), b_id in self.anchors.items():
+            bonus = self.calculate_neighbor_bonus(r, c, b_id)
+            if bonus:
+                self.neighbor_bonuses[(r, c)] = bonus
+    
     def clear_neighbor_bonuses(self):
         """Clear all neighbor bonuses (used when resetting game)"""
         self.neighbor_bonuses = {}
+    
+    def clear_anchors(self):
+        """Forget all placed buildings (used when resetting game)"""
+        self.anchors = {}
+        self.chunk_index.clear()
+    
+    def register_anchor(self, r, c, b_id):
+        """
+        Record a building already written to the grid (used when loading)
+        
+        Args:
+            r: Anchor row
+            c: Anchor column
+            b_id: Building ID
+        """
+        w, h = self.game.buildings[b_id].size
+        self.anchors[(r, c)] = b_id
+        self.chunk_index.add(r, c, w, h)
+    
+    def add_tile_listener(self, listener):
+        """
+        Subscribe to grid changes
+        
+        Args:
+            listener: Callable taking (r, c, w, h) of the changed tile rectangle
+        """
+        if listener not in self.tile_listeners:
+            self.tile_listeners.append(listener)
+    
+    def remove_tile_listener(self, listener):
+        """Unsubscribe a listener added with add_tile_listener"""
+        if listener in self.tile_listeners:
+            self.tile_listeners.remove(listener)
+    
+    def notify_tiles_changed(self, r, c, w, h):
+        """
+        Tell all listeners that a rectangle of tiles changed
+        
+        Args:
+            r: Top row
+            c: Left column
+            w: Width in tiles
+            h: Height in tiles
+        """
+        self.masks.on_tiles_changed(r, c, w, h)
+        for listener in self.tile_listeners:
+            listener(r, c, w, h)
+    
+    def get_footprint(self, r, c, b_id):
+        """
+        Get all tiles covered by a building
+        
+        Args:
+            r: Anchor row
+            c: Anchor column
+            b_id: Building ID
+            
+        Returns:
+            List of (row, col) tuples
+        """
+        w, h = self.game.buildings[b_id].size
+        return [(r + dr, c + dc) for dr in range(h) for dc in range(w)]
+    
+    def rebuild_anchors(self):
+        """
+        Rebuild the anchor registry by scanning the grid
+        
+        Only needed for legacy saves that store the full grid; a building's
+        anchor is the first of its tiles in row-major order.
+        """
+        self.clear_anchors()
+        covered = set()
+        for r, row in enumerate(self.game.grid):
+            for c, b_id in enumerate(row):
+                if b_id > 0 and (r, c) not in covered:
+                    self.register_anchor(r, c, b_id)
+                    covered.update(self.get_footprint(r, c, b_id))
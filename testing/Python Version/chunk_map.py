@@ -0,0 +1,79 @@
+"""
+Chunk Map
+Splits the world into fixed-size square chunks and indexes buildings by the chunks they overlap
+"""
+
+from consts import CHUNK_SIZE
+
+
+class ChunkIndex:
+    """Tracks which building anchors overlap each chunk, including buildings straddling a border"""
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        """
+        Initialize the chunk index
+
+        Args:
+            chunk_size: Chunk edge length in tiles
+        """
+        self.chunk_size = chunk_size
+        self.chunks = {}  # {(cr, cc): {(r, c), ...}} anchors overlapping each chunk
+
+    def chunk_of(self, r, c):
+        """Chunk coordinates containing tile (r, c)"""
+        return r // self.chunk_size, c // self.chunk_size
+
+    def chunks_in_rect(self, r, c, w, h):
+        """
+        Get every chunk touched by a tile rectangle
+
+        Args:
+            r: Top row
+            c: Left column
+            w: Width in tiles
+            h: Height in tiles
+
+        Returns:
+            List of (chunk_row, chunk_col) tuples
+        """
+        cs = self.chunk_size
+        return [(cr, cc)
+                for cr in range(r // cs, (r + h - 1) // cs + 1)
+                for cc in range(c // cs, (c + w - 1) // cs + 1)]
+
+    def add(self, r, c, w, h):
+        """Register a building anchored at (r, c) with a w x h footprint"""
+        for key in self.chunks_in_rect(r, c, w, h):
+            self.chunks.setdefault(key, set()).add((r, c))
+
+    def remove(self, r, c, w, h):
+        """Unregister a building anchored at (r, c) with a w x h footprint"""
+        for key in self.chunks_in_rect(r, c, w, h):
+            anchors = self.chunks.get(key)
+            if anchors:
+                anchors.discard((r, c))
+                if not anchors:
+                    del self.chunks[key]
+
+    def anchors_in(self, cr, cc):
+        """
+        Get anchors of all buildings overlapping a chunk
+
+        Args:
+            cr: Chunk row
+            cc: Chunk column
+
+        Returns:
+            Set of (row, col) anchors (empty set if none)
+        """
+        return self.chunks.get((cr, cc), ())
+
+    def copy(self):
+        """Independent index with the same buildings"""
+        index = ChunkIndex(self.chunk_size)
+        index.chunks = {key: set(anchors) for key, anchors in self.chunks.items()}
+        return index
+
+    def clear(self):
+        """Forget all buildings"""
+        self.chunks = {}
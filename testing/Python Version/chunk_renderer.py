@@ -0,0 +1,210 @@
+"""
+Chunk Renderer
+Caches one pre-rendered surface per map chunk so drawing the map is one blit per visible chunk
+"""
+
+from collections import OrderedDict
+
+import pygame
+from consts import *
+
+
+class ChunkRenderer:
+    """Builds, caches and invalidates per-chunk map surfaces"""
+
+    def __init__(self, renderer, max_chunks=96):
+        """
+        Initialize the chunk cache
+
+        Args:
+            renderer: Owning GameRenderer (provides fonts)
+            max_chunks: Cached surfaces kept before least recently used ones are dropped
+        """
+        self.renderer = renderer
+        self.max_chunks = max_chunks
+        self.cache = OrderedDict()  # {(cr, cc): Surface} at the current tile size
+        self.tile_px = None
+        self.lod = None  # Detail level the cache was built for (see GameRenderer.lod_level)
+        self.map_key = None  # (grid_w, grid_h) the cache was built for
+        self.stats_version = None
+        self.prev_active_roads = set()
+        self.prev_invalid = set()
+        self.build_mgr = None
+
+    # --- Invalidation ---
+    def attach(self, game):
+        """Subscribe to grid changes of the game's BuildManager (re-attaches after a reload)"""
+        if self.build_mgr is game.build_mgr:
+            return
+        if self.build_mgr:
+            self.build_mgr.remove_tile_listener(self.on_tiles_changed)
+        self.build_mgr = game.build_mgr
+        self.build_mgr.add_tile_listener(self.on_tiles_changed)
+        self.invalidate_all()
+
+    def detach(self):
+        """Stop listening for grid changes (call before dropping the renderer)"""
+        if self.build_mgr:
+            self.build_mgr.remove_tile_listener(self.on_tiles_changed)
+            self.build_mgr = None
+
+    def invalidate_all(self):
+        """Drop every cached chunk"""
+        self.cache.clear()
+
+    def on_tiles_changed(self, r, c, w, h):
+        """Tile listener: drop every chunk touched by the changed rectangle"""
+        if self.build_mgr is None:
+            return
+        index = self.build_mgr.chunk_index
+        if w * h > 4 * index.chunk_size ** 2:
+            self.invalidate_all()  # Map-sized change (reset/load): cheaper to drop everything
+            return
+        for key in index.chunks_in_rect(r, c, w, h):
+            self.cache.pop(key, None)
+
+    def invalidate_tiles(self, tiles):
+        """Drop chunks containing any of the given (r, c) tiles"""
+        index = self.build_mgr.chunk_index
+        for r, c in tiles:
+            self.cache.pop(index.chunk_of(r, c), None)
+
+    def sync_stats(self, game):
+        """
+        Invalidate chunks whose look depends on road networks that changed
+
+        Road tiles switch colour when their island becomes active and
+        buildings get a "!" marker when disconnected, so after each
+        recalculation only the tiles whose state flipped are redrawn.
+        """
+        if self.stats_version == game.stats_version:
+            return
+        self.stats_version = game.stats_version
+        invalid = set()
+        for (r, c), b_id in game.build_mgr.anchors.items():
+            b = game.buildings[b_id]
+            if b.needs_road:
+                iid = game.get_building_island_id(r, c)
+                if not (iid and game.island_stats[iid]["active"]):
+                    invalid.add((r, c))
+        self.invalidate_tiles(self.prev_active_roads ^ game.active_road_tiles)
+        self.invalidate_tiles(self.prev_invalid ^ invalid)
+        self.prev_active_roads = set(game.active_road_tiles)
+        self.prev_invalid = invalid
+
+    # --- Drawing ---
+    def draw(self, game, screen, map_rect, lod=0):
+        """
+        Blit every visible chunk, rebuilding missing ones
+
+        Args:
+            game: Game instance
+            screen: Target surface (clipped to the map area by the caller)
+            map_rect: Screen rectangle of the map viewport
+            lod: Detail level (0 = icons, 1 = grid lines, 2 = solid blocks)
+        """
+        self.attach(game)
+        map_key = (game.grid_w, game.grid_h)
+        tile_px = max(1, round(TILE_SIZE * game.zoom))
+        if map_key != self.map_key or tile_px != self.tile_px or lod != self.lod:
+            self.map_key = map_key
+            self.tile_px = tile_px
+            self.lod = lod
+            self.invalidate_all()
+        self.sync_stats(game)
+
+        cs = self.build_mgr.chunk_index.chunk_size
+        world_chunk = cs * TILE_SIZE
+        view_w = map_rect.width / game.zoom
+        view_h = map_rect.height / game.zoom
+        c0 = max(0, int(game.cam_x // world_chunk))
+        r0 = max(0, int(game.cam_y // world_chunk))
+        c1 = min((game.grid_w - 1) // cs, int((game.cam_x + view_w) // world_chunk))
+        r1 = min((game.grid_h - 1) // cs, int((game.cam_y + view_h) // world_chunk))
+
+        visible = (r1 - r0 + 1) * (c1 - c0 + 1)
+        limit = max(self.max_chunks, visible * 2)
+        for cr in range(r0, r1 + 1):
+            for cc in range(c0, c1 + 1):
+                key = (cr, cc)
+                surf = self.cache.get(key)
+                if surf is None:
+                    surf = self.build_chunk(game, cr, cc)
+                    self.cache[key] = surf
+                else:
+                    self.cache.move_to_end(key)
+                sx = (cc * world_chunk - game.cam_x) * game.zoom
+                sy = (cr * world_chunk - game.cam_y) * game.zoom
+                screen.blit(surf, (round(sx), round(sy)))
+        while len(self.cache) > limit:
+            self.cache.popitem(last=False)
+
+    def build_chunk(self, game, cr, cc):
+        """
+        Render one chunk (terrain and every building overlapping it)
+
+        Args:
+            game: Game instance
+            cr: Chunk row
+            cc: Chunk column
+
+        Returns:
+            The rendered Surface
+        """
+        cs = self.build_mgr.chunk_index.chunk_size
+        tp = self.tile_px
+        surf = pygame.Surface((cs * tp, cs * tp))
+        surf.fill((20, 20, 30))
+        r_base, c_base = cr * cs, cc * cs
+
+        r_end, c_end = min(r_base + cs, game.grid_h), min(c_base + cs, game.grid_w)
+        grid_lines = self.lod <= 1
+
+        with game.profiler.phase("terrain"):
+            if grid_lines:
+                for r in range(r_base, r_end):
+                    row = game.grid[r]
+                    y = (r - r_base) * tp
+                    for c in range(c_base, c_end):
+                        rect = ((c - c_base) * tp, y, tp, tp)
+                        pygame.draw.rect(surf, RIVER_BLUE if row[c] == -1 else (30, 30, 30), rect)
+                        pygame.draw.rect(surf, (50, 50, 50), rect, 1)
+            else:
+                # One fill for the land, one per horizontal run of water
+                surf.fill((30, 30, 30), (0, 0, (c_end - c_base) * tp, (r_end - r_base) * tp))
+                for r in range(r_base, r_end):
+                    row = game.grid[r]
+                    y = (r - r_base) * tp
+                    c = c_base
+                    while c < c_end:
+                        if row[c] != -1:
+                            c += 1; continue
+                        start = c
+                        while c < c_end and row[c] == -1: c += 1
+                        surf.fill(RIVER_BLUE, ((start - c_base) * tp, y, (c - start) * tp, tp))
+
+        with game.profiler.phase("buildings"):
+            font = self.renderer.font
+            glyphs = self.renderer.glyphs
+            for (r, c) in self.build_mgr.chunk_index.anchors_in(cr, cc):
+                b_id = game.grid[r][c]
+                b = game.buildings[b_id]
+                bw, bh = b.size
+                b_rect = pygame.Rect((c - c_base) * tp, (r - r_base) * tp, tp * bw, tp * bh)
+
+                col = b.color
+                if b_id in [7, 8]: # Road/Bridge
+                    if (r, c) in game.active_road_tiles:
+                        col = ROAD_ACTIVE
+                        if b_id == 8: col = BRIDGE_COL # Use Bridge Color
+                    else:
+                        col = ROAD_INACTIVE
+
+                pygame.draw.rect(surf, col, b_rect.inflate(-2, -2) if grid_lines else b_rect)
+                if self.lod == 0:
+                    glyphs.blit(surf, b.symbol, center=b_rect.center)
+
+                if (r, c) in self.prev_invalid:
+                    if grid_lines: surf.blit(font.render("!", True, RED), b_rect.topleft)
+                    else: surf.fill(RED, (b_rect.x, b_rect.y, max(2, tp // 3), max(2, tp // 3)))
+        return surf
@@ -0,0 +1,502 @@
+"""
+City Simulation
+Game state, rules and persistence of City Rogue without any display, input or sound (no pygame import)
+"""
+
+import random
+import json
+import os
+import sys
+import time
+import zlib
+import base64
+from array import array
+from collections import deque
+from datetime import datetime
+from consts import *
+from event_log_manager import EventLogManager
+from build_manager import BuildManager
+from frame_profiler import FrameProfiler
+from modifiers import ModifierStack
+from milestones import MilestoneIndex
+from event_deck import EventDeck
+from timed_effects import TimedEffects
+from what_if import DeltaEvaluator
+import economy
+import game_data
+
+def read_game_data():
+    """Load the compiled game data (runs on a loader thread; exits on a missing or broken file like before)"""
+    if not os.path.exists(DATA_FILE):
+        print(f"CRITICAL: {DATA_FILE} not found!"); sys.exit()
+    try:
+        return game_data.load(DATA_FILE)
+    except Exception as e:
+        print(f"Error loading data: {e}"); sys.exit()
+
+# State a fork shares with its parent: immutable data, scalars, and the road-network results,
+# which are always replaced as a whole (update_road_networks), never edited in place
+FORK_SHARED = ("map_size", "profiler", "stats_version", "state", "difficulty", "relic", "data", "buildings",
+               "building_table", "relics", "events", "milestones_data", "toolbar", "grid_w", "grid_h",
+               "water_tiles", "water_blob", "network_map", "island_stats", "active_road_tiles", "active_buildings",
+               "money", "actions", "max_actions", "energy", "population", "jobs_total", "happiness", "round",
+               "game_over", "win", "selected_building", "popup_active", "popup_coords", "prev_pop", "prev_happy",
+               "prev_energy", "total_income")
+
+class CitySimulation:
+    """Headless city: map, buildings, economy, events, milestones, saves and high scores"""
+
+    def __init__(self, map_size=None, data=None):
+        """
+        Initialize an empty simulation
+
+        Args:
+            map_size: (width, height) of new maps (default: the smallest map size)
+            data: Compiled GameData (see read_game_data); when given it is applied and a first map is generated
+        """
+        self.save_file = None; self.score_file = None # No files unless a front end sets them (Game uses SAVE_FILE/SCORE_FILE)
+        self.map_size = tuple(map_size) if map_size else MAP_SIZES[0]
+        self.profiler = FrameProfiler() # Disabled unless a front end turns it on; phases cost nothing then
+        self.stats_version = 0 # Bumped whenever road networks are recomputed
+        self.event_log = EventLogManager(max_log_lines=5)
+        self.build_mgr = None  # Will be initialized after loading game data
+        self.buildings = None
+        self.state = STATE_MENU
+        self.difficulty = "Normal"
+        self.relic = None
+        self.active_events = []
+        self.timed_effects = TimedEffects() # Expiry rounds of active events that have a duration
+        self.modifiers = ModifierStack() # Cost/income/pop/happy tables for the relic and active events
+        self.what_if = DeltaEvaluator(self) # Exact build/upgrade/sale previews
+        self.high_scores = []
+        self.popup_queue = []
+        if data is not None:
+            self.apply_game_data(data)
+            self.reset_game_data()
+
+    def fork(self):
+        """
+        Cheap independent copy of the game state for bots, advisors and what-if previews
+
+        Shares the compiled data and everything that is replaced rather than edited; copies only
+        the mutable planes (grid rows, anchors, bonuses, event and milestone state). The fork is
+        always a headless CitySimulation (no window or sounds), starts with an empty log and
+        never writes saves or high scores.
+
+        Returns:
+            CitySimulation
+        """
+        sim = CitySimulation.__new__(CitySimulation)
+        d = self.__dict__
+        sim.__dict__.update({name: d[name] for name in FORK_SHARED})
+        sim.save_file = None; sim.score_file = None
+        sim.event_log = EventLogManager(max_log_lines=5)
+        sim.grid = [row[:] for row in self.grid]
+        sim.build_mgr = self.build_mgr.fork(sim)
+        sim.active_events = list(self.active_events)
+        sim.modifiers = self.modifiers.copy(sim.active_events if self.modifiers.events is self.active_events else None)
+        sim.timed_effects = self.timed_effects.copy()
+        sim.event_deck = self.event_deck.copy()
+        sim.milestone_index = self.milestone_index.copy()
+        sim.drawn_event_ids = list(self.drawn_event_ids); sim.unlocked_milestones = list(self.unlocked_milestones)
+        sim.popup_queue = list(self.popup_queue); sim.high_scores = list(self.high_scores)
+        sim.what_if = DeltaEvaluator(sim)
+        return sim
+
+    def play_sound(self, name):
+        """Sound hook for rule code; the headless simulation is silent"""
+
+    def load_game_data(self):
+        self.apply_game_data(read_game_data())
+
+    def apply_game_data(self, data):
+        self.data = data
+        self.buildings = data.buildings # {b_id: Building}
+        self.building_table = data.table # Same records indexed by id, for hot loops
+        self.relics = data.relics
+        self.events = data.events
+        self.event_deck = EventDeck(data.events)
+        self.milestones_data = data.milestones
+        self.milestone_index = MilestoneIndex(data.milestones)
+        self.toolbar = data.toolbar
+        
+        # Initialize BuildManager with synergies from game data
+        self.build_mgr = BuildManager(self, synergies=data.synergies)
+
+    def reload_game_data(self, data, changed):
+        """
+        Swap recompiled game data into a running game, keeping the map and the build manager
+
+        Args:
+            data: GameData from game_data.reload
+            changed: Section names that were recompiled
+
+        Returns:
+            False (nothing swapped) if placed buildings were removed or resized, True otherwise
+        """
+        if "buildings" in changed and self.build_mgr.anchors:
+            for b_id in set(self.build_mgr.anchors.values()):
+                new = data.buildings.get(b_id)
+                if new is None or new.size != self.buildings[b_id].size:
+                    self.log(f"Reload rejected: building {b_id} is on the map", RED); return False
+        self.data = data
+        self.buildings = data.buildings; self.building_table = data.table
+        self.relics = data.relics; self.events = data.events
+        self.milestones_data = data.milestones; self.toolbar = data.toolbar
+        if "milestones" in changed: self.milestone_index = MilestoneIndex(data.milestones)
+        if self.relic:
+            self.relic = next((r for r in self.relics if r["id"] == self.relic["id"]), self.relic)
+        by_id = {e["id"]: e for e in self.events}
+        self.active_events = [by_id.get(e["id"], e) for e in self.active_events]
+        if "events" in changed:
+            cooldowns = self.event_deck.cooldowns()
+            self.event_deck = EventDeck(data.events); self.event_deck.reset(self.drawn_event_ids, cooldowns)
+        if changed & {"buildings", "neighbor_synergies"}:
+            self.build_mgr.set_synergies(data.synergies)
+        if "buildings" in changed:
+            self.build_mgr.notify_tiles_changed(0, 0, self.grid_w, self.grid_h) # Colours and symbols
+        self.recalc_stats()
+        return True
+
+    def hot_reload(self):
+        """Recompile the edited sections of the data file and apply them, logging the outcome"""
+        t0 = time.perf_counter()
+        try:
+            data, changed = game_data.reload(self.data, DATA_FILE)
+        except Exception as e:
+            self.log(f"Reload failed: {str(e).splitlines()[0]}", RED); print(f"Reload failed: {e}"); return False
+        if not changed or not self.reload_game_data(data, changed): return False
+        self.log(f"Reloaded {', '.join(sorted(changed))} in {(time.perf_counter() - t0) * 1000:.0f} ms", CYAN)
+        return True
+
+    def load_scores(self):
+        if not self.score_file or not os.path.exists(self.score_file): return []
+        try:
+            with open(self.score_file, "r") as f: return json.load(f)
+        except: return []
+
+    def save_high_score(self):
+        score = int(max(0, self.money) + (self.population * 10) + (self.happiness * 5) + (self.round * 20))
+        entry = {"score": score, "status": "Victory" if self.win else f"Round {self.round}", "date": datetime.now().strftime("%Y-%m-%d %H:%M")}
+        self.high_scores.append(entry)
+        self.high_scores.sort(key=lambda x: x["score"], reverse=True)
+        self.high_scores = self.high_scores[:5]
+        if not self.score_file: return # Headless sims and forks keep scores in memory
+        try:
+            with open(self.score_file, "w") as f: json.dump(self.high_scores, f)
+        except: pass
+
+    def save_game(self, path=None):
+        if not (path or self.save_file): return # Headless sims and forks do not save
+        serial_logs = [(t, list(c)) for t, c in self.event_log.get_all_logs()]
+        rid = self.relic["id"] if self.relic else None
+        nb = self.build_mgr.get_all_neighbor_bonuses()
+        data = { "save_version": 2, "grid_size": [self.grid_w, self.grid_h],
+                 "water": self.encode_water(), "buildings": [[r, c, b] for (r, c), b in self.build_mgr.anchors.items()],
+                 "money": self.money, "actions": self.actions, "max_actions": self.max_actions,
+                 "energy": self.energy, "round": self.round, "difficulty": self.difficulty, 
+                 "active_events": self.active_events, "logs": serial_logs, 
+                 "relic_id": rid, "unlocked_milestones": self.unlocked_milestones, "total_income": self.total_income, "drawn_event_ids": self.drawn_event_ids, "event_cooldowns": self.event_deck.cooldowns(),
+                 "timed_effects": self.timed_effects.entries(),
+                 "neighbor_bonuses": {f"{k[0]},{k[1]}": v for k, v in nb.items()} }
+        try:
+            with open(path or self.save_file, "w") as f: f.write(json.dumps(data)) # dumps uses the C encoder
+        except: pass
+
+    def load_game(self, path=None):
+        path = path or self.save_file
+        if not path or not os.path.exists(path): return
+        try:
+            with open(path, "r") as f: data = json.load(f)
+            self.load_map(data); self.money = data["money"]
+            self.actions = data.get("actions", 3); self.max_actions = data.get("max_actions", 3)
+            self.energy = data["energy"]; self.round = data["round"]; self.difficulty = data["difficulty"]
+            by_id = {e["id"]: e for e in self.events} # Current definitions; saved copies only for removed events
+            self.active_events = [by_id.get(e.get("id"), e) for e in data["active_events"]]
+            self.event_log.load_logs(data["logs"])
+            rid = data.get("relic_id")
+            if rid:
+                for r in self.relics: 
+                    if r["id"] == rid: self.relic = r
+            self.unlocked_milestones = data.get("unlocked_milestones", []); self.total_income = data.get("total_income", 0)
+            self.milestone_index.reset()
+            self.drawn_event_ids = data.get("drawn_event_ids", [])
+            self.event_deck.reset(self.drawn_event_ids, data.get("event_cooldowns"))
+            self.timed_effects.load(data.get("timed_effects"))
+            nb_data = data.get("neighbor_bonuses", {})
+            self.build_mgr.load_neighbor_bonuses(nb_data)
+            self.build_mgr.notify_tiles_changed(0, 0, self.grid_w, self.grid_h)
+            self.recalc_stats(); self.state = STATE_GAME; self.log("Game Loaded.", GREEN)
+        except: self.reset_game_data()
+
+    def load_map(self, data):
+        """Rebuild grid, water and anchors from save data (sparse v2 or legacy full grid)"""
+        if "grid" in data: # Legacy saves: full nested grid
+            rows = data["grid"]
+            self.new_grid(len(rows[0]), len(rows))
+            for r, row in enumerate(rows): self.grid[r] = array('b', row)
+            self.water_tiles = {(r, c) for r, row in enumerate(rows) for c, t in enumerate(row) if t == -1 or t == 8}
+            self.build_mgr.rebuild_anchors()
+            return
+        w, h = data["grid_size"]
+        self.new_grid(w, h)
+        self.water_tiles = self.decode_water(data["water"], w, h)
+        for r, c in self.water_tiles: self.grid[r][c] = -1
+        for r, c, b_id in data["buildings"]:
+            bw, bh = self.buildings[b_id].size
+            for dr in range(bh):
+                for dc in range(bw): self.grid[r+dr][c+dc] = b_id
+            self.build_mgr.register_anchor(r, c, b_id)
+
+    def encode_water(self):
+        """Water tiles as a zlib-compressed base64 bitmap; terrain never changes mid-game, so it is cached"""
+        if self.water_blob is None:
+            bits = bytearray((self.grid_w * self.grid_h + 7) // 8)
+            for r, c in self.water_tiles:
+                i = r * self.grid_w + c; bits[i >> 3] |= 1 << (i & 7)
+            self.water_blob = base64.b64encode(zlib.compress(bytes(bits))).decode("ascii")
+        return self.water_blob
+
+    def decode_water(self, blob, w, h):
+        bits = zlib.decompress(base64.b64decode(blob))
+        self.water_blob = blob
+        return {divmod(i * 8 + b, w) for i, byte in enumerate(bits) if byte for b in range(8) if byte >> b & 1 and i * 8 + b < w * h}
+
+    def delete_save(self):
+        if self.save_file and os.path.exists(self.save_file): os.remove(self.save_file)
+
+    def new_grid(self, w, h):
+        """Allocate an empty w x h map (one signed byte per tile)"""
+        self.grid_w = max(GRID_SIZE, min(MAX_GRID_SIZE, int(w)))
+        self.grid_h = max(GRID_SIZE, min(MAX_GRID_SIZE, int(h)))
+        blank = bytes(self.grid_w)
+        self.grid = [array('b', blank) for _ in range(self.grid_h)]
+        self.water_tiles = set(); self.water_blob = None
+        self.network_map = {}; self.island_stats = {}; self.active_road_tiles = set(); self.active_buildings = set()
+        if self.build_mgr:
+            self.build_mgr.clear_neighbor_bonuses(); self.build_mgr.clear_anchors()
+
+    def reset_game_data(self):
+        self.new_grid(*self.map_size)
+        self.unlocked_milestones = []; self.drawn_event_ids = []; self.total_income = 0
+        self.event_deck.reset(); self.timed_effects.clear()
+        self.milestone_index.reset()
+        self.generate_river()
+        self.money = 500 if self.difficulty == "Normal" else 350
+        self.actions = 3; self.max_actions = 3
+        self.energy = 10; self.population = 0; self.jobs_total = 0; self.happiness = 60
+        self.round = 1; self.game_over = False; self.win = False
+        self.selected_building = 1; self.relic = None
+        self.popup_queue = []; self.active_events = []
+        self.popup_active = False; self.popup_coords = (-1, -1)
+        self.event_log.clear()
+        self.prev_pop = 0; self.prev_happy = 60; self.prev_energy = 10
+        self.log("Welcome Mayor!", WHITE)
+        self.build_mgr.notify_tiles_changed(0, 0, self.grid_w, self.grid_h)
+        self.recalc_stats()
+
+    # --- LOGIC HELPERS ---
+
+    def generate_river(self):
+        # Two rivers per GRID_SIZE rows keeps water density constant on big maps
+        for _ in range(max(2, round(2 * self.grid_h / GRID_SIZE))):
+            r, c = random.randint(0, self.grid_h-1), 0
+            self.grid[r][c] = -1; self.water_tiles.add((r, c))
+            while c < self.grid_w - 1:
+                move = random.choice([(0, 1), (0, 1), (-1, 0), (1, 0)]) 
+                r += move[0]; c += move[1]
+                if 0 <= r < self.grid_h and 0 <= c < self.grid_w: self.grid[r][c] = -1; self.water_tiles.add((r, c))
+                else: break
+
+    def log(self, text, color=WHITE):
+        """Log a message using EventLogManager"""
+        self.event_log.log(text, color)
+
+    def modifier_tables(self):
+        """Building values with the relic and active events applied (recompiled only when those change)"""
+        return self.modifiers.sync(self.building_table, self.relic, self.active_events)
+
+    def get_cost(self, b_id):
+        return self.modifier_tables().cost[b_id]
+
+    def get_building_total_cost(self, b_id):
+        """Total paid for a building: current cost of every building in its upgrade chain plus the upgrade costs"""
+        return self.modifier_tables().refund[b_id]
+
+    def choose_relic(self, relic):
+        """Start a run with a relic: starting money and the buildings it places around the map centre"""
+        self.relic = relic; self.money = relic.get("start_money", 500)
+        r0, c0 = self.grid_h // 2, self.grid_w // 2
+        for dr, dc, b_id in relic.get("start_buildings", []): self.force_build(r0 + dr, c0 + dc, b_id)
+        self.log(f"Relic: {relic['name']}", tuple(relic["color"])); self.recalc_stats()
+
+    def update_road_networks(self):
+        # Flood fill from building anchors only, so cost scales with buildings, not map area
+        self.network_map = {} 
+        self.island_stats = {}
+        self.active_road_tiles = set()
+        self.active_buildings = set()
+        self.stats_version += 1
+        anchors = self.build_mgr.anchors
+        mt = self.modifier_tables(); table = self.building_table; nb_bonuses = self.build_mgr.neighbor_bonuses
+        nid = 1
+        for (r, c) in anchors:
+            if (r, c) in self.network_map: continue
+            q = deque([(r, c)]); self.network_map[(r, c)] = nid
+            while q:
+                curr_r, curr_c = q.popleft()
+                for nr, nc in self.build_mgr.get_neighbors_coords(curr_r, curr_c):
+                    if self.grid[nr][nc] > 0 and (nr, nc) not in self.network_map:
+                        self.network_map[(nr, nc)] = nid; q.append((nr, nc))
+            nid += 1
+        for (r, c), b_id in anchors.items():
+            iid = self.network_map.get((r,c))
+            if not iid: continue
+            if iid not in self.island_stats: self.island_stats[iid] = economy.new_island()
+            economy.add_building(self.island_stats[iid], (r, c), table[b_id], mt, nb_bonuses.get((r, c)))
+        for coord, iid in self.network_map.items():
+            if self.grid[coord[0]][coord[1]] in [7, 8]:
+                if self.island_stats[iid]["active"]: self.active_road_tiles.add(coord)
+            else: self.active_buildings.add(coord)
+
+    def get_building_island_id(self, r, c):
+        return self.network_map.get((r,c))
+
+    def can_place_building(self, r, c, b_id):
+        """Check if building can be placed - delegates to BuildManager"""
+        return self.build_mgr.can_place_building(r, c, b_id)
+
+    def legal_moves(self, b_id):
+        """Every legal anchor of a building type - delegates to BuildManager"""
+        return self.build_mgr.legal_moves(b_id)
+
+    def synergy_map(self, b_id):
+        """Whole-map synergy and connectivity layers of a building type - delegates to BuildManager"""
+        return self.build_mgr.synergy_map.for_building(b_id)
+
+    def build(self, r, c):
+        """Build a building - delegates to BuildManager"""
+        b_id = self.selected_building
+        cost = self.get_cost(b_id)
+        ap_cost = self.buildings[b_id].ap_cost
+        success = self.build_mgr.build(r, c, b_id, cost, ap_cost, self.play_sound, self.log)
+        if success:
+            self.recalc_stats()
+
+    def force_build(self, r, c, b_id):
+        """Force build without cost checks - delegates to BuildManager"""
+        self.build_mgr.force_build(r, c, b_id)
+        self.recalc_stats()
+
+    def upgrade_building(self):
+        """Upgrade a building - delegates to BuildManager"""
+        r, c = self.popup_coords
+        success = self.build_mgr.upgrade_building(r, c, self.play_sound, self.log)
+        if success:
+            self.recalc_stats()
+            self.popup_active = False
+
+    def demolish_building(self):
+        """Demolish a building - delegates to BuildManager"""
+        r, c = self.popup_coords
+        self.build_mgr.demolish_building(r, c, self.get_building_total_cost, self.play_sound, self.log)
+        self.popup_active = False
+        self.recalc_stats()
+
+    def recalc_stats(self):
+        with self.profiler.phase("recalc_stats"):
+            self._recalc_stats()
+
+    def _recalc_stats(self):
+        self.update_road_networks()
+        total_pop = 0; total_jobs = 0; raw_happy = 50 + self.modifier_tables().happy_flat
+        for istats in self.island_stats.values():
+            pop, jobs, happy = economy.island_people(istats)
+            total_pop += pop; total_jobs += jobs; raw_happy += happy
+        self.population = total_pop; self.jobs_total = total_jobs; self.happiness = max(0, min(100, raw_happy))
+
+    def calculate_turn_income(self):
+        # Per-island sums (see economy.py); the what-if evaluator uses the same ones
+        islands = self.island_stats.values()
+        money_change = economy.city_income(islands, economy.happy_mult(self.happiness))
+        return money_change, economy.city_energy(islands) + int(self.modifier_tables().energy_flat)
+
+    def predict_building_effects(self, r, c, b_id):
+        """Predict building effects - delegates to BuildManager"""
+        return self.build_mgr.predict_building_effects(r, c, b_id)
+
+    def event_actions(self, event):
+        """Max-action change of an event (applied when it is drawn, undone when it expires)"""
+        return int(sum(e["val"] for e in game_data.event_effects(event) if e["stat"] == "actions"))
+
+    def expire_events(self):
+        """End the timed events that are due this round; untimed events stay for the rest of the run"""
+        ended = self.timed_effects.due(self.round)
+        if not ended: return
+        active = list(self.active_events)
+        for e_id in ended:
+            i = next((i for i, e in enumerate(active) if e["id"] == e_id), None)
+            if i is None: continue
+            event = active.pop(i)
+            self.max_actions -= self.event_actions(event)
+            self.log(f"Event over: {event['name']}", GRAY)
+        self.active_events = active # New list, so the modifier tables are recompiled
+        self.recalc_stats()
+
+    def event_metrics(self):
+        return {"round": self.round, "money": self.money, "pop": self.population, "happy": self.happiness,
+                "energy": self.energy, "buildings": len(self.build_mgr.anchors)}
+
+    def milestone_metrics(self, income):
+        return {"income": income, "pop": self.population, "happy": self.happiness, "money": self.money,
+                "energy": self.energy, "total_income": self.total_income}
+
+    def check_milestones(self, income):
+        for m in self.milestone_index.update(self.milestone_metrics(income), self.unlocked_milestones):
+            self.unlocked_milestones.append(m["id"])
+            self.popup_queue.append((f"🏆 {m['name']}!", f"Reward: {m['desc']}", GOLD))
+            self.play_sound("build")
+            if m["reward"] == "action_max": self.max_actions += m["amt"]; self.actions += m["amt"]
+
+    def milestone_progress(self):
+        """(milestone, fraction reached at the last check) for every locked milestone, for the UI"""
+        index = self.milestone_index
+        return [(m, index.progress(m)) for m in self.milestones_data if m["id"] not in self.unlocked_milestones]
+
+    def next_turn(self):
+        if self.game_over: return
+        with self.profiler.phase("next_turn"):
+            self._next_turn()
+
+    def _next_turn(self):
+        self.popup_active = False; self.play_sound("money"); self.actions = self.max_actions
+        if self.round % 5 == 0 and self.round < MAX_ROUNDS:
+            event = self.event_deck.draw(self.event_metrics())
+            if event:
+                self.drawn_event_ids.append(event["id"]); self.active_events.append(event)
+                self.max_actions += self.event_actions(event)
+                desc = event['desc']
+                if event.get("duration"):
+                    self.timed_effects.schedule(event["id"], self.round + 1 + event["duration"])
+                    desc += f" ({event['duration']} rounds)"
+                self.popup_queue.append((f"⚠ {event['name']}", desc, PURPLE))
+                self.log(f"⚠ EVENT: {event['name']}", PURPLE)
+        self.recalc_stats()
+        money_change, energy_change = self.calculate_turn_income()
+        self.money += money_change; self.energy = 10 + energy_change; self.round += 1; self.total_income += money_change
+        d_pop = self.population - self.prev_pop; d_happy = self.happiness - self.prev_happy
+        
+        # FIXED: Always show deltas
+        self.log(f"Round {self.round-1}: {money_change:+}💰 | En: {energy_change:+}⚡", CYAN)
+        self.log(f"Pop: {d_pop:+}👥 | Happy: {d_happy:+}😊", WHITE)
+        
+        if self.happiness < 40: self.log("⚠ Citizens Unhappy!", RED)
+        if self.energy < 0: self.log("⚠ Power Shortage!", RED)
+        if self.population < self.jobs_total: self.log("⚠ Citizens Shortage!", RED)
+        self.prev_pop = self.population; self.prev_happy = self.happiness
+        self.check_milestones(money_change)
+        self.expire_events()
+        if self.money < 0 or self.round > MAX_ROUNDS:
+            self.game_over = True; self.win = (self.money >= 0)
+            self.save_high_score(); self.delete_save(); self.state = STATE_GAMEOVER
+        else: self.save_game()
@@ -1,4 +1,3 @@
-import pygame
 import os
 
 # --- Get script directory for reliable file paths ---
@@ -7,9 +6,21 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # --- Configuration ---
 SCREEN_WIDTH = 950
 SCREEN_HEIGHT = 640
-GRID_SIZE = 30
+GRID_SIZE = 30 # Default (and minimum) map size
+MAX_GRID_SIZE = 1024
+CHUNK_SIZE = 16 # Tiles per map chunk edge (storage index and render cache)
+MAP_SIZES = [(30, 30), (64, 64), (128, 128), (256, 256), (512, 512), (1024, 1024), (96, 48)] # (cols, rows)
 TILE_SIZE = 40
+MAX_ZOOM = 2.0
+MIN_ZOOM = 0.01 # Hard floor; the real minimum is whatever fits the whole map on screen (never above 0.5)
+
+# --- Level of Detail (map zoom thresholds) ---
+LOD_GLYPH_ZOOM = 0.6 # Below: no building icons
+LOD_GRID_ZOOM = 0.45 # Below: no tile grid lines, buildings drawn as solid blocks
+LOD_MAP_ZOOM = 0.3 # Below: map drawn from the minimap's one-pixel-per-tile surface
 MAX_ROUNDS = 20
+RENDER_MODES = ["Native", "Scaled", "Smooth"] # Native: draw at window size; else draw at LOGICAL_HEIGHT and scale up
+LOGICAL_HEIGHT = 650 # Height of the offscreen render target (width follows the window's aspect ratio)
 
 # --- File Paths ---
 SAVE_FILE = os.path.join(SCRIPT_DIR, "city_rogue_save.json")
@@ -17,6 +28,9 @@ SCORE_FILE = os.path.join(SCRIPT_DIR, "city_rogue_scores.json")
 SETTINGS_FILE = os.path.join(SCRIPT_DIR, "city_rogue_settings.json")
 DATA_FILE = os.path.join(SCRIPT_DIR, "game_data.json")
 SFX_DIR = os.path.join(SCRIPT_DIR, "sfx")
+PROFILE_DIR = os.path.join(SCRIPT_DIR, "profiles")
+FONT_CACHE_FILE = os.path.join(SCRIPT_DIR, "font_cache.json")
+ASSET_CACHE_DIR = os.path.join(SCRIPT_DIR, "cache") # Generated glyph atlases and compiled game data
 
 # --- Colors ---
 WHITE = (255, 255, 255)
@@ -43,4 +57,5 @@ STATE_MENU = 0
 STATE_RELIC = 1
 STATE_GAME = 2
 STATE_SETTINGS = 3
-STATE_GAMEOVER = 4
\ No newline at end of file
+STATE_GAMEOVER = 4
+STATE_LOADING = 5 # Splash while assets load on worker threads
\ No newline at end of file
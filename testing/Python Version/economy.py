@@ -0,0 +1,105 @@
+"""
+Economy
+Per-island sums that population, jobs, happiness, income and energy are derived from; shared by the
+turn calculation and the what-if evaluator so both use exactly the same arithmetic
+"""
+
+import math
+
+# Island sums (all integers when building values are): people, jobs, and money and energy split by
+# whether road efficiency scales them (buildings with jobs) or not
+ISLAND_FIELDS = ("pop", "jobs", "jobs_resident", "unroaded", "happy", "money", "money_work", "money_flat",
+                 "energy", "energy_work")
+
+
+def new_island():
+    island = dict.fromkeys(ISLAND_FIELDS, 0)
+    island["active"] = False  # Has residents or jobs (lights its roads)
+    island["anchors"] = []
+    return island
+
+
+def add_building(island, anchor, b, mt, bonus):
+    """
+    Fold one building into an island's sums
+
+    Args:
+        island: Dict from new_island
+        anchor: (r, c) of the building
+        b: Building record
+        mt: ModifierTables
+        bonus: Its neighbor bonus dict (or None)
+    """
+    b_id = b.id; pop = mt.pop[b_id]; money = mt.money[b_id]; work = b.work
+    island["anchors"].append(anchor)
+    island["pop"] += pop; island["jobs"] += work
+    if pop > 0 or work > 0: island["active"] = True
+    if b.pop > 0: island["jobs_resident"] += work  # Counted even without residents on the island
+    elif b.needs_road: island["unroaded"] += 1  # -5 happiness while the island has no residents
+    island["happy"] += mt.happy[b_id]
+    if money > 0: island["money_work" if work > 0 else "money"] += money
+    else: island["money_flat"] += money  # Upkeep is not scaled by efficiency or happiness
+    if bonus:
+        island["happy"] += bonus.get("happy", 0); island["money_flat"] += bonus.get("money", 0)
+    island["energy_work" if work > 0 else "energy"] += b.energy
+
+
+def merge(target, island):
+    """Add an island's sums to another (used when a placement joins islands)"""
+    for name in ISLAND_FIELDS: target[name] += island[name]
+    target["active"] = target["active"] or island["active"]
+    target["anchors"] += island["anchors"]
+
+
+def efficiency(island):
+    """Share of the island's jobs that its residents fill"""
+    if island["pop"] <= 0: return 0
+    return min(1.0, island["pop"] / island["jobs"]) if island["jobs"] else 1.0
+
+
+def happy_mult(happiness):
+    return 1.0 if 30 < happiness < 80 else (1.2 if happiness >= 80 else 0.5)
+
+
+def island_income(island, mult):
+    """Money per turn of an island at a happiness multiplier (float; the city total is truncated once)"""
+    return mult * (island["money"] + efficiency(island) * island["money_work"]) + island["money_flat"]
+
+
+def island_energy(island):
+    return island["energy"] + efficiency(island) * island["energy_work"]
+
+
+def island_people(island):
+    """(population, filled jobs, happiness) an island contributes"""
+    if island["pop"] > 0: return island["pop"], island["jobs"], island["happy"]
+    return 0, island["jobs_resident"], island["happy"] - 5 * island["unroaded"]
+
+
+def exact_sum(values):
+    """
+    Exact running sum of floats as non-overlapping partials (Shewchuk), so terms can later be added
+    or removed with math.fsum(partials + terms) and give the same result as summing from scratch
+
+    Returns:
+        List of floats whose exact sum is the exact sum of values
+    """
+    partials = []
+    for x in values:
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y): x, y = y, x
+            hi = x + y; lo = y - (hi - x)
+            if lo: partials[i] = lo; i += 1
+            x = hi
+        partials[i:] = [x]
+    return partials
+
+
+def city_income(islands, mult):
+    """Money per turn of the whole city (order-independent: math.fsum rounds the exact sum once)"""
+    return int(math.fsum(island_income(st, mult) for st in islands))
+
+
+def city_energy(islands):
+    return int(math.fsum(island_energy(st) for st in islands))
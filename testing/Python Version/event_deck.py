@@ -0,0 +1,134 @@
+"""
+Event Deck
+Weighted event draws from alias tables, with preconditions indexed by the metric they test and
+per-event cooldowns; the eligible set and its table are only rebuilt when something changes
+"""
+
+import heapq
+import random
+
+
+def build_alias(weights):
+    """
+    Vose's alias method: O(n) setup for O(1) weighted sampling
+
+    Args:
+        weights: Positive weights
+
+    Returns:
+        (prob, alias) lists; pick column i uniformly, keep it with probability prob[i], else take alias[i]
+    """
+    n = len(weights)
+    total = float(sum(weights))
+    scaled = [w * n / total for w in weights]
+    prob = [1.0] * n; alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop(); l = large.pop()
+        prob[s] = scaled[s]; alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return prob, alias  # Leftovers keep probability 1 (rounding error only)
+
+
+class EventDeck:
+    """Draw state for one run: events used up, cooldowns and the metric values preconditions last saw"""
+
+    def __init__(self, events):
+        """
+        Compile the event library
+
+        Args:
+            events: Compiled event dicts (optional "weight", "cooldown", "requires")
+        """
+        self.events = events
+        self.weights = [e.get("weight", 1) for e in events]
+        self.uniform = len(set(self.weights)) <= 1
+        self.index = {e["id"]: i for i, e in enumerate(events)}
+        self.conditions = {}  # {cond: [(event index, min, max)]}
+        self.parts = [0] * len(events)
+        for i, e in enumerate(events):
+            for req in e.get("requires", []):
+                self.conditions.setdefault(req["cond"], []).append((i, req.get("min"), req.get("max")))
+                self.parts[i] += 1
+        self.reset()
+
+    def reset(self, drawn_ids=(), cooldowns=None):
+        """
+        Start a run, or restore one from a save
+
+        Args:
+            drawn_ids: Ids of events drawn so far (events without a cooldown are drawn only once)
+            cooldowns: {event id: first round it may be drawn again}
+        """
+        self.used = {self.index[e_id] for e_id in drawn_ids
+                     if e_id in self.index and self.events[self.index[e_id]].get("cooldown") is None}
+        self.cooling = {self.index[e_id]: r for e_id, r in (cooldowns or {}).items() if e_id in self.index}
+        self.heap = [(r, i) for i, r in self.cooling.items()]; heapq.heapify(self.heap)
+        self.failing = list(self.parts)  # Preconditions not met (all of them until metrics are seen)
+        self.metrics = {}
+        self.dirty = True
+        self.eligible = []; self.prob = []; self.alias = []
+
+    def copy(self):
+        """Independent draw state over the same compiled library (for forked simulations)"""
+        deck = EventDeck.__new__(EventDeck)
+        deck.__dict__.update(self.__dict__)  # Library, weights and index are shared
+        deck.used = set(self.used); deck.cooling = dict(self.cooling); deck.heap = list(self.heap)
+        deck.failing = list(self.failing); deck.metrics = dict(self.metrics)
+        return deck  # eligible/prob/alias are replaced on rebuild, never edited, so they stay shared
+
+    def cooldowns(self):
+        """{event id: round it becomes available again}, for saving"""
+        return {self.events[i]["id"]: r for i, r in self.cooling.items()}
+
+    def observe(self, metrics):
+        """Re-test only the preconditions of metrics whose value changed, and end expired cooldowns"""
+        for cond, reqs in self.conditions.items():
+            new = metrics.get(cond); old = self.metrics.get(cond)
+            if new == old: continue
+            for i, lo, hi in reqs:
+                was = old is not None and (lo is None or old >= lo) and (hi is None or old <= hi)
+                now = new is not None and (lo is None or new >= lo) and (hi is None or new <= hi)
+                if was != now: self.failing[i] += -1 if now else 1; self.dirty = True
+        self.metrics = dict(metrics)
+        rnd = metrics.get("round", 0)
+        while self.heap and self.heap[0][0] <= rnd:
+            _, i = heapq.heappop(self.heap)
+            if self.cooling.get(i, rnd + 1) <= rnd: del self.cooling[i]; self.dirty = True
+
+    def rebuild(self):
+        """Recollect the eligible events (in data order) and their alias table"""
+        self.eligible = [i for i in range(len(self.events))
+                         if not self.failing[i] and i not in self.used and i not in self.cooling]
+        if not self.uniform: self.prob, self.alias = build_alias([self.weights[i] for i in self.eligible])
+        self.dirty = False
+
+    def draw(self, metrics, rng=random):
+        """
+        Draw one event and take it out of the deck (for good, or for its cooldown)
+
+        Args:
+            metrics: {cond: value} of the current state, including "round"
+            rng: Random source (module random by default)
+
+        Returns:
+            Event dict, or None if no event is eligible
+        """
+        self.observe(metrics)
+        if self.dirty: self.rebuild()
+        if not self.eligible:
+            return None
+        if self.uniform:
+            i = rng.choice(self.eligible)  # Equal weights: same draws as the original random.choice
+        else:
+            col = int(rng.random() * len(self.eligible))
+            i = self.eligible[col] if rng.random() < self.prob[col] else self.eligible[self.alias[col]]
+        event = self.events[i]; cooldown = event.get("cooldown")
+        if cooldown is None:
+            self.used.add(i); self.dirty = True
+        elif cooldown > 0:
+            ready = metrics.get("round", 0) + cooldown
+            self.cooling[i] = ready; heapq.heappush(self.heap, (ready, i)); self.dirty = True
+        return event
@@ -14,8 +14,9 @@ class EventLogManager:
             max_log_lines: Maximum number of visible log lines
         """
         self.logs = []  # List of tuples: (text, color)
-        self.log_scroll_offset = 0
+        self.log_scroll_offset = 0  # Index of the top visible line; fractional while scrolling smoothly
         self.max_log_lines = max_log_lines
+        self.generation = 0  # Bumped when existing entries are replaced (clear/load), not on append
     
     def log(self, text, color=(255, 255, 255)):
         """
@@ -37,12 +38,21 @@ class EventLogManager:
         Args:
             y_change: Scroll direction and amount (positive = scroll up)
         """
-        if len(self.logs) <= self.max_log_lines:
-            return
+        self.scroll_to(self.log_scroll_offset - y_change)
+    
+    def scroll_to(self, offset):
+        """
+        Move the top of the log window to a (possibly fractional) line
         
-        self.log_scroll_offset -= y_change
-        max_offset = len(self.logs) - self.max_log_lines
-        self.log_scroll_offset = max(0, min(self.log_scroll_offset, max_offset))
+        Args:
+            offset: Index of the first visible line, clamped to the valid range
+        """
+        max_offset = max(0, len(self.logs) - self.max_log_lines)
+        self.log_scroll_offset = max(0, min(offset, max_offset))
+    
+    def max_scroll(self):
+        """Largest valid scroll offset"""
+        return max(0, len(self.logs) - self.max_log_lines)
     
     def get_visible_logs(self):
         """
@@ -54,7 +64,7 @@ class EventLogManager:
         if len(self.logs) <= self.max_log_lines:
             return self.logs
         
-        start = self.log_scroll_offset
+        start = int(self.log_scroll_offset)
         end = start + self.max_log_lines
         return self.logs[start:end]
     
@@ -62,6 +72,7 @@ class EventLogManager:
         """Clear all logs"""
         self.logs = []
         self.log_scroll_offset = 0
+        self.generation += 1
     
     def get_all_logs(self):
         """
@@ -81,6 +92,7 @@ class EventLogManager:
         """
         # Handle both tuple colors and list colors from JSON
         self.logs = [(t, tuple(c) if isinstance(c, list) else c) for t, c in logs_data]
+        self.generation += 1
         
         # Restore scroll position to show latest logs
         if len(self.logs) > self.max_log_lines:
@@ -0,0 +1,128 @@
+"""
+Font Cache
+Resolves system font names to files once and remembers them on disk so later
+startups open fonts directly instead of rescanning the installed fonts
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import pygame
+from consts import FONT_CACHE_FILE
+
+# Directories whose modification times change when fonts are installed or removed
+if sys.platform == "win32":
+    FONT_DIRS = [os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+                 os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts")]
+elif sys.platform == "darwin":
+    FONT_DIRS = ["/Library/Fonts", "/System/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+else:
+    FONT_DIRS = ["/etc/fonts", "/etc/fonts/conf.d", "/usr/share/fonts", "/usr/local/share/fonts",
+                 os.path.expanduser("~/.fonts"), os.path.expanduser("~/.local/share/fonts"),
+                 os.path.expanduser("~/.config/fontconfig")]
+
+_fonts = {}  # {(name, size, bold): Font} shared by every renderer in the process
+_paths = None  # {"name|bold": [path or None, fake_bold]} for the current font state
+_dirty = False
+
+
+def font_state():
+    """Fingerprint of the installed fonts (platform, pygame version and font directory mtimes)"""
+    parts = [sys.platform, pygame.version.ver, os.environ.get("FONTCONFIG_FILE", "")]
+    for d in FONT_DIRS:
+        try:
+            parts.append(f"{d}:{os.stat(d).st_mtime_ns}")
+        except OSError:
+            pass
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _load(path):
+    """Read the resolved paths for the current font state, or start empty if it changed"""
+    state = font_state()
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("state") == state:
+            return data.get("fonts", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save(path=FONT_CACHE_FILE):
+    """Write newly resolved font paths to disk (no-op when nothing changed)"""
+    global _dirty
+    if not _dirty:
+        return
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"state": font_state(), "fonts": _paths}, f, indent=1)
+        os.replace(tmp, path)
+        _dirty = False
+    except OSError as e:
+        print(f"Failed to save font cache: {e}")
+
+
+def resolve(name, bold=False, path=FONT_CACHE_FILE):
+    """
+    Find the file of a system font, scanning the installed fonts only on a cache miss
+
+    Args:
+        name: Font family name (comma-separated names are tried in order, like SysFont)
+        bold: Whether the bold face is wanted
+        path: Cache file location
+
+    Returns:
+        (file path or None for pygame's default font, whether bold must be synthesized)
+    """
+    global _paths, _dirty
+    if _paths is None:
+        _paths = _load(path)
+    key = f"{name}|{int(bold)}"
+    entry = _paths.get(key)
+    if entry is None:
+        font_path = pygame.font.match_font(name, bold)
+        # Same rules as SysFont: no dedicated bold file means a synthetic bold
+        fake_bold = bold and (font_path is None or font_path == pygame.font.match_font(name))
+        entry = _paths[key] = [font_path, fake_bold]
+        _dirty = True
+    return entry[0], entry[1]
+
+
+def font_id(name, size, bold=False):
+    """Stable description of a font (resolved file, size, style) for keying derived assets"""
+    font_path, fake_bold = resolve(name, bold)
+    return f"{font_path or 'default'}|{size}|{int(bold)}|{int(fake_bold)}"
+
+
+def get_font(name, size, bold=False):
+    """
+    Get a shared Font for a system font name, equivalent to pygame.font.SysFont
+
+    Args:
+        name: Font family name
+        size: Point size
+        bold: Whether to use (or synthesize) the bold face
+
+    Returns:
+        pygame.font.Font
+    """
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font_path, fake_bold = resolve(name, bold)
+        try:
+            font = pygame.font.Font(font_path, size)
+        except OSError:
+            # File vanished without the font directories changing: rescan this name
+            del _paths[f"{name}|{int(bold)}"]
+            font_path, fake_bold = resolve(name, bold)
+            font = pygame.font.Font(font_path, size)
+        if fake_bold:
+            font.set_bold(True)
+        _fonts[key] = font
+    return font
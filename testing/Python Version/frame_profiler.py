@@ -0,0 +1,194 @@
+"""
+Frame Profiler
+Collects per-phase frame timings for the in-game performance overlay
+"""
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# Phases in display order. Nested phases are inclusive: "next_turn" contains
+# the "recalc_stats" call it triggers, "chunks" contains the "terrain" and
+# "buildings" passes of chunks rebuilt that frame, and "frame" contains everything.
+PHASES = ("events", "recalc_stats", "next_turn", "chunks", "terrain", "buildings",
+          "minimap", "sidebar", "popups", "present", "flip", "frame")
+
+_NULL_PHASE = nullcontext()
+
+
+class _PhaseTimer:
+    """Context manager that adds its elapsed time to the current frame"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.start) * 1000.0
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+        return False
+
+
+class FrameProfiler:
+    """Rolling per-phase frame-time recorder with percentile summaries"""
+
+    def __init__(self, history=600, summary_interval=30):
+        """
+        Initialize the frame profiler
+
+        Args:
+            history: Number of frames kept in the rolling window
+            summary_interval: Frames between refreshes of the cached summary
+        """
+        self.enabled = False
+        self.history = history
+        self.summary_interval = summary_interval
+        self.frames = deque(maxlen=history)  # dicts of {phase: ms, "zoom": z, "res": [w, h]}
+        self.current = {}
+        self.frame_start = 0.0
+        self.frame_count = 0
+        self.summary = {}
+        self.summary_version = 0
+
+    def toggle(self):
+        """Turn recording and the overlay on or off"""
+        self.enabled = not self.enabled
+        self.frames.clear()
+        self.current = {}
+        self.summary = {}
+        self.summary_version += 1
+
+    def phase(self, name):
+        """
+        Time a block of code as part of the current frame
+
+        Args:
+            name: Phase name (see PHASES)
+
+        Returns:
+            Context manager; a shared no-op when profiling is disabled
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _PhaseTimer(self, name)
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        if self.enabled:
+            self.current = {}
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self, zoom=None, res=None):
+        """
+        Close the current frame and push its phase timings into the window
+
+        Args:
+            zoom: Camera zoom during the frame (recorded for diagnosis)
+            res: Window resolution during the frame
+        """
+        if not self.enabled:
+            return
+        self.current["frame"] = (time.perf_counter() - self.frame_start) * 1000.0
+        if zoom is not None:
+            self.current["zoom"] = round(zoom, 2)
+        if res is not None:
+            self.current["res"] = list(res)
+        self.frames.append(self.current)
+        self.current = {}
+        self.frame_count += 1
+        if self.frame_count % self.summary_interval == 0:
+            self.refresh_summary()
+
+    def samples(self, name):
+        """
+        Get the recorded timings of one phase
+
+        Args:
+            name: Phase name
+
+        Returns:
+            List of millisecond timings for frames in which the phase ran
+        """
+        return [f[name] for f in self.frames if name in f]
+
+    @staticmethod
+    def percentile(sorted_vals, pct):
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_vals:
+            return 0.0
+        idx = min(len(sorted_vals) - 1, max(0, int(round(pct / 100.0 * len(sorted_vals))) - 1))
+        return sorted_vals[idx]
+
+    @staticmethod
+    def histogram(vals, bins, upper):
+        """
+        Bucket timings into a fixed number of equal-width bins
+
+        Args:
+            vals: Millisecond timings
+            bins: Number of bins
+            upper: Upper edge of the last bin; larger values land in it
+
+        Returns:
+            List of bin counts
+        """
+        counts = [0] * bins
+        if upper <= 0:
+            return counts
+        for v in vals:
+            counts[min(bins - 1, int(v / upper * bins))] += 1
+        return counts
+
+    def refresh_summary(self, bins=16):
+        """Recompute p50/p95/p99 and histograms for every phase"""
+        summary = {}
+        for name in PHASES:
+            vals = sorted(self.samples(name))
+            if not vals:
+                continue
+            p99 = self.percentile(vals, 99)
+            upper = max(p99, 1.0)
+            summary[name] = {
+                "count": len(vals),
+                "p50": self.percentile(vals, 50),
+                "p95": self.percentile(vals, 95),
+                "p99": p99,
+                "max": vals[-1],
+                "hist_upper": upper,
+                "hist": self.histogram(vals, bins, upper),
+            }
+        self.summary = summary
+        self.summary_version += 1
+
+    def dump(self, directory, meta=None):
+        """
+        Write the recorded samples and summary to a JSON file
+
+        Args:
+            directory: Folder to write into (created if missing)
+            meta: Optional dict of extra context (grid size, relic, ...)
+
+        Returns:
+            Path of the written file, or None on failure
+        """
+        self.refresh_summary()
+        path = os.path.join(directory, time.strftime("profile_%Y%m%d_%H%M%S.json"))
+        data = {"meta": meta or {}, "phases": list(PHASES), "summary": self.summary,
+                "frames": list(self.frames)}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(data, f)
+        except OSError:
+            return None
+        return path
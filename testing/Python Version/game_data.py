@@ -0,0 +1,459 @@
+"""
+Game Data
+Validates game_data.json and compiles it into slotted building records, id-indexed tables and the
+upgrade graph; the compiled form is cached on disk keyed by the file's hash, and edits to the file
+can be recompiled section by section for hot reloading
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+from consts import DATA_FILE, ASSET_CACHE_DIR
+
+COMPILER_VERSION = 6  # Bump when the compiled layout changes so stale caches are ignored
+MAX_BUILDING_ID = 126  # Grid tiles are signed bytes: -1 water, 0 empty, 127 reserved
+EVENT_TYPES = ("cost", "pop_mod", "money_mult", "energy_flat", "happy_flat", "action_mod", "mixed")
+# Milestone metrics; total_income accumulates over the run, so it doubles as a progress counter
+MILESTONE_CONDS = ("income", "pop", "happy", "money", "energy", "total_income")
+# State metrics that event preconditions ("requires") can test
+EVENT_CONDS = ("round", "money", "pop", "happy", "energy", "buildings")
+# Modifier effects: stat -> allowed ops; cost/money/pop/happy may be limited to a "buildings" id list
+EFFECT_OPS = {"cost": ("mult", "set"), "money": ("mult",), "pop": ("add",), "happy": ("add",),
+              "energy": ("add",), "actions": ("add",)}
+PER_BUILDING_STATS = ("cost", "money", "pop", "happy")
+# Effects of the legacy event types: (stat, op, key holding the value)
+EVENT_TYPE_EFFECTS = {"cost": [("cost", "mult", "val")], "pop_mod": [("pop", "add", "val")],
+                      "money_mult": [("money", "mult", "val")], "energy_flat": [("energy", "add", "val")],
+                      "happy_flat": [("happy", "add", "val")], "action_mod": [("actions", "add", "val")],
+                      "mixed": [("happy", "add", "happy"), ("actions", "add", "action")]}
+SECTIONS = ("buildings", "toolbar", "relics", "events", "milestones", "neighbor_synergies")
+
+
+class GameDataError(ValueError):
+    """game_data.json does not match the schema (message lists every problem found)"""
+
+
+class Building:
+    """One building type with its upgrade-graph links"""
+
+    __slots__ = ("id", "name", "symbol", "color", "cost", "ap_cost", "energy", "money", "pop", "work", "happy",
+                 "upgrade_to", "upgrade_cost", "needs_road", "size", "upgrade_from", "chain", "chain_upgrade_cost")
+
+    def __init__(self, b_id, raw):
+        self.id = b_id
+        self.name = raw["name"]
+        self.symbol = raw["symbol"]
+        self.color = tuple(raw["color"])
+        self.cost = raw["cost"]
+        self.ap_cost = raw.get("ap_cost", 0)
+        self.energy = raw["energy"]
+        self.money = raw["money"]
+        self.pop = raw["pop"]
+        self.work = raw["work"]
+        self.happy = raw["happy"]
+        self.upgrade_to = raw.get("upgrade_to")  # Building id this one upgrades into, or None
+        self.upgrade_cost = raw.get("upgrade_cost", 0)
+        self.needs_road = raw["needs_road"]
+        self.size = tuple(raw["size"])  # (width, height) in tiles
+        self.upgrade_from = None  # Building id that upgrades into this one
+        self.chain = (b_id,)  # Ids from the root of the upgrade chain down to this building
+        self.chain_upgrade_cost = 0  # Upgrade costs paid along the chain to reach this building
+
+
+class GameData:
+    """Compiled game data"""
+
+    __slots__ = ("source_hash", "section_hashes", "buildings", "table", "toolbar", "relics", "events", "milestones",
+                 "synergies")
+
+    def __init__(self, source_hash, section_hashes, buildings, toolbar, relics, events, milestones, synergies):
+        self.source_hash = source_hash
+        self.section_hashes = section_hashes  # {section: hash of its JSON}, to find what an edit touched
+        self.buildings = buildings  # {b_id: Building} in file order
+        self.table = [None] * (max(buildings, default=0) + 1)  # Building records indexed by id
+        for b_id, b in buildings.items():
+            self.table[b_id] = b
+        self.toolbar = toolbar
+        self.relics = relics
+        self.events = events
+        self.milestones = milestones
+        self.synergies = synergies
+
+
+# --- Validation ---
+def _is_num(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _check_fields(errors, where, raw, fields):
+    """Record missing or mistyped fields; `fields` maps name -> (predicate, description, required)"""
+    if not isinstance(raw, dict):
+        errors.append(f"{where}: expected an object"); return
+    for name, (ok, desc, required) in fields.items():
+        if name not in raw:
+            if required: errors.append(f"{where}: missing '{name}'")
+        elif not ok(raw[name]):
+            errors.append(f"{where}.{name}: expected {desc}, got {raw[name]!r}")
+
+
+BUILDING_FIELDS = {
+    "name": (lambda v: isinstance(v, str), "a string", True),
+    "symbol": (lambda v: isinstance(v, str) and v, "a non-empty string", True),
+    "color": (lambda v: isinstance(v, list) and len(v) == 3 and all(isinstance(x, int) and 0 <= x <= 255 for x in v),
+              "[r, g, b]", True),
+    "cost": (_is_num, "a number", True),
+    "ap_cost": (lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 0, "a non-negative integer", False),
+    "energy": (_is_num, "a number", True),
+    "money": (_is_num, "a number", True),
+    "pop": (_is_num, "a number", True),
+    "work": (_is_num, "a number", True),
+    "happy": (_is_num, "a number", True),
+    "upgrade_to": (lambda v: v is None or (isinstance(v, int) and not isinstance(v, bool)), "a building id or null", False),
+    "upgrade_cost": (_is_num, "a number", False),
+    "needs_road": (lambda v: isinstance(v, bool), "true or false", True),
+    "size": (lambda v: isinstance(v, list) and len(v) == 2 and all(isinstance(x, int) and x > 0 for x in v),
+             "[width, height]", True),
+}
+NAMED_FIELDS = {
+    "id": (lambda v: isinstance(v, str) and v, "a non-empty string", True),
+    "name": (lambda v: isinstance(v, str), "a string", True),
+    "desc": (lambda v: isinstance(v, str), "a string", True),
+}
+
+
+def _id_list(v):
+    return isinstance(v, list) and all(isinstance(x, int) and not isinstance(x, bool) for x in v)
+
+
+def compile_buildings(raw, errors):
+    """
+    Validate the building table and build the upgrade graph
+
+    Args:
+        raw: "buildings" object of game_data.json ({"id": {...}})
+        errors: List that problems are appended to
+
+    Returns:
+        {b_id: Building}
+    """
+    buildings = {}
+    if not isinstance(raw, dict) or not raw:
+        errors.append("buildings: expected a non-empty object"); return buildings
+    for key, b in raw.items():
+        where = f"buildings[{key}]"
+        try: b_id = int(key)
+        except ValueError:
+            errors.append(f"{where}: id must be an integer"); continue
+        if not 0 < b_id <= MAX_BUILDING_ID:
+            errors.append(f"{where}: id must be between 1 and {MAX_BUILDING_ID}"); continue
+        n = len(errors)
+        _check_fields(errors, where, b, BUILDING_FIELDS)
+        if len(errors) == n:
+            if b.get("upgrade_to") and "upgrade_cost" not in b: errors.append(f"{where}: 'upgrade_to' needs 'upgrade_cost'")
+            buildings[b_id] = Building(b_id, b)
+
+    # Upgrade graph: parent links (first parent in file order wins, as in the old lookup) and cycle check
+    for b in buildings.values():
+        if b.upgrade_to is None: continue
+        target = buildings.get(b.upgrade_to)
+        if target is None: errors.append(f"buildings[{b.id}].upgrade_to: unknown building {b.upgrade_to}")
+        elif target.upgrade_from is None: target.upgrade_from = b.id
+    for b in buildings.values():
+        chain, seen, up_cost, cur = [b.id], {b.id}, 0, b
+        while cur.upgrade_from is not None:
+            parent = buildings[cur.upgrade_from]
+            if parent.id in seen:
+                errors.append(f"buildings[{b.id}]: upgrade cycle {' -> '.join(map(str, [parent.id] + chain[::-1]))}"); break
+            seen.add(parent.id); chain.append(parent.id); up_cost += parent.upgrade_cost; cur = parent
+        b.chain = tuple(reversed(chain)); b.chain_upgrade_cost = up_cost
+    return buildings
+
+
+def compile_toolbar(raw, buildings, errors):
+    """Toolbar order (also the 1-9 hotkeys); default: every building that is not only reachable by upgrade"""
+    if not raw:
+        return [b_id for b_id in sorted(buildings) if buildings[b_id].upgrade_from is None]
+    if not _id_list(raw):
+        errors.append("toolbar: expected a list of building ids"); return []
+    for b_id in raw:
+        if b_id not in buildings: errors.append(f"toolbar: unknown building {b_id}")
+    return list(raw)
+
+
+def compile_named(raw, section, errors, extra=None):
+    """Validate a list of objects with unique ids (relics, events, milestones, synergies)"""
+    if not isinstance(raw, list):
+        errors.append(f"{section}: expected a list"); return []
+    fields = dict(NAMED_FIELDS, **(extra or {}))
+    ids = set()
+    for i, item in enumerate(raw):
+        where = f"{section}[{i}]"
+        _check_fields(errors, where, item, fields)
+        if isinstance(item, dict):
+            if item.get("id") in ids: errors.append(f"{where}: duplicate id {item.get('id')!r}")
+            ids.add(item.get("id"))
+    return raw
+
+
+def event_effects(event):
+    """Effects of an event: its "effects" list, or the ones implied by its legacy type and values"""
+    if event.get("effects") is not None:
+        return event["effects"]
+    return [{"stat": stat, "op": op, "val": event[key]}
+            for stat, op, key in EVENT_TYPE_EFFECTS.get(event.get("type"), []) if _is_num(event.get(key))]
+
+
+def compile_effects(raw, where, buildings, errors):
+    """Validate a list of modifier effects ({"stat", "op", "val", "buildings"?})"""
+    if not isinstance(raw, list):
+        errors.append(f"{where}: expected a list"); return []
+    for i, e in enumerate(raw):
+        at = f"{where}[{i}]"
+        _check_fields(errors, at, e, {
+            "stat": (lambda v: v in EFFECT_OPS, f"one of {tuple(EFFECT_OPS)}", True),
+            "op": (lambda v: isinstance(v, str), "a string", True),
+            "val": (_is_num, "a number", True),
+            "buildings": (_id_list, "a list of building ids", False)})
+        if not isinstance(e, dict) or e.get("stat") not in EFFECT_OPS: continue
+        if e.get("op") not in EFFECT_OPS[e["stat"]]:
+            errors.append(f"{at}.op: expected one of {EFFECT_OPS[e['stat']]} for {e['stat']}")
+        if "buildings" in e and e["stat"] not in PER_BUILDING_STATS:
+            errors.append(f"{at}.buildings: {e['stat']} effects apply to the whole city")
+        for b_id in e.get("buildings") or []:
+            if isinstance(b_id, int) and b_id not in buildings: errors.append(f"{at}: unknown building {b_id}")
+    return raw
+
+
+def compile_relics(raw, buildings, errors):
+    relics = compile_named(raw, "relics", errors, {
+        "color": (lambda v: isinstance(v, list) and len(v) == 3, "[r, g, b]", True),
+        "start_money": (_is_num, "a number", False),
+        "start_buildings": (lambda v: isinstance(v, list) and all(_id_list(x) and len(x) == 3 for x in v),
+                            "a list of [row offset, column offset, building id]", False)})
+    for i, relic in enumerate(relics):
+        if not isinstance(relic, dict): continue
+        relic["effects"] = compile_effects(relic.get("effects", []), f"relics[{i}].effects", buildings, errors)
+        starts = relic.get("start_buildings")
+        for x in starts if isinstance(starts, list) else []:
+            if isinstance(x, list) and len(x) == 3 and x[2] not in buildings:
+                errors.append(f"relics[{i}].start_buildings: unknown building {x[2]}")
+    return relics
+
+
+def compile_events(raw, buildings, errors):
+    events = compile_named(raw, "events", errors, {
+        "type": (lambda v: v in EVENT_TYPES, f"one of {EVENT_TYPES}", False),
+        "weight": (lambda v: _is_num(v) and v > 0, "a positive number", False),
+        "cooldown": (lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 0,
+                     "a non-negative number of rounds (omit it for once per run)", False),
+        "duration": (lambda v: isinstance(v, int) and not isinstance(v, bool) and v > 0,
+                     "a positive number of rounds (omit it for a permanent event)", False),
+        "requires": (lambda v: isinstance(v, list), "a list of conditions", False)})
+    for i, e in enumerate(events):
+        if not isinstance(e, dict): continue
+        for j, req in enumerate(e.get("requires") if isinstance(e.get("requires"), list) else []):
+            _check_fields(errors, f"events[{i}].requires[{j}]", req, {
+                "cond": (lambda v: v in EVENT_CONDS, f"one of {EVENT_CONDS}", True),
+                "min": (_is_num, "a number", False),
+                "max": (_is_num, "a number", False)})
+        if e.get("effects") is None:
+            if e.get("type") is None: errors.append(f"events[{i}]: missing 'type' or 'effects'")
+            elif e["type"] != "mixed" and not _is_num(e.get("val")): errors.append(f"events[{i}].val: expected a number")
+        e["effects"] = compile_effects(event_effects(e), f"events[{i}].effects", buildings, errors)
+    return events
+
+
+def compile_milestones(raw, errors):
+    """Milestones unlock when `cond` >= `val`, or when every {"cond", "val"} in `all` holds in the same turn"""
+    milestones = compile_named(raw, "milestones", errors, {
+        "cond": (lambda v: v in MILESTONE_CONDS, f"one of {MILESTONE_CONDS}", False),
+        "val": (_is_num, "a number", False),
+        "all": (lambda v: isinstance(v, list) and v, "a non-empty list of conditions", False),
+        "reward": (lambda v: isinstance(v, str), "a string", True),
+        "amt": (_is_num, "a number", False)})
+    for i, m in enumerate(milestones):
+        if not isinstance(m, dict): continue
+        parts = m["all"] if isinstance(m.get("all"), list) else [m]
+        if "all" not in m and ("cond" not in m or "val" not in m):
+            errors.append(f"milestones[{i}]: missing 'cond' and 'val' (or 'all')")
+        for j, part in enumerate(parts if "all" in m else []):
+            _check_fields(errors, f"milestones[{i}].all[{j}]", part, {
+                "cond": (lambda v: v in MILESTONE_CONDS, f"one of {MILESTONE_CONDS}", True),
+                "val": (_is_num, "a number", True)})
+        m["parts"] = [[p.get("cond"), p.get("val")] for p in parts if isinstance(p, dict)]
+    return milestones
+
+
+def compile_synergies(raw, buildings, errors):
+    if raw is None:
+        return None  # BuildManager falls back to its built-in rules
+    synergies = compile_named(raw, "neighbor_synergies", errors, {
+        "building_ids": (_id_list, "a list of building ids", True),
+        "neighbor_ids": (_id_list, "a list of building ids", True),
+        "bonus": (lambda v: isinstance(v, dict) and all(_is_num(x) for x in v.values()), "an object of numbers", True)})
+    for i, s in enumerate(synergies):
+        if not isinstance(s, dict): continue
+        for b_id in (s.get("building_ids") or []) + (s.get("neighbor_ids") or []):
+            if isinstance(b_id, int) and b_id not in buildings:
+                errors.append(f"neighbor_synergies[{i}]: unknown building {b_id}")
+    return synergies
+
+
+def section_hashes(raw):
+    """Hash of every top-level section, independent of key order and formatting"""
+    return {name: hashlib.sha1(json.dumps(raw.get(name), sort_keys=True).encode()).hexdigest()
+            for name in SECTIONS}
+
+
+def compile_data(raw, source_hash=None, previous=None):
+    """
+    Validate parsed game_data.json and compile it
+
+    Args:
+        raw: Parsed JSON object
+        source_hash: Hash of the file it came from (stored on the result)
+        previous: Earlier GameData; sections whose JSON is unchanged are reused instead of recompiled
+
+    Returns:
+        (GameData, set of section names that were compiled)
+
+    Raises:
+        GameDataError: listing every schema problem found
+    """
+    if not isinstance(raw, dict):
+        raise GameDataError("game data: expected a JSON object")
+    hashes = section_hashes(raw)
+    changed = {name for name in SECTIONS if previous is None or previous.section_hashes.get(name) != hashes[name]}
+    # These sections refer to building ids, so they are rechecked whenever the buildings change
+    if "buildings" in changed: changed |= {"toolbar", "relics", "events", "neighbor_synergies"}
+    errors = []
+    buildings = compile_buildings(raw.get("buildings"), errors) if "buildings" in changed else previous.buildings
+    toolbar = compile_toolbar(raw.get("toolbar"), buildings, errors) if "toolbar" in changed else previous.toolbar
+    relics = compile_relics(raw.get("relics", []), buildings, errors) if "relics" in changed else previous.relics
+    events = compile_events(raw.get("events", []), buildings, errors) if "events" in changed else previous.events
+    milestones = compile_milestones(raw.get("milestones", []), errors) if "milestones" in changed else previous.milestones
+    synergies = (compile_synergies(raw.get("neighbor_synergies"), buildings, errors) if "neighbor_synergies" in changed
+                 else previous.synergies)
+    if errors:
+        raise GameDataError("\n".join(errors))
+    return GameData(source_hash, hashes, buildings, toolbar, relics, events, milestones, synergies), changed
+
+
+# --- Loading ---
+def load(path=DATA_FILE, cache_dir=ASSET_CACHE_DIR):
+    """
+    Load compiled game data, reusing the on-disk cache when the file is unchanged
+
+    Args:
+        path: game_data.json location
+        cache_dir: Folder for the compiled cache (None disables caching)
+
+    Returns:
+        GameData
+
+    Raises:
+        OSError: if the file cannot be read
+        ValueError: on invalid JSON (json.JSONDecodeError) or schema (GameDataError)
+    """
+    with open(path, "rb") as f:
+        blob = f.read()
+    digest = _digest(blob)
+    cache = os.path.join(cache_dir, f"game_data_{digest}.pickle") if cache_dir else None
+    if cache and os.path.exists(cache):
+        try:
+            with open(cache, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # Unreadable or from an incompatible build: recompile
+
+    data, _ = compile_data(json.loads(blob.decode("utf-8")), digest)
+    _write_cache(data, cache)
+    return data
+
+
+def _write_cache(data, cache):
+    """Pickle compiled data to its cache file, removing caches of older versions of the file"""
+    if not cache:
+        return
+    cache_dir = os.path.dirname(cache)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith("game_data_"): os.remove(os.path.join(cache_dir, name))
+        tmp = cache + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except OSError as e:
+        print(f"Failed to cache game data: {e}")
+
+
+def reload(previous, path=DATA_FILE, cache_dir=ASSET_CACHE_DIR):
+    """
+    Recompile an edited data file, reusing every section whose JSON did not change
+
+    Args:
+        previous: GameData currently in use
+        path: game_data.json location
+        cache_dir: Folder for the compiled cache (None disables caching)
+
+    Returns:
+        (GameData, set of changed section names); the set is empty and previous is returned when the file is unchanged
+
+    Raises:
+        OSError, ValueError: as load(); the previous data stays valid
+    """
+    with open(path, "rb") as f:
+        blob = f.read()
+    digest = _digest(blob)
+    if digest == previous.source_hash:
+        return previous, set()
+    data, changed = compile_data(json.loads(blob.decode("utf-8")), digest, previous)
+    if changed:
+        _write_cache(data, os.path.join(cache_dir, f"game_data_{digest}.pickle") if cache_dir else None)
+    return data, changed
+
+
+def _digest(blob):
+    return hashlib.sha1(blob + f"|{COMPILER_VERSION}".encode()).hexdigest()[:16]
+
+
+class DataWatcher:
+    """Polls a file's modification time at a fixed interval (development hot reload)"""
+
+    def __init__(self, path=DATA_FILE, interval=0.5):
+        """
+        Start watching a file
+
+        Args:
+            path: File to watch
+            interval: Seconds between stat() calls
+        """
+        self.path = path
+        self.interval = interval
+        self.mtime = self.stat()
+        self.next_check = 0.0
+
+    def stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None  # Mid-save or deleted: treat as unchanged until it reappears
+
+    def changed(self, now):
+        """
+        Check whether the file was modified since the last call that returned True
+
+        Args:
+            now: Current time in seconds (time.perf_counter())
+        """
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.interval
+        mtime = self.stat()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return True
@@ -0,0 +1,133 @@
+"""
+Glyph Atlas
+Rasterizes every building symbol once into a sprite sheet that is cached on disk as a PNG
+"""
+
+import hashlib
+import json
+import os
+
+import pygame
+from consts import *
+
+ATLAS_WIDTH = 1024
+PADDING = 1
+
+
+class GlyphAtlas:
+    """Symbol sprite sheet for one font, size and colour, keyed on disk by font and data hash"""
+
+    def __init__(self, font, font_id, color=BLACK, cache_dir=ASSET_CACHE_DIR):
+        """
+        Initialize an empty atlas
+
+        Args:
+            font: Font used to rasterize the symbols
+            font_id: Stable description of the font (file path, size, style) for the cache key
+            color: Glyph colour
+            cache_dir: Folder holding the atlas PNG and its index
+        """
+        self.font = font
+        self.font_id = font_id
+        self.color = color
+        self.cache_dir = cache_dir
+        self.sheet = None
+        self.rects = {}  # {symbol: Rect on self.sheet}
+        self.extra = {}  # {symbol: Surface} for symbols not in the atlas (rendered on demand)
+        self.source = None  # Buildings dict the atlas was built from
+        self.key = None
+
+    def cache_key(self, symbols):
+        """Hash of the font, colour and symbol set"""
+        raw = json.dumps([self.font_id, list(self.color), pygame.version.ver, symbols], ensure_ascii=False)
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def sync(self, buildings):
+        """
+        Make sure the atlas covers the symbols of a building table, loading or building it as needed
+
+        Args:
+            buildings: {b_id: Building} from the compiled game data
+        """
+        if buildings is self.source:
+            return
+        self.source = buildings
+        symbols = sorted({b.symbol for b in buildings.values()})
+        key = self.cache_key(symbols)
+        if key == self.key:
+            return
+        self.key = key
+        self.extra = {}
+        png = os.path.join(self.cache_dir, f"glyphs_{key}.png")
+        if not self.load(png, symbols):
+            self.build(symbols)
+            self.save(png)
+        if pygame.display.get_surface() is not None:
+            self.sheet = self.sheet.convert_alpha()
+
+    def load(self, png, symbols):
+        """Read a cached atlas, returns False if it is missing or does not match"""
+        try:
+            with open(png[:-4] + ".json", "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if sorted(index) != symbols:
+                return False
+            self.sheet = pygame.image.load(png)
+        except (OSError, ValueError, pygame.error):
+            return False
+        self.rects = {s: pygame.Rect(r) for s, r in index.items()}
+        return True
+
+    def build(self, symbols):
+        """Rasterize the symbols into rows of a transparent sheet"""
+        glyphs = [(s, self.font.render(s, True, self.color)) for s in symbols]
+        self.rects = {}
+        x = y = row_h = 0
+        for s, g in glyphs:
+            w, h = g.get_size()
+            if x and x + w > ATLAS_WIDTH:
+                x, y, row_h = 0, y + row_h + PADDING, 0
+            self.rects[s] = pygame.Rect(x, y, w, h)
+            x += w + PADDING
+            row_h = max(row_h, h)
+        width = max([r.right for r in self.rects.values()] + [1])
+        self.sheet = pygame.Surface((width, max(1, y + row_h)), pygame.SRCALPHA)
+        for s, g in glyphs:
+            # Exact copy onto the zeroed sheet (normal alpha blending would darken the edges)
+            self.sheet.blit(g, self.rects[s], special_flags=pygame.BLEND_RGBA_MAX)
+
+    def save(self, png):
+        """Write the sheet and its index, removing atlases of older keys"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("glyphs_"):
+                    os.remove(os.path.join(self.cache_dir, name))
+            pygame.image.save(self.sheet, png)
+            with open(png[:-4] + ".json", "w", encoding="utf-8") as f:
+                json.dump({s: list(r) for s, r in self.rects.items()}, f, ensure_ascii=False)
+        except (OSError, pygame.error) as e:
+            print(f"Failed to save glyph atlas: {e}")
+
+    def blit(self, surface, symbol, center=None, topleft=None):
+        """
+        Draw one symbol from the atlas
+
+        Args:
+            surface: Target surface
+            symbol: Glyph text (rendered on demand if the atlas does not have it)
+            center: Position of the glyph's centre
+            topleft: Position of the glyph's top-left corner (used when center is None)
+        """
+        area = self.rects.get(symbol)
+        if area is None:
+            glyph = self.extra.get(symbol)
+            if glyph is None:
+                glyph = self.extra[symbol] = self.font.render(symbol, True, self.color)
+            src, area = glyph, glyph.get_rect()
+        else:
+            src = self.sheet
+        dest = area.copy()
+        if center is not None: dest.center = center
+        else: dest.topleft = topleft
+        surface.blit(src, dest, area)
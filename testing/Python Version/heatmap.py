@@ -0,0 +1,68 @@
+"""
+Synergy Heatmap
+Translucent map overlay of where the selected building would get synergy bonuses or lack road access
+"""
+
+import pygame
+from consts import *
+
+HEAT_ALPHA = 110
+DISCONNECTED_COL = (200, 50, 50)
+PLAIN_COL = (170, 170, 190)
+HEAT_COLS = [(60, 200, 80), (230, 220, 60), (255, 150, 30)]  # One, two, three or more synergies
+
+
+def build_palette():
+    """Palette index = SynergyMap.levels value; index 0 (not legal) is the transparent colour key"""
+    palette = [BLACK, DISCONNECTED_COL, PLAIN_COL] + [HEAT_COLS[-1]] * 253
+    for k, col in enumerate(HEAT_COLS): palette[3 + k] = col
+    return palette
+
+
+class SynergyHeatmap:
+    """One-pixel-per-tile overlay of SynergyMap.levels, redrawn only when the layers change"""
+
+    def __init__(self):
+        self.visible = False
+        self.palette = build_palette()
+        self.tiles = None  # 8-bit Surface, one pixel per tile
+        self.key = None  # (id of the SynergyMap, its version) self.tiles shows
+        self.scaled = (None, None)  # (view key, visible part of self.tiles scaled to the zoom)
+
+    def sync(self, game):
+        """Make sure the tile surface shows the selected building's current layers"""
+        smap = game.synergy_map(game.selected_building)
+        key = (id(smap), smap.version)
+        if key == self.key: return
+        raw = smap.levels(game.grid_w)
+        self.tiles = pygame.image.frombytes(raw, (game.grid_w, game.grid_h), "P")
+        self.tiles.set_palette(self.palette)
+        self.key = key; self.scaled = (None, None)
+
+    def draw(self, screen, game, map_rect, origin):
+        """
+        Blit the visible part of the overlay over the map
+
+        Args:
+            screen: Target surface
+            game: Game instance
+            map_rect: Screen rectangle of the map viewport
+            origin: Function (game, r, c) -> screen position of a tile's top-left corner
+        """
+        if not self.visible:
+            return
+        self.sync(game)
+        tp = TILE_SIZE * game.zoom
+        c0 = max(0, int(game.cam_x // TILE_SIZE)); r0 = max(0, int(game.cam_y // TILE_SIZE))
+        c1 = min(game.grid_w, int((game.cam_x + map_rect.width / game.zoom) // TILE_SIZE) + 1)
+        r1 = min(game.grid_h, int((game.cam_y + map_rect.height / game.zoom) // TILE_SIZE) + 1)
+        if c1 <= c0 or r1 <= r0: return
+        view = (self.key, r0, c0, r1, c1, game.zoom)
+        if self.scaled[0] != view:
+            region = self.tiles.subsurface((c0, r0, c1 - c0, r1 - r0))
+            size = (max(1, round((c1 - c0) * tp)), max(1, round((r1 - r0) * tp)))
+            surf = pygame.transform.scale(region, size)
+            surf.set_colorkey(0); surf.set_alpha(HEAT_ALPHA)
+            self.scaled = (view, surf)
+        sx, sy = origin(game, r0, c0)
+        screen.blit(self.scaled[1], (round(sx), round(sy)))
@@ -0,0 +1,106 @@
+"""
+Log View
+Draws the event log panel from pre-rendered line surfaces with smooth wheel and drag scrolling
+"""
+
+from collections import OrderedDict
+
+import pygame
+from consts import *
+
+
+class LogView:
+    """Virtualized view of an EventLogManager: only the visible lines are blitted"""
+
+    def __init__(self, font, line_h=18, max_cached=256, bar_w=6):
+        """
+        Initialize the log view
+
+        Args:
+            font: Font used to rasterize log lines
+            line_h: Line spacing in pixels
+            max_cached: Line surfaces kept before least recently shown ones are dropped
+            bar_w: Width of the scrollbar drawn inside the panel's right edge
+        """
+        self.font = font
+        self.line_h = line_h
+        self.max_cached = max_cached
+        self.bar_w = bar_w
+        self.lines = OrderedDict()  # {line index: Surface} for the current log generation
+        self.generation = None
+        self.drag = None  # (mode, start_y, start_offset) while the left button is held on the panel
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def line(self, index, text, color):
+        """Get the rendered surface of one log line, rasterizing it on first use"""
+        surf = self.lines.get(index)
+        if surf is None:
+            surf = self.font.render(f"> {text}", True, color)
+            self.lines[index] = surf
+            if len(self.lines) > self.max_cached:
+                self.lines.popitem(last=False)
+        else:
+            self.lines.move_to_end(index)
+        return surf
+
+    def bar_rect(self, log):
+        """Scrollbar thumb rectangle, or None when everything fits"""
+        total = len(log.logs)
+        if total <= log.max_log_lines:
+            return None
+        track_h = self.rect.height - 4
+        thumb_h = max(12, track_h * log.max_log_lines / total)
+        y = self.rect.y + 2 + (track_h - thumb_h) * log.log_scroll_offset / log.max_scroll()
+        return pygame.Rect(self.rect.right - self.bar_w - 2, y, self.bar_w, thumb_h)
+
+    def draw(self, screen, log, rect):
+        """
+        Blit the visible slice of the log into a panel
+
+        Args:
+            screen: Target surface
+            log: EventLogManager to display
+            rect: Screen rectangle of the log panel
+        """
+        self.rect = rect
+        if log.generation != self.generation:
+            self.lines.clear()  # Entries were replaced, indices no longer match
+            self.generation = log.generation
+
+        offset = log.log_scroll_offset
+        first = int(offset)
+        y = rect.y + 5 - (offset - first) * self.line_h
+        clip = screen.get_clip()
+        screen.set_clip(rect.inflate(-2, -2))
+        for i in range(first, min(len(log.logs), first + log.max_log_lines + 1)):
+            text, color = log.logs[i]
+            screen.blit(self.line(i, text, color), (rect.x + 5, round(y)))
+            y += self.line_h
+
+        bar = self.bar_rect(log)
+        if bar:
+            pygame.draw.rect(screen, GRAY if self.drag and self.drag[0] == "bar" else DARK_GRAY, bar)
+        screen.set_clip(clip)
+
+    # --- Input ---
+    def begin_drag(self, log, mx, my):
+        """Start dragging the content, or the thumb when the press is on the scrollbar"""
+        mode = "bar" if mx >= self.rect.right - self.bar_w - 4 and self.bar_rect(log) else "content"
+        self.drag = (mode, my, log.log_scroll_offset)
+
+    def drag_to(self, log, my):
+        """Scroll to follow the mouse while dragging"""
+        mode, start_y, start_offset = self.drag
+        dy = my - start_y
+        if mode == "bar":
+            bar = self.bar_rect(log)
+            track = self.rect.height - 4 - bar.height
+            if track > 0: log.scroll_to(start_offset + dy * log.max_scroll() / track)
+        else:
+            log.scroll_to(start_offset - dy / self.line_h)
+
+    def end_drag(self, log):
+        """Release the drag; content drags snap to a whole line"""
+        if self.drag and self.drag[0] == "content":
+            log.scroll_to(round(log.log_scroll_offset))
+        self.drag = None
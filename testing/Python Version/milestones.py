@@ -0,0 +1,90 @@
+"""
+Milestone Index
+Sorted threshold arrays per metric, so each turn finds newly reached milestones with one bisect
+per metric instead of testing every milestone
+"""
+
+from bisect import bisect_right
+
+
+class MilestoneIndex:
+    """Compiled milestone conditions with the metric values seen at the previous check"""
+
+    def __init__(self, milestones):
+        """
+        Index compiled milestones (see game_data.compile_milestones)
+
+        Args:
+            milestones: List of milestone dicts, each with "parts" [[cond, val], ...]
+        """
+        self.milestones = milestones
+        entries = {}  # {cond: [(val, milestone index)]}
+        for i, m in enumerate(milestones):
+            for cond, val in m["parts"]:
+                entries.setdefault(cond, []).append((val, i))
+        self.thresholds = {}  # {cond: sorted thresholds}
+        self.owners = {}  # {cond: milestone index of each threshold}
+        for cond, items in entries.items():
+            items.sort()
+            self.thresholds[cond] = [val for val, _ in items]
+            self.owners[cond] = [i for _, i in items]
+        self.last = {}  # {cond: value at the previous check}
+
+    def copy(self):
+        """Index sharing the thresholds, with its own previous values (for forked simulations)"""
+        index = MilestoneIndex.__new__(MilestoneIndex)
+        index.milestones = self.milestones; index.thresholds = self.thresholds; index.owners = self.owners
+        index.last = dict(self.last)
+        return index
+
+    def reset(self):
+        """Forget the previous values (new game, loaded game): the next check tests every threshold"""
+        self.last = {}
+
+    def update(self, metrics, unlocked):
+        """
+        Find milestones reached since the previous check
+
+        A threshold is crossed when it lies in (previous value, current value]; a milestone with
+        several parts is then tested in full, since it can only become true when one of them does.
+
+        Args:
+            metrics: {cond: current value}
+            unlocked: Ids of milestones that are already unlocked
+
+        Returns:
+            Newly fulfilled milestone dicts in data order
+        """
+        candidates = set()
+        for cond, vals in self.thresholds.items():
+            cur = metrics.get(cond)
+            if cur is None: continue
+            prev = self.last.get(cond)
+            lo = 0 if prev is None else bisect_right(vals, prev)
+            hi = bisect_right(vals, cur)
+            if hi > lo: candidates.update(self.owners[cond][lo:hi])
+            self.last[cond] = cur
+        reached = []
+        for i in sorted(candidates):
+            m = self.milestones[i]
+            if m["id"] in unlocked: continue
+            if all(metrics.get(cond, float("-inf")) >= val for cond, val in m["parts"]): reached.append(m)
+        return reached
+
+    def progress(self, milestone, metrics=None):
+        """
+        Fraction of a milestone reached (the weakest part for compound ones), for the UI
+
+        Args:
+            milestone: Milestone dict
+            metrics: {cond: value} (default: the values of the previous check)
+
+        Returns:
+            0.0 to 1.0
+        """
+        metrics = self.last if metrics is None else metrics
+        fractions = []
+        for cond, val in milestone["parts"]:
+            cur = metrics.get(cond, 0)
+            fractions.append(1.0 if cur >= val else (max(0.0, cur / val) if val > 0 else 0.0))
+        return min(fractions, default=0.0)
@@ -0,0 +1,152 @@
+"""
+Minimap
+Keeps a one-pixel-per-tile picture of the map that is patched as buildings change
+"""
+
+import pygame
+from consts import *
+
+EMPTY_COL = (30, 30, 30)
+WATER_INDEX = 255  # Palette slot of grid value -1 (stored as a signed byte)
+
+
+class Minimap:
+    """Palette-indexed map overview with camera rectangle and click-to-jump"""
+
+    def __init__(self, max_size=160, margin=10):
+        """
+        Initialize the minimap
+
+        Args:
+            max_size: Longest edge of the on-screen panel in pixels
+            margin: Gap between the panel and the map area's top-right corner
+        """
+        self.max_size = max_size
+        self.margin = margin
+        self.visible = True
+        self.tiles = None  # 8-bit Surface, one pixel per tile, palette index = grid value
+        self.panel = None  # self.tiles scaled to the panel size
+        self.palette = None
+        self.scale = 1.0  # Panel pixels per tile
+        self.rect = pygame.Rect(0, 0, 0, 0)  # Screen rect of the panel (last drawn)
+        self.view_size = (0, 0)  # Size of the map viewport it was drawn into
+        self.map_key = None
+        self.build_mgr = None
+        self.dirty = True
+        self.version = 0  # Bumped whenever self.tiles changes
+
+    # --- Updates ---
+    def attach(self, game):
+        """Subscribe to grid changes of the game's BuildManager (re-attaches after a reload)"""
+        if self.build_mgr is game.build_mgr:
+            return
+        if self.build_mgr:
+            self.build_mgr.remove_tile_listener(self.on_tiles_changed)
+        self.build_mgr = game.build_mgr
+        self.build_mgr.add_tile_listener(self.on_tiles_changed)
+        self.dirty = True
+
+    def detach(self):
+        """Stop listening for grid changes (call before dropping the renderer)"""
+        if self.build_mgr:
+            self.build_mgr.remove_tile_listener(self.on_tiles_changed)
+            self.build_mgr = None
+
+    def build_palette(self, game):
+        """Map every grid value to its minimap colour"""
+        palette = [EMPTY_COL] * 256
+        palette[WATER_INDEX] = RIVER_BLUE
+        for b_id, b in game.buildings.items():
+            if 0 < b_id < WATER_INDEX:
+                palette[b_id] = b.color
+        return palette
+
+    def rebuild(self, game):
+        """Redraw the whole minimap from the grid (map size change, reset, load)"""
+        w, h = game.grid_w, game.grid_h
+        self.palette = self.build_palette(game)
+        raw = b"".join(row.tobytes() for row in game.grid)
+        self.tiles = pygame.image.frombytes(raw, (w, h), "P")  # Grid bytes are palette indices
+        self.tiles.set_palette(self.palette)
+
+        self.scale = self.max_size / max(w, h)
+        if self.scale >= 1:
+            self.scale = int(self.scale)  # Whole pixels per tile so patches line up with the scaled panel
+        size = (max(1, round(w * self.scale)), max(1, round(h * self.scale)))
+        self.panel = pygame.transform.scale(self.tiles, size)
+        self.map_key = (w, h)
+        self.dirty = False
+        self.version += 1
+
+    def sync(self, game):
+        """Make sure the tile surface matches the game's current map"""
+        self.attach(game)
+        if self.dirty or (game.grid_w, game.grid_h) != self.map_key:
+            self.rebuild(game)
+
+    def on_tiles_changed(self, r, c, w, h):
+        """Tile listener: repaint only the changed rectangle"""
+        if self.dirty or self.tiles is None:
+            return
+        game = self.build_mgr.game
+        if (game.grid_w, game.grid_h) != self.map_key or w * h > 4 * CHUNK_SIZE ** 2:
+            self.dirty = True  # Map-sized change: cheaper to rebuild in one pass
+            return
+        s = self.scale
+        self.version += 1
+        for rr in range(r, min(r + h, game.grid_h)):
+            row = game.grid[rr]
+            y0, y1 = int(rr * s), int((rr + 1) * s)
+            for cc in range(c, min(c + w, game.grid_w)):
+                col = self.palette[row[cc] & 0xFF]
+                self.tiles.set_at((cc, rr), col)
+                x0, x1 = int(cc * s), int((cc + 1) * s)
+                self.panel.fill(col, (x0, y0, max(1, x1 - x0), max(1, y1 - y0)))
+
+    # --- Drawing / Input ---
+    def draw(self, screen, game, map_rect):
+        """
+        Blit the minimap and camera rectangle into the top-right of the map area
+
+        Args:
+            screen: Target surface
+            game: Game instance
+            map_rect: Screen rectangle of the map viewport
+        """
+        if not self.visible:
+            return
+        self.sync(game)
+
+        pw, ph = self.panel.get_size()
+        self.view_size = map_rect.size
+        self.rect = pygame.Rect(map_rect.right - pw - self.margin, map_rect.top + self.margin, pw, ph)
+        screen.blit(self.panel, self.rect.topleft)
+        pygame.draw.rect(screen, GRAY, self.rect.inflate(2, 2), 1)
+
+        # Camera view in panel pixels
+        k = self.scale / TILE_SIZE
+        view = pygame.Rect(self.rect.x + game.cam_x * k, self.rect.y + game.cam_y * k,
+                           max(2, map_rect.width / game.zoom * k), max(2, map_rect.height / game.zoom * k))
+        clip = screen.get_clip()
+        screen.set_clip(self.rect)
+        pygame.draw.rect(screen, WHITE, view, 1)
+        screen.set_clip(clip)
+
+    def contains(self, mx, my):
+        """Check whether a screen point lies on the minimap panel"""
+        return self.visible and self.rect.collidepoint(mx, my)
+
+    def jump(self, game, mx, my):
+        """
+        Centre the camera on the tile under a minimap point
+
+        Args:
+            game: Game instance
+            mx: Screen x on the panel
+            my: Screen y on the panel
+        """
+        view_w, view_h = self.view_size
+        wx = (mx - self.rect.x) / self.scale * TILE_SIZE
+        wy = (my - self.rect.y) / self.scale * TILE_SIZE
+        game.cam_x = wx - view_w / (2 * game.zoom)
+        game.cam_y = wy - view_h / (2 * game.zoom)
@@ -0,0 +1,122 @@
+"""
+Modifier Stack
+Compiles the effects of the active relic and events into per-building cost, income, population and
+happiness tables, so rule code and the UI read modified values instead of re-applying every modifier
+"""
+
+from game_data import event_effects
+
+
+class ModifierTables:
+    """Modified values indexed by building id (like GameData.table) plus the city-wide totals"""
+
+    __slots__ = ("cost", "refund", "money", "pop", "happy", "happy_flat", "energy_flat", "actions")
+
+    def __init__(self, size):
+        self.cost = [0] * size  # Build price
+        self.refund = [0] * size  # Total paid for a building, its upgrade chain included (sell value is half)
+        self.money = [0] * size  # Income before road efficiency and happiness (whole coins)
+        self.pop = [0] * size  # Residents (never negative)
+        self.happy = [0] * size  # Happiness contribution
+        self.happy_flat = 0  # City-wide happiness
+        self.energy_flat = 0  # City-wide energy per turn
+        self.actions = 0  # Sum of max-action effects (applied once, when an event is drawn)
+
+
+def _for_building(effects, stat, b_id):
+    """Effects of a stat that apply to one building type (targeted at it or untargeted)"""
+    return [e for e in effects if e["stat"] == stat and ("buildings" not in e or b_id in e["buildings"])]
+
+
+def _city_wide(effects, stat):
+    """Untargeted effects of a stat"""
+    return [e["val"] for e in effects if e["stat"] == stat and "buildings" not in e]
+
+
+def compile_tables(table, layers):
+    """
+    Apply modifier layers to every building type
+
+    Each layer (the relic, then all active events together) multiplies costs by the product of its
+    factors and rounds down; a "set" cost replaces the price outright. Population modifiers only
+    apply to buildings that house people, income multipliers only to positive income, which is
+    rounded to whole coins.
+
+    Args:
+        table: Building records indexed by id (GameData.table)
+        layers: Lists of effect dicts, outermost first
+
+    Returns:
+        ModifierTables
+    """
+    mt = ModifierTables(len(table))
+    for b in table:
+        if b is None: continue
+        b_id = b.id
+        cost = b.cost; money = b.money; pop_add = 0; happy = b.happy; fixed = None
+        for effects in layers:
+            factor = 1.0
+            for e in _for_building(effects, "cost", b_id):
+                if e["op"] == "set": fixed = e["val"]
+                else: factor *= e["val"]
+            cost = int(cost * factor)
+            for e in _for_building(effects, "money", b_id):
+                if money > 0: money = money * e["val"]
+            pop_add += sum(e["val"] for e in _for_building(effects, "pop", b_id) if "buildings" in e or b.pop > 0)
+            happy += sum(e["val"] for e in _for_building(effects, "happy", b_id) if "buildings" in e)
+        mt.cost[b_id] = 0 if b.cost == 0 else (fixed if fixed is not None else cost)
+        mt.money[b_id] = round(money)  # Whole coins, so island sums are exact in any order
+        mt.pop[b_id] = max(0, b.pop + pop_add)
+        mt.happy[b_id] = happy
+    for b in table:
+        if b is not None: mt.refund[b.id] = sum(mt.cost[c_id] for c_id in b.chain) + b.chain_upgrade_cost
+    for effects in layers:
+        mt.happy_flat += sum(_city_wide(effects, "happy"))
+        mt.energy_flat += sum(_city_wide(effects, "energy"))
+        mt.actions += sum(_city_wide(effects, "actions"))
+    return mt
+
+
+class ModifierStack:
+    """Compiled tables for the current relic and events, rebuilt only when either changes"""
+
+    def __init__(self):
+        self.table = None
+        self.relic = None
+        self.events = None
+        self.n_events = 0
+        self.tables = None
+        self.version = 0  # Bumped on every rebuild
+
+    def copy(self, events):
+        """
+        Stack for a forked simulation, reusing the compiled tables
+
+        Args:
+            events: The fork's copy of the active events list the tables were compiled for
+        """
+        stack = ModifierStack()
+        stack.table, stack.relic, stack.n_events = self.table, self.relic, self.n_events
+        stack.tables, stack.version = self.tables, self.version  # Tables are never edited after compiling
+        stack.events = events  # None (or another list) just means the first sync recompiles
+        return stack
+
+    def sync(self, table, relic, events):
+        """
+        Get the tables for a modifier set, recompiling them if it differs from the last call
+
+        Args:
+            table: Building records indexed by id
+            relic: Active relic dict or None
+            events: List of active event dicts (events are only ever appended)
+
+        Returns:
+            ModifierTables
+        """
+        if table is self.table and relic is self.relic and events is self.events and len(events) == self.n_events:
+            return self.tables
+        self.table, self.relic, self.events, self.n_events = table, relic, events, len(events)
+        layers = [relic.get("effects", []) if relic else [], [e for event in events for e in event_effects(event)]]
+        self.tables = compile_tables(table, layers)
+        self.version += 1
+        return self.tables
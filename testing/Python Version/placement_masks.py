@@ -0,0 +1,143 @@
+"""
+Placement Masks
+Bitsets of every legal anchor per footprint size (bit c of row r: a building can be placed at (r, c)),
+built with sliding-window ANDs over whole rows and patched locally when tiles change
+"""
+
+# bytes.translate tables turning a grid row into a string of binary digits: "1" where the tile is free
+_EMPTY = bytes(0x31 if b == 0 else 0x30 for b in range(256))  # Empty land (tile 0)
+_WATER = bytes(0x31 if b == 0xFF else 0x30 for b in range(256))  # Water (tile -1 as a signed byte)
+_DIGITS = bytes(1 if b == 0x31 else 0 for b in range(256))  # Binary digit characters back to 0/1 bytes
+
+
+def row_bits(row, water=False):
+    """
+    Free tiles of one grid row as an int
+
+    Args:
+        row: array('b') grid row
+        water: Test for water (bridges) instead of empty land
+
+    Returns:
+        Int with bit c set if tile c is free
+    """
+    digits = row.tobytes().translate(_WATER if water else _EMPTY)[::-1]
+    return int(digits, 2) if digits else 0
+
+
+def row_bytes(bits, width):
+    """A row bitset as width bytes, 1 where the bit is set (column order)"""
+    return format(bits, f"0{width}b")[::-1].encode("ascii").translate(_DIGITS)
+
+
+def window_and(bits, width):
+    """Bit c set if bits c .. c+width-1 are all set (nothing past the top bit, so the right edge is implicit)"""
+    out = bits
+    for dc in range(1, width): out &= bits >> dc
+    return out
+
+
+class PlacementMasks:
+    """Legal anchors per (water, width, height), computed on first use and kept in sync with the grid"""
+
+    def __init__(self, game):
+        self.game = game
+        self.version = 0  # Bumped on every grid change the masks see
+        self.reset()
+
+    def reset(self):
+        """Forget every mask (new map, load, reload); they are rebuilt from the grid on the next query"""
+        self.version += 1
+        self.grid = None  # Grid the masks were computed from
+        self.base = {}  # {water: [free-tile bits per row]}
+        self.hrows = {}  # {(water, width): [window_and of base per row]}
+        self.masks = {}  # {(water, width, height): [legal anchor bits per row]}
+
+    def copy(self, game):
+        """Masks for a forked simulation (row ints are immutable, so only the lists are copied)"""
+        masks = PlacementMasks.__new__(PlacementMasks)
+        masks.game = game; masks.version = self.version
+        masks.grid = game.grid if self.grid is not None else None
+        masks.base = {k: list(v) for k, v in self.base.items()}
+        masks.hrows = {k: list(v) for k, v in self.hrows.items()}
+        masks.masks = {k: list(v) for k, v in self.masks.items()}
+        return masks
+
+    def key(self, b_id):
+        w, h = self.game.buildings[b_id].size
+        return b_id == 8, w, h  # Bridges go on water, everything else on empty land
+
+    def rows(self, b_id):
+        """
+        Legal anchors of a building type as one int per row (bit c of row r: (r, c) is legal)
+
+        Args:
+            b_id: Building ID
+
+        Returns:
+            List of grid_h ints (shared; do not edit)
+        """
+        if self.game.grid is not self.grid: self.reset(); self.grid = self.game.grid
+        key = self.key(b_id)
+        mask = self.masks.get(key)
+        if mask is None: mask = self.masks[key] = self._build(*key)
+        return mask
+
+    def _base(self, water):
+        base = self.base.get(water)
+        if base is None: base = self.base[water] = [row_bits(row, water) for row in self.grid]
+        return base
+
+    def _hrows(self, water, width):
+        hrows = self.hrows.get((water, width))
+        if hrows is None: hrows = self.hrows[(water, width)] = [window_and(b, width) for b in self._base(water)]
+        return hrows
+
+    def _mask_row(self, hrows, r, height):
+        if r + height > len(hrows): return 0  # Footprint would leave the map at the bottom
+        bits = hrows[r]
+        for dr in range(1, height): bits &= hrows[r + dr]
+        return bits
+
+    def _build(self, water, width, height):
+        hrows = self._hrows(water, width)
+        return [self._mask_row(hrows, r, height) for r in range(len(hrows))]
+
+    def valid(self, r, c, b_id):
+        """True if b_id can be anchored at (r, c) (O(1) once its mask exists)"""
+        if r < 0 or c < 0 or r >= self.game.grid_h: return False
+        return bool(self.rows(b_id)[r] >> c & 1)
+
+    def legal_moves(self, b_id):
+        """Every legal anchor of a building type as (r, c) tuples in row-major order"""
+        moves = []
+        for r, bits in enumerate(self.rows(b_id)):
+            while bits:
+                low = bits & -bits
+                moves.append((r, low.bit_length() - 1)); bits ^= low
+        return moves
+
+    def count(self, b_id):
+        """Number of legal anchors of a building type"""
+        return sum(bin(bits).count("1") for bits in self.rows(b_id))
+
+    def flat(self, b_id):
+        """Legal anchors as grid_w * grid_h bytes (1 = legal), row-major, e.g. for action masks"""
+        w = self.game.grid_w
+        return b"".join(row_bytes(bits, w) for bits in self.rows(b_id))
+
+    def on_tiles_changed(self, r, c, w, h):
+        """Patch the rows a changed rectangle can affect (called by BuildManager.notify_tiles_changed)"""
+        grid = self.game.grid
+        if grid is not self.grid or (w >= self.game.grid_w and h >= self.game.grid_h):
+            self.reset(); return  # New or rewritten map: rebuild lazily
+        self.version += 1
+        rows = range(max(0, r), min(len(grid), r + h))
+        for water, base in self.base.items():
+            for i in rows: base[i] = row_bits(grid[i], water)
+        for (water, width), hrows in self.hrows.items():
+            base = self.base[water]
+            for i in rows: hrows[i] = window_and(base[i], width)
+        for (water, width, height), mask in self.masks.items():
+            hrows = self.hrows[(water, width)]
+            for i in range(max(0, r - height + 1), min(len(grid), r + h)): mask[i] = self._mask_row(hrows, i, height)
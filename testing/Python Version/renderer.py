@@ -1,23 +1,52 @@
 import pygame
 from consts import *
+from frame_profiler import PHASES
+from chunk_renderer import ChunkRenderer
+from minimap import Minimap
+from heatmap import SynergyHeatmap
+from log_view import LogView
+from font_cache import get_font, font_id, save as save_font_cache
+from glyph_atlas import GlyphAtlas
+
+def load_fonts():
+    # Open every UI font (paths resolved once and cached on disk, Font objects shared across renderers).
+    # Safe to run on a worker thread; returns (emoji face name, {renderer attribute: Font})
+    try:
+        face = "Segoe UI Emoji"
+        fonts = {"font": get_font(face, 16), "font_bold": get_font(face, 16, bold=True),
+                 "font_icon": get_font(face, 32), # Big Icons
+                 "font_ui": get_font(face, 18), "font_title": get_font(face, 40, bold=True)}
+    except:
+        face = "Arial"
+        fonts = {"font": get_font(face, 16), "font_bold": get_font(face, 16, bold=True), "font_icon": get_font(face, 32),
+                 "font_ui": get_font(face, 18), "font_title": get_font(face, 40, bold=True)}
+    fonts["font_menu"] = get_font("Arial", 24)
+    fonts["font_prof"] = get_font("Consolas", 13)
+    save_font_cache()
+    return face, fonts
 
 class GameRenderer:
-    def __init__(self, screen):
+    def __init__(self, screen, fonts=None):
+        self.screen = screen
+        face, fonts = fonts or load_fonts() # Pre-loaded by Game's asset loader, or opened here
+        for name, font in fonts.items(): setattr(self, name, font)
+        self.glyphs = GlyphAtlas(self.font_icon, font_id(face, 32)) # Building symbols, loaded by Game.apply_game_data
+        self.prof_cache = (None, [])  # (summary_version, [(surface, hist)])
+        self.chunks = ChunkRenderer(self)
+        self.minimap = Minimap()
+        self.heatmap = SynergyHeatmap() # Synergy overlay of the selected building, toggled with H
+        self.log_view = LogView(self.font)
+        self.lod_cache = (None, None)  # (key, scaled tile-map surface) for the lowest detail level
+        self.screen_cache = {}  # {screen name: (input key, composed surface)}
+        self.overlays = {}  # {(size, alpha): translucent overlay}
+        self.text_cache = {}  # {(font, text, color): rendered surface} for HUD strings
+
+    def set_screen(self, screen):
+        # New render target (resolution / render mode change); fonts and map caches stay valid
         self.screen = screen
-        # Initialize Fonts
-        try:
-            self.font = pygame.font.SysFont("Segoe UI Emoji", 16)
-            self.font_bold = pygame.font.SysFont("Segoe UI Emoji", 16, bold=True)
-            self.font_icon = pygame.font.SysFont("Segoe UI Emoji", 32) # Big Icons
-            self.font_ui = pygame.font.SysFont("Segoe UI Emoji", 18)
-            self.font_title = pygame.font.SysFont("Segoe UI Emoji", 40, bold=True)
-        except:
-            self.font = pygame.font.SysFont("Arial", 16)
-            self.font_bold = pygame.font.SysFont("Arial", 16, bold=True)
-            self.font_icon = pygame.font.SysFont("Arial", 32)
-            self.font_ui = pygame.font.SysFont("Arial", 18)
-            self.font_title = pygame.font.SysFont("Arial", 40, bold=True)
-        self.font_menu = pygame.font.SysFont("Arial", 24)
+        self.lod_cache = (None, None)
+        self.screen_cache = {}
+        self.overlays = {}
 
     def world_to_screen(self, game, r, c):
         wx = c * TILE_SIZE
@@ -26,347 +55,375 @@ class GameRenderer:
         sy = (wy - game.cam_y) * game.zoom
         return sx, sy
 
+    def lod_level(self, zoom):
+        if zoom > LOD_GLYPH_ZOOM: return 0 # Icons + grid
+        if zoom >= LOD_GRID_ZOOM: return 1 # Grid, no icons
+        if zoom >= LOD_MAP_ZOOM: return 2 # Solid blocks per building
+        return 3 # One pixel per tile, scaled
+
+    def draw_tile_map(self, game, map_rect):
+        # Lowest detail: scale the visible part of the minimap's 1px-per-tile surface
+        mm = self.minimap
+        mm.sync(game)
+        tp = TILE_SIZE * game.zoom
+        c0 = max(0, int(game.cam_x // TILE_SIZE)); r0 = max(0, int(game.cam_y // TILE_SIZE))
+        c1 = min(game.grid_w, int((game.cam_x + map_rect.width / game.zoom) // TILE_SIZE) + 1)
+        r1 = min(game.grid_h, int((game.cam_y + map_rect.height / game.zoom) // TILE_SIZE) + 1)
+        if c1 <= c0 or r1 <= r0: return
+        key = (mm.version, r0, c0, r1, c1, game.zoom)
+        if self.lod_cache[0] != key:
+            region = mm.tiles.subsurface((c0, r0, c1 - c0, r1 - r0))
+            size = (max(1, round((c1 - c0) * tp)), max(1, round((r1 - r0) * tp)))
+            self.lod_cache = (key, pygame.transform.scale(region, size))
+        sx, sy = self.world_to_screen(game, r0, c0)
+        self.screen.blit(self.lod_cache[1], (round(sx), round(sy)))
+
+    def cached_screen(self, name, key, compose, alpha=False):
+        # Full-screen surface for a static screen, recomposed only when its inputs change
+        old = self.screen_cache.get(name)
+        if old and old[0] == key: return old[1]
+        size = self.screen.get_size()
+        surf = pygame.Surface(size, pygame.SRCALPHA) if alpha else pygame.Surface(size).convert()
+        compose(surf)
+        self.screen_cache[name] = (key, surf)
+        return surf
+
+    def text(self, font, text, color):
+        # Rendered HUD text, reused across frames until the string changes
+        key = (font, text, color)
+        surf = self.text_cache.get(key)
+        if surf is None:
+            if len(self.text_cache) > 512: self.text_cache.clear()
+            surf = self.text_cache[key] = font.render(text, True, color)
+        return surf
+
+    def overlay(self, alpha):
+        # Translucent black full-screen overlay, allocated once per resolution
+        size = self.screen.get_size()
+        ov = self.overlays.get((size, alpha))
+        if ov is None:
+            ov = pygame.Surface(size, pygame.SRCALPHA)
+            ov.fill((0, 0, 0, alpha))
+            self.overlays[(size, alpha)] = ov
+        return ov
+
     def draw_menu(self, game):
-        self.screen.fill(UI_BG)
-        w, h = self.screen.get_size()
+        lay = game.ui.get("menu", game)
+        scores = tuple((s['score'], s['status'], s['date']) for s in game.high_scores)
+        surf = self.cached_screen("menu", (lay, scores), lambda s: self.compose_menu(s, lay, scores))
+        self.screen.blit(surf, (0, 0))
+
+    def compose_menu(self, surf, lay, scores):
+        surf.fill(UI_BG)
         
         t = self.font_title.render(f"CITY ROGUE v3.12", True, WHITE)
-        self.screen.blit(t, (50, 50))
+        surf.blit(t, (50, 50))
         
         # Menu Buttons (Left Side)
-        btn_w, btn_h = 200, 50
-        base_y = 150
-        gap = 70
-        
-        b_st = pygame.Rect(50, base_y, btn_w, btn_h)
-        pygame.draw.rect(self.screen, DARK_GRAY, b_st)
-        self.screen.blit(self.font_menu.render("NEW GAME", True, WHITE), (70, base_y + 10))
+        for wid, label in (("new_game", "NEW GAME"), ("load_game", "LOAD GAME"), ("settings", "SETTINGS"), ("quit", "QUIT")):
+            rect = lay.rect(wid)
+            pygame.draw.rect(surf, DARK_GRAY, rect)
+            surf.blit(self.font_menu.render(label, True, WHITE), (rect.x + (40 if wid == "quit" else 20), rect.y + 10))
         
-        b_ld = pygame.Rect(50, base_y + gap, btn_w, btn_h)
-        pygame.draw.rect(self.screen, DARK_GRAY, b_ld)
-        self.screen.blit(self.font_menu.render("LOAD GAME", True, WHITE), (70, base_y + gap + 10))
-        
-        b_stg = pygame.Rect(50, base_y + gap*2, btn_w, btn_h)
-        pygame.draw.rect(self.screen, DARK_GRAY, b_stg)
-        self.screen.blit(self.font_menu.render("SETTINGS", True, WHITE), (70, base_y + gap*2 + 10))
-        
-        b_qt = pygame.Rect(50, base_y + gap*3, btn_w, btn_h)
-        pygame.draw.rect(self.screen, DARK_GRAY, b_qt)
-        self.screen.blit(self.font_menu.render("QUIT", True, WHITE), (90, base_y + gap*3 + 10))
-        
-        game.menu_buttons = [b_st, b_ld, b_stg, b_qt]
-        
-        # Leaderboard (Right Side with Frame) - Lower position aligned with buttons
-        lb_x = 400
-        lb_w = w - 450
-        lb_h = 350
-        lb_y = 150  # Align with buttons
-        
-        # Frame
-        pygame.draw.rect(self.screen, (20, 20, 25), (lb_x, lb_y, lb_w, lb_h)) # Bg
-        pygame.draw.rect(self.screen, GOLD, (lb_x, lb_y, lb_w, lb_h), 2) # Border
+        # Leaderboard (Right Side with Frame) - aligned with buttons
+        lb = lay.rect("leaderboard")
+        pygame.draw.rect(surf, (20, 20, 25), lb) # Bg
+        pygame.draw.rect(surf, GOLD, lb, 2) # Border
         
         header = self.font_title.render("TOP MAYORS", True, GOLD)
-        self.screen.blit(header, (lb_x + 20, lb_y + 20))
+        surf.blit(header, (lb.x + 20, lb.y + 20))
         
-        for i, s in enumerate(game.high_scores):
-            txt = self.font.render(f"{i+1}. {s['score']} - {s['status']} ({s['date']})", True, WHITE)
-            self.screen.blit(txt, (lb_x + 30, lb_y + 80 + i*40))
+        for i, (score, status, date) in enumerate(scores):
+            txt = self.font.render(f"{i+1}. {score} - {status} ({date})", True, WHITE)
+            surf.blit(txt, (lb.x + 30, lb.y + 80 + i*40))
 
     def draw_relic_screen(self, game):
-        w, h = self.screen.get_size()
+        lay = game.ui.get("relic", game)
+        surf = self.cached_screen("relic", lay, lambda s: self.compose_relic_screen(s, lay))
+        self.screen.blit(surf, (0, 0))
+
+    def compose_relic_screen(self, surf, lay):
+        w, h = surf.get_size()
+        surf.fill(UI_BG)
         t = self.font_title.render("CHOOSE RELIC", True, WHITE)
-        self.screen.blit(t, (w//2 - t.get_width()//2, 50))
-        
-        game.relic_rects = []
-        start_y = 150
-        for r in game.relics:
-            rect = pygame.Rect(w//2 - 200, start_y, 400, 100)
-            pygame.draw.rect(self.screen, DARK_GRAY, rect)
-            pygame.draw.rect(self.screen, tuple(r["color"]), rect, 2)
-            self.screen.blit(self.font_bold.render(r["name"], True, tuple(r["color"])), (rect.x+20, rect.y+20))
-            self.screen.blit(self.font.render(r["desc"], True, WHITE), (rect.x+20, rect.y+50))
-            game.relic_rects.append((rect, r))
-            start_y += 120
+        surf.blit(t, (w//2 - t.get_width()//2, 50))
+        
+        for widget in lay.root.children:
+            rect, r = widget.rect, widget.arg
+            pygame.draw.rect(surf, DARK_GRAY, rect)
+            pygame.draw.rect(surf, tuple(r["color"]), rect, 2)
+            surf.blit(self.font_bold.render(r["name"], True, tuple(r["color"])), (rect.x+20, rect.y+20))
+            surf.blit(self.font.render(r["desc"], True, WHITE), (rect.x+20, rect.y+50))
 
     def draw_settings(self, game):
-        self.screen.fill(UI_BG)
-        w, h = self.screen.get_size()
+        lay = game.ui.get("settings", game)
+        key = (lay, game.difficulty, game.res_index, tuple(game.map_size), game.render_mode, round(game.volume, 2))
+        surf = self.cached_screen("settings", key, lambda s: self.compose_settings(s, lay, game))
+        self.screen.blit(surf, (0, 0))
+
+    def compose_settings(self, surf, lay, game):
+        w, h = surf.get_size()
+        surf.fill(UI_BG)
         
         title = self.font_title.render("SETTINGS", True, WHITE)
-        self.screen.blit(title, (w//2 - title.get_width()//2, 50))
-        
-        # Difficulty
-        game.btn_diff = pygame.Rect(w//2 - 100, 150, 200, 50)
-        col = GREEN if game.difficulty == "Normal" else RED
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_diff)
-        pygame.draw.rect(self.screen, col, game.btn_diff, 2)
-        self.screen.blit(self.font_menu.render(f"Difficulty: {game.difficulty}", True, col), (game.btn_diff.x+20, game.btn_diff.y+10))
-
-        # Resolution
-        game.btn_res = pygame.Rect(w//2 - 125, 230, 250, 50)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_res)
-        pygame.draw.rect(self.screen, CYAN, game.btn_res, 2)
-        res_txt = f"{game.resolutions[game.res_index][0]}x{game.resolutions[game.res_index][1]}"
-        self.screen.blit(self.font_menu.render(f"Screen: {res_txt}", True, CYAN), (game.btn_res.x+30, game.btn_res.y+10))
+        surf.blit(title, (w//2 - title.get_width()//2, 50))
+        
+        res_w, res_h = game.resolutions[game.res_index]
+        map_w, map_h = game.map_size
+        diff_col = GREEN if game.difficulty == "Normal" else RED
+        buttons = (
+            ("difficulty", f"Difficulty: {game.difficulty}", diff_col, 20), # Difficulty
+            ("resolution", f"Screen: {res_w}x{res_h}", CYAN, 30), # Resolution
+            ("map", f"Map: {map_w}x{map_h}", ORANGE, 30), # Map size (applies to the next new game)
+            ("render", f"Render: {game.render_mode}", PINK, 30), # Native or scaled from a logical-resolution surface
+        )
+        for wid, label, col, pad in buttons:
+            rect = lay.rect(wid)
+            pygame.draw.rect(surf, DARK_GRAY, rect)
+            pygame.draw.rect(surf, col, rect, 2)
+            surf.blit(self.font_menu.render(label, True, col), (rect.x+pad, rect.y+10))
 
         # Volume
-        vol_width = 200
-        vol_x = w//2 - 100
-        vol_y = 330
-        
-        pygame.draw.rect(self.screen, GRAY, (vol_x, vol_y, vol_width, 10))
-        pygame.draw.rect(self.screen, BLUE, (vol_x, vol_y, vol_width*game.volume, 10))
-        self.screen.blit(self.font_menu.render(f"Volume: {int(game.volume*100)}%", True, WHITE), (vol_x, vol_y - 30))
+        vol = lay.rect("volume")
+        pygame.draw.rect(surf, GRAY, vol)
+        pygame.draw.rect(surf, BLUE, (vol.x, vol.y, vol.width*game.volume, vol.height))
+        surf.blit(self.font_menu.render(f"Volume: {int(game.volume*100)}%", True, WHITE), (vol.x, vol.y - 30))
         
-        game.vol_dn = pygame.Rect(vol_x - 40, vol_y - 10, 30, 30)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.vol_dn)
-        self.screen.blit(self.font.render("-",True,WHITE), (game.vol_dn.x+10, game.vol_dn.y+5))
+        vol_dn, vol_up = lay.rect("vol_dn"), lay.rect("vol_up")
+        pygame.draw.rect(surf, DARK_GRAY, vol_dn)
+        surf.blit(self.font.render("-",True,WHITE), (vol_dn.x+10, vol_dn.y+5))
         
-        game.vol_up = pygame.Rect(vol_x + vol_width + 10, vol_y - 10, 30, 30)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.vol_up)
-        self.screen.blit(self.font.render("+",True,WHITE), (game.vol_up.x+8, game.vol_up.y+5))
+        pygame.draw.rect(surf, DARK_GRAY, vol_up)
+        surf.blit(self.font.render("+",True,WHITE), (vol_up.x+8, vol_up.y+5))
         
-        game.s_back = pygame.Rect(w//2 - 100, 420, 200, 50)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.s_back)
-        self.screen.blit(self.font_menu.render("BACK",True,WHITE), (game.s_back.x+70, game.s_back.y+10))
+        back = lay.rect("back")
+        pygame.draw.rect(surf, DARK_GRAY, back)
+        surf.blit(self.font_menu.render("BACK",True,WHITE), (back.x+70, back.y+10))
 
     def draw_game(self, game):
-        w, h = self.screen.get_size()
-        sidebar_w = 280
-        map_w = w - sidebar_w
+        lay = game.ui.get("game", game)
+        map_rect = lay.rect("map")
         
         # 1. Map Area
         self.screen.fill(BLACK)
-        map_rect = pygame.Rect(0, 0, map_w, h)
         pygame.draw.rect(self.screen, (20,20,30), map_rect)
         self.screen.set_clip(map_rect)
         
-        # Calculate viewport
-        cols_visible = int(map_w / (TILE_SIZE * game.zoom)) + 2
-        rows_visible = int(h / (TILE_SIZE * game.zoom)) + 2
-        
-        start_c = int(game.cam_x // TILE_SIZE) - 2
-        start_r = int(game.cam_y // TILE_SIZE) - 2
-        end_c = start_c + cols_visible
-        end_r = start_r + rows_visible
-        
-        start_c = max(0, start_c); start_r = max(0, start_r)
-        end_c = min(GRID_SIZE, end_c); end_r = min(GRID_SIZE, end_r)
-
-        # Terrain
-        for r in range(start_r, end_r):
-            for c in range(start_c, end_c):
-                sx, sy = self.world_to_screen(game, r, c)
-                size = TILE_SIZE * game.zoom
-                rect = pygame.Rect(sx, sy, size, size)
-                if game.grid[r][c] == -1: pygame.draw.rect(self.screen, RIVER_BLUE, rect)
-                else: pygame.draw.rect(self.screen, (30,30,30), rect)
-                pygame.draw.rect(self.screen, (50,50,50), rect, 1)
-
-        # Buildings
-        processed = set()
-        for r in range(start_r, end_r):
-            for c in range(start_c, end_c):
-                if (r,c) in processed: continue
-                b_id = game.grid[r][c]
-                if b_id > 0:
-                    b = game.buildings[b_id]
-                    bw, bh = b["size"]
-                    for dr in range(bh): 
-                        for dc in range(bw): processed.add((r+dr, c+dc))
-                    
-                    sx, sy = self.world_to_screen(game, r, c)
-                    size = TILE_SIZE * game.zoom
-                    b_rect = pygame.Rect(sx, sy, size*bw, size*bh)
-                    
-                    col = tuple(b["color"])
-                    if b_id in [7, 8]: # Road/Bridge
-                        if (r, c) in game.active_road_tiles:
-                            col = ROAD_ACTIVE
-                            if b_id == 8: col = BRIDGE_COL # Use Bridge Color
-                        else:
-                            col = ROAD_INACTIVE
-                    
-                    pygame.draw.rect(self.screen, col, b_rect.inflate(-2,-2))
-                    if game.zoom > 0.6:
-                        txt = self.font_icon.render(b["symbol"], True, BLACK)
-                        self.screen.blit(txt, txt.get_rect(center=b_rect.center))
-                    
-                    iid = game.get_building_island_id(r,c)
-                    is_valid = False
-                    if iid and game.island_stats[iid]["active"]: is_valid = True
-                    if not b["needs_road"]: is_valid = True
-                    if b["needs_road"] and not is_valid:
-                        self.screen.blit(self.font.render("!", True, RED), b_rect.topleft)
+        # Terrain + Buildings: one cached surface per visible chunk, or the tile map when zoomed far out
+        lod = self.lod_level(game.zoom)
+        with game.profiler.phase("chunks"):
+            if lod == 3: self.draw_tile_map(game, map_rect)
+            else: self.chunks.draw(game, self.screen, map_rect, lod)
+        self.heatmap.draw(self.screen, game, map_rect, self.world_to_screen)
 
         # Hover Ghost
-        mx, my = pygame.mouse.get_pos()
+        mx, my = game.mouse_pos()
         if map_rect.collidepoint(mx, my) and not game.popup_active and not game.popup_queue:
             r, c = game.screen_to_world(mx, my)
-            if 0 <= r < GRID_SIZE and 0 <= c < GRID_SIZE:
+            if 0 <= r < game.grid_h and 0 <= c < game.grid_w:
                 sel = game.selected_building
                 if game.can_place_building(r, c, sel):
-                    bw, bh = game.buildings[sel]["size"]
+                    bw, bh = game.buildings[sel].size
                     sx, sy = self.world_to_screen(game, r, c)
                     ghost = pygame.Rect(sx, sy, TILE_SIZE*game.zoom*bw, TILE_SIZE*game.zoom*bh)
                     pygame.draw.rect(self.screen, WHITE, ghost, 2)
 
+        with game.profiler.phase("minimap"):
+            self.minimap.draw(self.screen, game, map_rect)
+
         self.screen.set_clip(None)
-        self.draw_sidebar(game)
-        
-        # Popups
+        with game.profiler.phase("sidebar"):
+            self.draw_sidebar(game)
+        with game.profiler.phase("popups"):
+            self.draw_popups(game)
+
+    def draw_popups(self, game):
+        w, h = self.screen.get_size()
         cx, cy = w//2, h//2
         if game.popup_queue:
-            ov = pygame.Surface((w, h), pygame.SRCALPHA)
-            ov.fill((0,0,0,180))
-            self.screen.blit(ov, (0,0))
+            self.screen.blit(self.overlay(180), (0,0))
             t, d, c = game.popup_queue[0]
             box = pygame.Rect(cx-200, cy-75, 400, 150)
             pygame.draw.rect(self.screen, UI_BG, box)
             pygame.draw.rect(self.screen, c, box, 2)
-            self.screen.blit(self.font_title.render(t, True, c), (box.x+20, box.y+20))
-            self.screen.blit(self.font.render(d, True, WHITE), (box.x+20, box.y+70))
-            self.screen.blit(self.font_ui.render("[PRESS SPACE]", True, GRAY), (box.x+130, box.y+110))
+            self.screen.blit(self.text(self.font_title, t, c), (box.x+20, box.y+20))
+            self.screen.blit(self.text(self.font, d, WHITE), (box.x+20, box.y+70))
+            self.screen.blit(self.text(self.font_ui, "[PRESS SPACE]", GRAY), (box.x+130, box.y+110))
         elif game.popup_active:
             pr, pc = game.popup_coords
             px, py = self.world_to_screen(game, pr, pc)
-            px = min(max(px, 10), w - 300) # Ensure inside map
-            py = min(max(py, 10), h - 150)
+            px = int(min(max(px, 10), w - 300)) # Ensure inside map
+            py = int(min(max(py, 10), h - 150))
             
-            game.popup_rects = []
-            bg = pygame.Rect(px+20, py, 140, 100)
+            b_id = game.grid[pr][pc]
+            b = game.buildings[b_id]
+            lay = game.ui.popup(game, px, py, bool(b.upgrade_to))
+            bg = lay.rect("box")
             pygame.draw.rect(self.screen, BLACK, bg)
             pygame.draw.rect(self.screen, WHITE, bg, 2)
             
-            b = game.buildings[game.grid[pr][pc]]
-            
-            urect = pygame.Rect(px+30, py+10, 120, 25)
-            if b["upgrade_to"]:
-                col = CYAN if game.money >= b["upgrade_cost"] else RED
+            if b.upgrade_to:
+                urect = lay.rect("upgrade")
+                col = CYAN if game.money >= b.upgrade_cost else RED
                 pygame.draw.rect(self.screen, DARK_GRAY, urect)
                 pygame.draw.rect(self.screen, col, urect, 1)
-                self.screen.blit(self.font.render(f"Upgrade {b['upgrade_cost']}", True, col), (px+35, py+12))
-                game.popup_rects.append((urect, "UPGRADE"))
+                self.screen.blit(self.text(self.font, f"Upgrade {b.upgrade_cost}", col), (urect.x+5, urect.y+2))
             
-            srect = pygame.Rect(px+30, py+40, 120, 25)
-            ref = int(game.get_building_total_cost(game.grid[pr][pc]) * 0.5)
+            srect = lay.rect("sell")
+            ref = int(game.get_building_total_cost(b_id) * 0.5)
             pygame.draw.rect(self.screen, DARK_GRAY, srect)
             pygame.draw.rect(self.screen, WHITE, srect, 1)
-            self.screen.blit(self.font.render(f"Sell +{ref}", True, WHITE), (px+35, py+42))
-            game.popup_rects.append((srect, "SELL"))
+            self.screen.blit(self.text(self.font, f"Sell +{ref}", WHITE), (srect.x+5, srect.y+2))
             
-            crect = pygame.Rect(px+135, py-10, 20, 20)
+            crect = lay.rect("close")
             pygame.draw.rect(self.screen, RED, crect)
-            self.screen.blit(self.font_bold.render("X", True, WHITE), (px+139, py-9))
-            game.popup_rects.append((crect, "CLOSE"))
+            self.screen.blit(self.text(self.font_bold, "X", WHITE), (crect.x+4, crect.y+1))
+
+    def delta_text(self, d):
+        # Per-turn change from a what-if delta (see what_if.py)
+        return f"{d['money']:+}💰 {d['energy']:+}⚡ {d['pop']:+}👥 {d['happy']:+}😊"
 
     def draw_sidebar(self, game):
-        w, h = self.screen.get_size()
-        sidebar_w = 280
-        ui_x = w - sidebar_w + 20
+        lay = game.ui.get("game", game)
+        ui_bg = lay.rect("sidebar")
+        ui_x = ui_bg.x + 20
         
-        ui_bg = pygame.Rect(w - sidebar_w, 0, sidebar_w, h)
         pygame.draw.rect(self.screen, UI_BG, ui_bg)
-        pygame.draw.rect(self.screen, GRAY, (ui_bg.x, 0, 2, h))
+        pygame.draw.rect(self.screen, GRAY, (ui_bg.x, 0, 2, ui_bg.height))
         
-        self.screen.blit(self.font_title.render(f"Round {min(game.round, MAX_ROUNDS)}", True, WHITE), (ui_x, 30))
+        self.screen.blit(self.text(self.font_title, f"Round {min(game.round, MAX_ROUNDS)}", WHITE), (ui_x, 30))
         
         h_icon = "😐"; h_col = YELLOW
         if game.happiness >= 80: h_icon="🙂"; h_col=GREEN
         if game.happiness <= 40: h_icon="🤬"; h_col=RED
         
         y = 80
-        self.screen.blit(self.font_ui.render(f"💰 ${game.money}", True, GREEN), (ui_x, y)); y+=30
-        self.screen.blit(self.font_ui.render(f"⚡ {game.energy}", True, YELLOW), (ui_x, y)); y+=30
-        self.screen.blit(self.font_ui.render(f"👥 {game.population} / 💼 {game.jobs_total}", True, WHITE), (ui_x, y)); y+=30
-        self.screen.blit(self.font_ui.render(f"{h_icon} {int(game.happiness)}%", True, h_col), (ui_x, y)); y+=30
-        self.screen.blit(self.font_ui.render(f"⭐ {game.actions}/{game.max_actions}", True, ORANGE), (ui_x, y))
+        self.screen.blit(self.text(self.font_ui, f"💰 ${game.money}", GREEN), (ui_x, y)); y+=30
+        self.screen.blit(self.text(self.font_ui, f"⚡ {game.energy}", YELLOW), (ui_x, y)); y+=30
+        self.screen.blit(self.text(self.font_ui, f"👥 {game.population} / 💼 {game.jobs_total}", WHITE), (ui_x, y)); y+=30
+        self.screen.blit(self.text(self.font_ui, f"{h_icon} {int(game.happiness)}%", h_col), (ui_x, y)); y+=30
+        self.screen.blit(self.text(self.font_ui, f"⭐ {game.actions}/{game.max_actions}", ORANGE), (ui_x, y))
 
-        y = 250
-        tb_x = ui_x + 10
-        self.screen.blit(self.font_bold.render("Construction:", True, WHITE), (ui_x, y-25))
-        keys = [1, 2, 3, 4, 6, 9, 10, 7, 8] # Sorted IDs
-        for i, b_id in enumerate(keys):
-            rect = pygame.Rect(tb_x + (i%4)*60, y + (i//4)*60, 50, 50)
+        toolbar = lay.rect("toolbar")
+        self.screen.blit(self.text(self.font_bold, "Construction:", WHITE), (ui_x, toolbar.y-25))
+        for tool in lay.children("toolbar"):
+            rect, b_id = tool.rect, tool.arg
             is_sel = (game.selected_building == b_id)
-            pygame.draw.rect(self.screen, tuple(game.buildings[b_id]["color"]) if is_sel else DARK_GRAY, rect)
+            pygame.draw.rect(self.screen, game.buildings[b_id].color if is_sel else DARK_GRAY, rect)
             pygame.draw.rect(self.screen, WHITE if is_sel else GRAY, rect, 2)
-            self.screen.blit(self.font_icon.render(game.buildings[b_id]["symbol"], True, BLACK), rect.inflate(-10,-10))
-
-        # Dynamic Rects Update
-        game.btn_pass = pygame.Rect(w - 200, h - 70, 150, 50)
-        game.log_rect = pygame.Rect(20, h - 120, w - sidebar_w - 60, 100)
-        game.btn_log_up = pygame.Rect(game.log_rect.right + 5, game.log_rect.y, 20, 50)
-        game.btn_log_down = pygame.Rect(game.log_rect.right + 5, game.log_rect.y + 50, 20, 50)
+            self.glyphs.blit(self.screen, game.buildings[b_id].symbol, topleft=(rect.x+5, rect.y+5))
 
         # Info Box
-        info_rect = pygame.Rect(ui_x, 430, 240, 100)
+        info_rect = lay.rect("info")
         pygame.draw.rect(self.screen, (40, 40, 50), info_rect)
         pygame.draw.rect(self.screen, GRAY, info_rect, 1)
         
-        mx, my = pygame.mouse.get_pos()
+        mx, my = game.mouse_pos()
         preview_txt = []
-        if mx < w - sidebar_w and not game.popup_queue:
+        if game.popup_active and not game.popup_queue:
+            # Exact change per turn of the open building's actions
+            up = game.what_if.evaluate_upgrade(*game.popup_coords)
+            if up: preview_txt.append((f"Upgrade: {self.delta_text(up)}", CYAN))
+            sale = game.what_if.evaluate_sale(*game.popup_coords)
+            if sale: preview_txt.append((f"Sell: {self.delta_text(sale)}", WHITE))
+        if lay.rect("map").collidepoint(mx, my) and not game.popup_queue and not preview_txt:
             r, c = game.screen_to_world(mx, my)
-            if 0 <= r < GRID_SIZE and 0 <= c < GRID_SIZE:
+            if 0 <= r < game.grid_h and 0 <= c < game.grid_w:
                 if game.can_place_building(r, c, game.selected_building):
                     cst = game.get_cost(game.selected_building)
-                    ap = game.buildings[game.selected_building].get("ap_cost", 0)
+                    ap = game.buildings[game.selected_building].ap_cost
                     preview_txt.append((f"Cost: -${cst} | -{ap}⭐", WHITE))
+                    delta = game.what_if.evaluate_build(r, c, game.selected_building)
+                    preview_txt.append((f"Turn: {self.delta_text(delta)}", CYAN))
                     for e in game.predict_building_effects(r, c, game.selected_building): 
                         preview_txt.append((e, GREEN if "Combo" in e else RED))
         
         if not preview_txt:
             b = game.buildings[game.selected_building]
-            preview_txt.append((f"{b['name']} ${game.get_cost(game.selected_building)}", tuple(b["color"])))
-            preview_txt.append((f"Pop: {b['pop']} | Jobs: {b['work']}", WHITE))
-            preview_txt.append((f"Energy: {b['energy']:+} | Happy: {b['happy']:+}", YELLOW))
-            if b["needs_road"]: preview_txt.append(("⚠ Needs Road Access", ORANGE))
+            preview_txt.append((f"{b.name} ${game.get_cost(game.selected_building)}", b.color))
+            mt = game.modifier_tables() # Values with the relic and events applied
+            preview_txt.append((f"Pop: {mt.pop[b.id]} | Jobs: {b.work}", WHITE))
+            preview_txt.append((f"Energy: {b.energy:+} | Happy: {mt.happy[b.id]:+}", YELLOW))
+            if b.needs_road: preview_txt.append(("⚠ Needs Road Access", ORANGE))
 
         iy = info_rect.y + 5
         for t, c in preview_txt: 
-            self.screen.blit(self.font.render(t, True, c), (info_rect.x+5, iy)); iy+=20
+            self.screen.blit(self.text(self.font, t, c), (info_rect.x+5, iy)); iy+=20
 
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_pass)
-        pygame.draw.rect(self.screen, WHITE, game.btn_pass, 2)
-        self.screen.blit(self.font_bold.render("PASS TURN", True, WHITE), (game.btn_pass.x+35, game.btn_pass.y+15))
+        btn_pass = lay.rect("pass")
+        pygame.draw.rect(self.screen, DARK_GRAY, btn_pass)
+        pygame.draw.rect(self.screen, WHITE, btn_pass, 2)
+        self.screen.blit(self.text(self.font_bold, "PASS TURN", WHITE), (btn_pass.x+35, btn_pass.y+15))
 
-        pygame.draw.rect(self.screen, BLACK, game.log_rect)
-        pygame.draw.rect(self.screen, GRAY, game.log_rect, 1)
+        log_rect = lay.rect("log")
+        pygame.draw.rect(self.screen, BLACK, log_rect)
+        pygame.draw.rect(self.screen, GRAY, log_rect, 1)
         
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_log_up)
-        self.screen.blit(self.font.render("▲",True,WHITE), (game.btn_log_up.x+5, game.btn_log_up.y+10))
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_log_down)
-        self.screen.blit(self.font.render("▼",True,WHITE), (game.btn_log_down.x+5, game.btn_log_down.y+10))
+        btn_up, btn_down = lay.rect("log_up"), lay.rect("log_down")
+        pygame.draw.rect(self.screen, DARK_GRAY, btn_up)
+        self.screen.blit(self.text(self.font, "▲", WHITE), (btn_up.x+5, btn_up.y+10))
+        pygame.draw.rect(self.screen, DARK_GRAY, btn_down)
+        self.screen.blit(self.text(self.font, "▼", WHITE), (btn_down.x+5, btn_down.y+10))
         
-        visible_logs = game.event_log.get_visible_logs()
-        ly = game.log_rect.y + 5
-        for t, c in visible_logs: 
-            self.screen.blit(self.font.render(f"> {t}", True, c), (game.log_rect.x+5, ly)); ly+=18
+        self.log_view.draw(self.screen, game.event_log, log_rect)
 
     def draw_gameover(self, game):
-        w, h = self.screen.get_size()
-        ov = pygame.Surface((w, h), pygame.SRCALPHA)
-        ov.fill((0, 0, 0, 200))
-        self.screen.blit(ov, (0,0))
+        lay = game.ui.get("gameover", game)
+        score = game.money + game.population*10
+        surf = self.cached_screen("gameover", (lay, game.win, score),
+                                  lambda s: self.compose_gameover(s, lay, game.win, score), alpha=True)
+        self.screen.blit(surf, (0, 0))
+
+    def compose_gameover(self, surf, lay, win, score):
+        w, h = surf.get_size()
+        surf.blit(self.overlay(200), (0, 0))
         
-        msg = "VICTORY!" if game.win else "BANKRUPT!"
-        col = GREEN if game.win else RED
+        msg = "VICTORY!" if win else "BANKRUPT!"
+        col = GREEN if win else RED
         
         title_surf = self.font_title.render(msg, True, col)
-        self.screen.blit(title_surf, (w//2 - title_surf.get_width()//2, h//2 - 80))
+        surf.blit(title_surf, (w//2 - title_surf.get_width()//2, h//2 - 80))
         
-        info = f"Score: {game.money + game.population*10}"
+        info = f"Score: {score}"
         info_surf = self.font_ui.render(info, True, WHITE)
-        self.screen.blit(info_surf, (w//2 - info_surf.get_width()//2, h//2 - 20))
+        surf.blit(info_surf, (w//2 - info_surf.get_width()//2, h//2 - 20))
         
-        game.btn_restart = pygame.Rect(w//2 - 100, h//2 + 40, 200, 50)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_restart)
-        pygame.draw.rect(self.screen, WHITE, game.btn_restart, 2)
-        self.screen.blit(self.font_menu.render("PLAY AGAIN", True, WHITE), (game.btn_restart.x + 35, game.btn_restart.y + 10))
-        
-        game.btn_menu = pygame.Rect(w//2 - 100, h//2 + 110, 200, 50)
-        pygame.draw.rect(self.screen, DARK_GRAY, game.btn_menu)
-        pygame.draw.rect(self.screen, WHITE, game.btn_menu, 2)
-        self.screen.blit(self.font_menu.render("MAIN MENU", True, WHITE), (game.btn_menu.x + 35, game.btn_menu.y + 10))
\ No newline at end of file
+        for wid, label in (("restart", "PLAY AGAIN"), ("to_menu", "MAIN MENU")):
+            rect = lay.rect(wid)
+            pygame.draw.rect(surf, DARK_GRAY, rect)
+            pygame.draw.rect(surf, WHITE, rect, 2)
+            surf.blit(self.font_menu.render(label, True, WHITE), (rect.x + 35, rect.y + 10))
+
+    def draw_profiler(self, game):
+        prof = game.profiler
+        if self.prof_cache[0] != prof.summary_version:
+            rows = []
+            for name in PHASES:
+                st = prof.summary.get(name)
+                if not st: continue
+                cols = [self.font_prof.render(name, True, WHITE)]
+                cols += [self.font_prof.render(f"{st[k]:.2f}", True, WHITE) for k in ("p50", "p95", "p99")]
+                rows.append((cols, st["hist"]))
+            self.prof_cache = (prof.summary_version, rows)
+        rows = self.prof_cache[1]
+        
+        row_h = 16; hist_w = 80
+        panel = pygame.Rect(8, 8, 330, 26 + row_h * max(1, len(rows)))
+        ov = pygame.Surface(panel.size, pygame.SRCALPHA)
+        ov.fill((0, 0, 0, 190))
+        self.screen.blit(ov, panel.topleft)
+        pygame.draw.rect(self.screen, GREEN, panel, 1)
+        col_x = (6, 100, 150, 200)
+        for x, t in zip(col_x, ("phase  [F4 dump]", "p50", "p95", "p99 ms")):
+            self.screen.blit(self.font_prof.render(t, True, GREEN), (panel.x + x, panel.y + 4))
+        
+        y = panel.y + 22
+        for cols, hist in rows:
+            for x, surf in zip(col_x, cols): self.screen.blit(surf, (panel.x + x, y))
+            peak = max(hist) or 1
+            bar_w = hist_w / len(hist)
+            hx = panel.right - hist_w - 6
+            for i, cnt in enumerate(hist):
+                bh = int((row_h - 4) * cnt / peak)
+                if bh: pygame.draw.rect(self.screen, ORANGE if i >= len(hist) - 2 else CYAN, (hx + i * bar_w, y + row_h - 2 - bh, max(1, bar_w - 1), bh))
+            y += row_h
@@ -0,0 +1,132 @@
+"""
+Synergy Map
+For one building type, which legal anchors would get each synergy bonus and which would touch the
+road network, computed for the whole map at once from row bitsets of neighbour types
+"""
+
+from placement_masks import row_bytes
+
+
+def type_rows(grid, ids):
+    """
+    Tiles holding any of some building types, as one int per row
+
+    Args:
+        grid: List of array('b') rows
+        ids: Building IDs (positive tile values)
+
+    Returns:
+        List of ints, bit c of row r set if grid[r][c] is in ids
+    """
+    table = bytes(0x31 if b in ids else 0x30 for b in range(256))
+    return [int(row.tobytes().translate(table)[::-1], 2) for row in grid]
+
+
+def window_or(bits, width):
+    """Bit c set if any of bits c .. c+width-1 is set"""
+    out = bits
+    for dc in range(1, width): out |= bits >> dc
+    return out
+
+
+def touching(rows, width, height):
+    """
+    Anchors whose footprint has an orthogonal neighbour among the set tiles
+
+    The neighbours of a w x h footprint at (r, c) are the w tiles above and below it and the h
+    tiles left and right of it: two window ORs along rows and one down columns, shifted sideways.
+
+    Args:
+        rows: Row bitsets of the neighbour tiles
+        width: Footprint width
+        height: Footprint height
+
+    Returns:
+        Row bitsets (may have bits past the right edge; AND with a placement mask)
+    """
+    n = len(rows)
+    horiz = [window_or(bits, width) for bits in rows]
+    out = []
+    for r in range(n):
+        side = 0
+        for dr in range(r, min(n, r + height)): side |= rows[dr]
+        bits = (side << 1) | (side >> width)
+        if r > 0: bits |= horiz[r - 1]
+        if r + height < n: bits |= horiz[r + height]
+        out.append(bits)
+    return out
+
+
+class SynergyMap:
+    """Whole-map synergy and connectivity layers for the selected building, cached until the grid changes"""
+
+    def __init__(self, build_mgr):
+        self.build_mgr = build_mgr
+        self.key = None  # (mask version, b_id, synergy rules, building records) of the layers below
+        self.version = 0  # Bumped whenever the layers are recomputed
+        self.b_id = None
+        self.legal = []  # Row bitsets of legal anchors
+        self.connected = []  # Legal anchors next to another building (or not needing a road)
+        self.matches = []  # [(synergy rule, row bitsets of legal anchors it applies to)]
+
+    def for_building(self, b_id):
+        """
+        Layers for one building type, recomputed only if the grid, rules or type changed
+
+        Args:
+            b_id: Building ID
+
+        Returns:
+            self
+        """
+        bm = self.build_mgr; game = bm.game
+        legal = bm.masks.rows(b_id)  # Also brings the mask version up to date
+        key = (bm.masks.version, b_id, bm.neighbor_synergies, game.buildings)
+        if self.key is not None and all(a is b or a == b for a, b in zip(self.key, key)): return self
+        self.key = key; self.version += 1; self.b_id = b_id
+        b = game.buildings[b_id]; w, h = b.size
+        self.legal = legal
+        if b.needs_road:
+            occupied = type_rows(game.grid, range(1, 128))
+            self.connected = [bits & ok for bits, ok in zip(touching(occupied, w, h), legal)]
+        else:
+            self.connected = legal
+        self.matches = []
+        for synergy in bm.neighbor_synergies:
+            if b_id not in synergy["building_ids"]: continue
+            ids = set(synergy["neighbor_ids"])
+            if b_id in ids and w * h > 1:
+                rows = legal  # Placed first, its own tiles neighbour each other (see force_build)
+            else:
+                rows = [bits & ok for bits, ok in zip(touching(type_rows(game.grid, ids), w, h), legal)]
+            self.matches.append((synergy, rows))
+        return self
+
+    def bonus(self, r, c):
+        """Synergy bonus {"money": X, "happy": Y} a legal anchor would get (as calculate_neighbor_bonus)"""
+        bonuses = {}
+        for synergy, rows in self.matches:
+            if rows[r] >> c & 1:
+                for bonus_type, bonus_value in synergy["bonus"].items():
+                    bonuses[bonus_type] = bonuses.get(bonus_type, 0) + bonus_value
+        return bonuses
+
+    def levels(self, width):
+        """
+        Per-tile heat as grid_w * grid_h bytes, row-major
+
+        0: not a legal anchor; 1: would be disconnected; 2: connected, no synergy; 2 + k: k synergies
+        apply. The layers are added as big ints of 0/1 bytes, which adds every tile at once (no byte
+        can carry with fewer than 254 rules).
+
+        Args:
+            width: Map width in tiles
+        """
+        out = []
+        layers = [self.legal, self.connected] + [rows for _, rows in self.matches]
+        for r in range(len(self.legal)):
+            total = 0
+            for rows in layers:
+                if rows[r]: total += int.from_bytes(row_bytes(rows[r], width), "big")
+            out.append(total.to_bytes(width, "big"))
+        return b"".join(out)
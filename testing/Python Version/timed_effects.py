@@ -0,0 +1,62 @@
+"""
+Timed Effects
+Min-heap of temporary event effects keyed by the round they expire, so a turn only looks at
+effects that are actually due instead of scanning every active one
+"""
+
+import heapq
+
+
+class TimedEffects:
+    """Expiry schedule for active events that have a duration"""
+
+    def __init__(self):
+        self.heap = []  # (expiry round, sequence, event id)
+        self.seq = 0  # Keeps equal rounds in scheduling order
+
+    def clear(self):
+        self.heap = []; self.seq = 0
+
+    def copy(self):
+        """Independent schedule with the same entries (for forked simulations)"""
+        effects = TimedEffects()
+        effects.heap = list(self.heap); effects.seq = self.seq
+        return effects
+
+    def schedule(self, event_id, expires):
+        """
+        Remember when an event instance ends (O(log n))
+
+        Args:
+            event_id: Id of the active event
+            expires: Round at whose start the event is removed again
+        """
+        heapq.heappush(self.heap, (expires, self.seq, event_id)); self.seq += 1
+
+    def due(self, round_no):
+        """
+        Pop every event instance that has expired by a round
+
+        Args:
+            round_no: Current round
+
+        Returns:
+            Event ids in expiry order
+        """
+        out = []
+        while self.heap and self.heap[0][0] <= round_no:
+            out.append(heapq.heappop(self.heap)[2])
+        return out
+
+    def next_expiry(self):
+        """Round of the next expiry, or None"""
+        return self.heap[0][0] if self.heap else None
+
+    def entries(self):
+        """[[expiry round, event id], ...] in expiry order, for saving"""
+        return [[r, e_id] for r, _, e_id in sorted(self.heap)]
+
+    def load(self, entries):
+        """Restore a saved schedule (see entries)"""
+        self.clear()
+        for expires, event_id in entries or []: self.schedule(event_id, expires)
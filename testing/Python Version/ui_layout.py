@@ -0,0 +1,219 @@
+"""
+UI Layout
+Retained widget geometry for every screen, rebuilt only when the resolution or UI data changes
+"""
+
+import pygame
+
+SIDEBAR_W = 280
+TOOL_SIZE = 50
+TOOL_PITCH = 60
+TOOLS_PER_ROW = 4
+
+
+class Widget:
+    """One node of the layout tree"""
+
+    __slots__ = ("id", "rect", "arg", "parent", "children", "interactive")
+
+    def __init__(self, wid, rect, arg=None, parent=None, interactive=True):
+        self.id = wid
+        self.rect = pygame.Rect(rect)
+        self.arg = arg  # Payload for the click handler (relic dict, building id, ...)
+        self.parent = parent
+        self.children = []
+        self.interactive = interactive
+
+
+class Layout:
+    """Widget tree of one screen with a uniform-grid spatial index for hit-testing"""
+
+    def __init__(self, name, size, cell=64):
+        """
+        Initialize an empty layout
+
+        Args:
+            name: Screen name
+            size: (width, height) of the render target
+            cell: Edge length of the spatial index cells in pixels
+        """
+        self.name = name
+        self.root = Widget(name, (0, 0, size[0], size[1]), interactive=False)
+        self.by_id = {name: self.root}
+        self.cell = cell
+        self.cells = {}  # {(cx, cy): [Widget, ...]} in insertion order
+
+    def add(self, wid, rect, arg=None, parent=None, interactive=True):
+        """
+        Add a widget under a parent (the screen root by default)
+
+        Args:
+            wid: Unique widget id
+            rect: Rect or (x, y, w, h)
+            arg: Optional payload for the click handler
+            parent: Id of the parent widget
+            interactive: Whether the widget takes clicks (indexed for hit-testing)
+
+        Returns:
+            The new Widget
+        """
+        parent_w = self.by_id[parent] if parent else self.root
+        widget = Widget(wid, rect, arg, parent_w, interactive)
+        parent_w.children.append(widget)
+        self.by_id[wid] = widget
+        if interactive:
+            r, cs = widget.rect, self.cell
+            for cx in range(r.left // cs, (r.right - 1) // cs + 1):
+                for cy in range(r.top // cs, (r.bottom - 1) // cs + 1):
+                    self.cells.setdefault((cx, cy), []).append(widget)
+        return widget
+
+    def __getitem__(self, wid):
+        return self.by_id[wid]
+
+    def rect(self, wid):
+        """Screen rect of a widget"""
+        return self.by_id[wid].rect
+
+    def children(self, wid):
+        """Child widgets of a node in insertion order"""
+        return self.by_id[wid].children
+
+    def hit(self, x, y):
+        """
+        Find the interactive widget under a point
+
+        Args:
+            x: Screen x
+            y: Screen y
+
+        Returns:
+            The last-added (topmost) widget containing the point, or None
+        """
+        bucket = self.cells.get((x // self.cell, y // self.cell))
+        if bucket:
+            for widget in reversed(bucket):
+                if widget.rect.collidepoint(x, y):
+                    return widget
+        return None
+
+
+class UILayout:
+    """Builds and caches the layouts of all screens for the current resolution"""
+
+    def __init__(self):
+        self.size = None
+        self.layouts = {}
+        self.popup_key = None
+
+    def invalidate(self):
+        """Force a rebuild on next use (UI data such as relics or the toolbar changed)"""
+        self.size = None
+
+    def get(self, name, game):
+        """
+        Get the layout of a screen, rebuilding all layouts if the resolution changed
+
+        Args:
+            name: "menu", "relic", "settings", "game", "gameover" or "popup"
+            game: Game instance (screen size, relics, toolbar)
+
+        Returns:
+            Layout
+        """
+        size = game.screen.get_size()
+        if size != self.size:
+            self.size = size
+            self.popup_key = None
+            self.layouts = {
+                "menu": self.build_menu(size),
+                "relic": self.build_relic(size, game.relics),
+                "settings": self.build_settings(size),
+                "game": self.build_game(size, game.toolbar),
+                "gameover": self.build_gameover(size),
+                "popup": Layout("popup", size),
+            }
+        return self.layouts[name]
+
+    def hit(self, name, game, x, y):
+        """Topmost interactive widget of a screen under (x, y), or None"""
+        return self.get(name, game).hit(x, y)
+
+    # --- Screens ---
+    def build_menu(self, size):
+        lay = Layout("menu", size)
+        for i, wid in enumerate(("new_game", "load_game", "settings", "quit")):
+            lay.add(wid, (50, 150 + 70*i, 200, 50))
+        lay.add("leaderboard", (400, 150, size[0] - 450, 350), interactive=False)
+        return lay
+
+    def build_relic(self, size, relics):
+        w, h = size
+        lay = Layout("relic", size)
+        for i, relic in enumerate(relics):
+            lay.add(f"relic_{i}", (w//2 - 200, 150 + i*120, 400, 100), arg=relic)
+        return lay
+
+    def build_settings(self, size):
+        w, h = size
+        vol_x, vol_y, vol_w = w//2 - 100, 460, 200
+        lay = Layout("settings", size)
+        lay.add("difficulty", (w//2 - 100, 150, 200, 50))
+        lay.add("resolution", (w//2 - 125, 220, 250, 50))
+        lay.add("map", (w//2 - 125, 290, 250, 50))
+        lay.add("render", (w//2 - 125, 360, 250, 50))
+        lay.add("volume", (vol_x, vol_y, vol_w, 10), interactive=False)
+        lay.add("vol_dn", (vol_x - 40, vol_y - 10, 30, 30))
+        lay.add("vol_up", (vol_x + vol_w + 10, vol_y - 10, 30, 30))
+        lay.add("back", (w//2 - 100, 520, 200, 50))
+        return lay
+
+    def build_game(self, size, toolbar):
+        w, h = size
+        ui_x = w - SIDEBAR_W + 20
+        lay = Layout("game", size)
+        lay.add("map", (0, 0, w - SIDEBAR_W, h), interactive=False)
+        lay.add("sidebar", (w - SIDEBAR_W, 0, SIDEBAR_W, h), interactive=False)
+        rows = (len(toolbar) + TOOLS_PER_ROW - 1) // TOOLS_PER_ROW
+        lay.add("toolbar", (ui_x + 10, 250, TOOLS_PER_ROW * TOOL_PITCH, rows * TOOL_PITCH), parent="sidebar", interactive=False)
+        for i, b_id in enumerate(toolbar):
+            lay.add(f"tool_{i}", (ui_x + 10 + (i % TOOLS_PER_ROW) * TOOL_PITCH, 250 + (i // TOOLS_PER_ROW) * TOOL_PITCH,
+                                  TOOL_SIZE, TOOL_SIZE), arg=b_id, parent="toolbar")
+        lay.add("info", (ui_x, 430, 240, 100), parent="sidebar", interactive=False)
+        lay.add("pass", (w - 200, h - 70, 150, 50), parent="sidebar")
+        log = lay.add("log", (20, h - 120, w - SIDEBAR_W - 60, 100), parent="map")
+        lay.add("log_up", (log.rect.right + 5, log.rect.y, 20, 50), parent="map")
+        lay.add("log_down", (log.rect.right + 5, log.rect.y + 50, 20, 50), parent="map")
+        return lay
+
+    def build_gameover(self, size):
+        w, h = size
+        lay = Layout("gameover", size)
+        lay.add("restart", (w//2 - 100, h//2 + 40, 200, 50))
+        lay.add("to_menu", (w//2 - 100, h//2 + 110, 200, 50))
+        return lay
+
+    def popup(self, game, px, py, can_upgrade):
+        """
+        Layout of the building popup anchored at a screen position (rebuilt only when it moves)
+
+        Args:
+            game: Game instance
+            px: Anchor x (already clamped into the map area)
+            py: Anchor y
+            can_upgrade: Whether the building has an upgrade button
+
+        Returns:
+            Layout with "box", "upgrade" (optional), "sell" and "close"
+        """
+        self.get("popup", game)
+        key = (px, py, can_upgrade)
+        if key != self.popup_key:
+            self.popup_key = key
+            lay = Layout("popup", self.size)
+            lay.add("box", (px+20, py, 140, 100), interactive=False)
+            if can_upgrade: lay.add("upgrade", (px+30, py+10, 120, 25))
+            lay.add("sell", (px+30, py+40, 120, 25))
+            lay.add("close", (px+135, py-10, 20, 20))
+            self.layouts["popup"] = lay
+        return self.layouts["popup"]
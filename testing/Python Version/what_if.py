@@ -0,0 +1,211 @@
+"""
+What-If Evaluator
+Exact change in income, energy, population, jobs and happiness from one build, upgrade or sale,
+computed from the per-island sums of the current city instead of re-simulating it
+"""
+
+import math
+from array import array
+from collections import deque
+import economy
+
+DELTA_KEYS = ("money", "energy", "pop", "jobs", "happy")
+
+
+class DeltaEvaluator:
+    """
+    Placement previews for one simulation
+
+    A snapshot of the city totals is taken after every stats recalculation (keyed on the island
+    sums object, which update_road_networks replaces); each query then only rebuilds the islands the
+    change touches and corrects the totals with them. Money and energy totals are kept as exact
+    partial sums, so the result is the same number the next turn would produce, not an estimate.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.islands = None  # island_stats the snapshot was taken from
+        self.tables = None  # ModifierTables the snapshot was taken with
+        self.cache = {}  # {(kind, r, c, b_id): delta dict} for the current snapshot
+
+    def _snapshot(self):
+        """Retake the base totals if the city changed since the last query"""
+        game = self.game; mt = game.modifier_tables()
+        if game.island_stats is self.islands and mt is self.tables: return
+        self.islands = game.island_stats; self.tables = mt; self.cache = {}
+        pop = jobs = happy = 0
+        for st in self.islands.values():
+            p, j, h = economy.island_people(st)
+            pop += p; jobs += j; happy += h
+        self.pop = pop; self.jobs = jobs; self.happy = happy  # happy: island sum before the city-wide base
+        self.money_partials = {}  # {happiness multiplier: exact partials}, filled on demand
+        self.energy_partials = economy.exact_sum(economy.island_energy(st) for st in self.islands.values())
+        self.base = self._totals((), (), pop, jobs, happy)
+
+    def _money_partials(self, mult):
+        partials = self.money_partials.get(mult)
+        if partials is None:
+            partials = economy.exact_sum(economy.island_income(st, mult) for st in self.islands.values())
+            self.money_partials[mult] = partials
+        return partials
+
+    def _totals(self, removed, added, pop, jobs, happy):
+        """City totals with some islands swapped for others (removed ones must be in the snapshot)"""
+        mt = self.tables
+        happiness = max(0, min(100, 50 + mt.happy_flat + happy))
+        mult = economy.happy_mult(happiness)
+        # fsum of the exact partials plus the swapped islands rounds once, like summing from scratch
+        money = math.fsum(self._money_partials(mult) + [-economy.island_income(st, mult) for st in removed]
+                          + [economy.island_income(st, mult) for st in added])
+        energy = math.fsum(self.energy_partials + [-economy.island_energy(st) for st in removed]
+                           + [economy.island_energy(st) for st in added])
+        return {"money": int(money), "energy": int(energy) + int(mt.energy_flat), "pop": pop, "jobs": jobs,
+                "happy": happiness}
+
+    def _delta(self, removed, added, cost):
+        """Delta dict for replacing some snapshot islands with new ones, plus the immediate money change"""
+        pop, jobs, happy = self.pop, self.jobs, self.happy
+        for st in removed:
+            p, j, h = economy.island_people(st)
+            pop -= p; jobs -= j; happy -= h
+        for st in added:
+            p, j, h = economy.island_people(st)
+            pop += p; jobs += j; happy += h
+        totals = self._totals(removed, added, pop, jobs, happy)
+        delta = {key: totals[key] - self.base[key] for key in DELTA_KEYS}
+        delta["cost"] = cost
+        return delta
+
+    def _with_footprint(self, r, c, size, value, func):
+        """Call func with a footprint temporarily set to one tile value (listeners are not notified)"""
+        grid = self.game.grid; w, h = size
+        saved = [grid[r + dr][c:c + w] for dr in range(h)]
+        fill = array("b", [value]) * w
+        for dr in range(h): grid[r + dr][c:c + w] = fill
+        try:
+            return func()
+        finally:
+            for dr in range(h): grid[r + dr][c:c + w] = saved[dr]
+
+    def _bonus(self, r, c, b_id):
+        """Neighbor bonus a building would get; like force_build, its own tiles are placed first"""
+        bm = self.game.build_mgr
+        return self._with_footprint(r, c, self.game.buildings[b_id].size, b_id,
+                                    lambda: bm.calculate_neighbor_bonus(r, c, b_id))
+
+    def _island(self, anchors, replace=None):
+        """Island sums of some anchors from their current buildings and bonuses (replace: {anchor: (b_id, bonus)})"""
+        game = self.game; table = game.building_table; nb_bonuses = game.build_mgr.neighbor_bonuses
+        anchor_ids = game.build_mgr.anchors
+        st = economy.new_island()
+        for anchor in anchors:
+            b_id, bonus = (replace or {}).get(anchor) or (anchor_ids[anchor], nb_bonuses.get(anchor))
+            economy.add_building(st, anchor, table[b_id], self.tables, bonus)
+        return st
+
+    def evaluate_build(self, r, c, b_id):
+        """
+        Effect of placing a building (placement validity is not checked)
+
+        Args:
+            r: Anchor row
+            c: Anchor column
+            b_id: Building ID
+
+        Returns:
+            {"money", "energy", "pop", "jobs", "happy"} change per turn and after the next recalculation,
+            plus "cost" (negative: paid now)
+        """
+        key = ("build", r, c, b_id)
+        self._snapshot()
+        if key in self.cache: return self.cache[key]
+        game = self.game; bm = game.build_mgr; grid = game.grid
+        w, h = game.buildings[b_id].size
+        joined = {}  # {island id: island} touching the footprint
+        for dr in range(h):
+            for dc in range(w):
+                for nr, nc in bm.get_neighbors_coords(r + dr, c + dc):
+                    if grid[nr][nc] <= 0: continue
+                    iid = game.network_map.get((nr, nc))
+                    if iid is None: return self._by_fork(key)  # Grid and networks out of sync
+                    joined[iid] = self.islands[iid]
+        st = economy.new_island()
+        for other in joined.values(): economy.merge(st, other)
+        bonus = self._bonus(r, c, b_id)
+        economy.add_building(st, (r, c), game.building_table[b_id], self.tables, bonus)
+        delta = self.cache[key] = self._delta(list(joined.values()), [st], -game.get_cost(b_id))
+        return delta
+
+    def evaluate_upgrade(self, r, c):
+        """
+        Effect of upgrading the building anchored at (r, c); see evaluate_build
+
+        Returns:
+            Delta dict ("cost" is minus the upgrade price), or None if the building has no upgrade
+        """
+        game = self.game; bm = game.build_mgr
+        b_id = bm.anchors.get((r, c)); b = game.buildings.get(b_id)
+        if not b or not b.upgrade_to: return None
+        key = ("upgrade", r, c, b.upgrade_to)
+        self._snapshot()
+        if key in self.cache: return self.cache[key]
+        up_id = b.upgrade_to
+        if game.buildings[up_id].size != b.size: return self._by_fork(key)  # Footprint and roads change too
+        old = self.islands[game.network_map[(r, c)]]
+        bonus = dict(bm.neighbor_bonuses.get((r, c), {}))
+        for k, v in self._bonus(r, c, up_id).items(): bonus[k] = bonus.get(k, 0) + v  # Merged like upgrade_building
+        st = self._island(old["anchors"], {(r, c): (up_id, bonus or None)})
+        delta = self.cache[key] = self._delta([old], [st], -b.upgrade_cost)
+        return delta
+
+    def evaluate_sale(self, r, c):
+        """
+        Effect of selling the building anchored at (r, c); see evaluate_build
+
+        The rest of its island is flooded again with the footprint cleared, since removing a road
+        can split it.
+
+        Returns:
+            Delta dict ("cost" is the refund), or None if there is no building there
+        """
+        game = self.game; bm = game.build_mgr; grid = game.grid
+        b_id = bm.anchors.get((r, c))
+        if b_id is None: return None
+        key = ("sale", r, c, b_id)
+        self._snapshot()
+        if key in self.cache: return self.cache[key]
+        old = self.islands[game.network_map[(r, c)]]
+
+        def split():
+            seen = set(); parts = []
+            for anchor in old["anchors"]:
+                if anchor == (r, c) or anchor in seen: continue
+                part = []; seen.add(anchor); q = deque([anchor])
+                while q:
+                    cr, cc = q.popleft()
+                    if (cr, cc) in bm.anchors: part.append((cr, cc))
+                    for nr, nc in bm.get_neighbors_coords(cr, cc):
+                        if grid[nr][nc] > 0 and (nr, nc) not in seen: seen.add((nr, nc)); q.append((nr, nc))
+                parts.append(self._island(part))
+            return parts
+        parts = self._with_footprint(r, c, game.buildings[b_id].size, -1 if b_id == 8 else 0, split)  # Bridges leave water
+        refund = int(game.get_building_total_cost(b_id) * 0.5)
+        delta = self.cache[key] = self._delta([old], parts, refund)
+        return delta
+
+    def _by_fork(self, key):
+        """Slow path: apply the change to a fork and compare (odd footprints or out-of-sync networks)"""
+        kind, r, c, b_id = key
+        game = self.game; sim = game.fork(); mute = lambda *args: None
+        if kind == "build": sim.force_build(r, c, b_id); cost = -game.get_cost(b_id)
+        else:
+            sim.money = max(sim.money, game.buildings[game.grid[r][c]].upgrade_cost)
+            sim.build_mgr.upgrade_building(r, c, mute, mute); sim.recalc_stats()
+            cost = -game.buildings[game.grid[r][c]].upgrade_cost
+        money, energy = sim.calculate_turn_income()
+        after = {"money": money, "energy": energy, "pop": sim.population, "jobs": sim.jobs_total,
+                 "happy": sim.happiness}
+        delta = {k: after[k] - self.base[k] for k in DELTA_KEYS}
+        delta["cost"] = cost
+        self.cache[key] = delta
+        return delta